@@ -0,0 +1,5 @@
+ALTER TABLE "HadithText" ADD COLUMN "englishNormalized" text;--> statement-breakpoint
+ALTER TABLE "HadithText" ADD COLUMN "arabicNormalized" text;--> statement-breakpoint
+ALTER TABLE "HadithText" ADD COLUMN "englishTokenCount" integer;--> statement-breakpoint
+ALTER TABLE "HadithText" ADD COLUMN "arabicTokenCount" integer;--> statement-breakpoint
+CREATE INDEX IF NOT EXISTS "hadith_arabic_search_idx" ON "HadithText" USING gin (to_tsvector('simple', coalesce("arabicNormalized", '')));
@@ -277,6 +277,12 @@ export const hadithText = pgTable(
     grade: varchar("grade", { length: 50 }), // 'Sahih', 'Hasan', 'Da'if'
     narratorChain: text("narratorChain"),
     sourceUrl: varchar("sourceUrl", { length: 500 }),
+    // Search forms computed by the scraper (diacritics and letter variants
+    // folded, see scripts/scrape-hadith-universal.py) and their word counts
+    englishNormalized: text("englishNormalized"),
+    arabicNormalized: text("arabicNormalized"),
+    englishTokenCount: integer("englishTokenCount"),
+    arabicTokenCount: integer("arabicTokenCount"),
     createdAt: timestamp("createdAt").notNull().defaultNow(),
   },
   (table) => ({
@@ -285,6 +291,11 @@ export const hadithText = pgTable(
     gradeIdx: index("hadith_grade_idx").on(table.grade),
     // GIN index for full-text search (created via migration, searchVector is a generated column)
     searchIdx: index("hadith_search_idx").using("gin", sql`"searchVector"`),
+    // Arabic keyword search over the normalized text (already folded, so no stemming)
+    arabicSearchIdx: index("hadith_arabic_search_idx").using(
+      "gin",
+      sql`to_tsvector('simple', coalesce("arabicNormalized", ''))`
+    ),
   })
 );
 
@@ -0,0 +1,165 @@
+import fs from "node:fs";
+import path from "node:path";
+import { pipeline } from "node:stream/promises";
+import { drizzle } from "drizzle-orm/postgres-js";
+import postgres from "postgres";
+import { hadithText } from "@/lib/db/schema";
+import {
+  COPY_COLUMN_NAMES,
+  COPY_COLUMNS,
+  type HadithCollection,
+  type HadithRow,
+  readSearchForms,
+  toRow,
+} from "./hadith-rows";
+
+// Loads one collection into HadithText with the batched INSERT ... RETURNING
+// of the full ingestion and with the binary COPY of `ingest-hadith.ts --copy`,
+// times both and checks that every row reads back as the export has it.
+//
+// Needs a database with the migrations applied (pnpm db:migrate) in PG_URL and
+// an export made with --pg-copy. The rows go into a temporary HadithText that
+// shadows the real table for this connection only, so nothing is changed.
+//
+//   PG_URL=postgres://... npx tsx scripts/bench-hadith-copy.ts --data-dir data
+//   PG_URL=postgres://... npx tsx scripts/bench-hadith-copy.ts --collection bukhari --repeat 5
+
+const INSERT_BATCH_SIZE = 500;
+
+function flag(name: string, fallback: string): string {
+  const index = process.argv.indexOf(name);
+  return index === -1 ? fallback : process.argv[index + 1];
+}
+
+const DATA_DIR = path.resolve(
+  flag("--data-dir", path.join(process.cwd(), "scripts", "data"))
+);
+const COLLECTION = flag("--collection", "riyadussalihin");
+const REPEAT = Number(flag("--repeat", "3"));
+
+type Database = ReturnType<typeof drizzle>;
+
+async function insertBatches(db: Database, rows: HadithRow[]) {
+  for (let i = 0; i < rows.length; i += INSERT_BATCH_SIZE) {
+    await db
+      .insert(hadithText)
+      .values(rows.slice(i, i + INSERT_BATCH_SIZE))
+      .returning();
+  }
+}
+
+async function copyFile(sql: postgres.Sql, filePath: string) {
+  const writable = await sql
+    .unsafe(`COPY "HadithText" (${COPY_COLUMNS}) FROM STDIN (FORMAT binary)`)
+    .writable();
+  await pipeline(fs.createReadStream(filePath), writable);
+}
+
+// Fastest of REPEAT loads into an emptied table
+async function bestTime(sql: postgres.Sql, load: () => Promise<void>) {
+  let best = Number.POSITIVE_INFINITY;
+  for (let i = 0; i < REPEAT; i++) {
+    await sql`TRUNCATE "HadithText"`;
+    const started = performance.now();
+    await load();
+    best = Math.min(best, (performance.now() - started) / 1000);
+  }
+  return best;
+}
+
+// Rows that differ from the export in any column, and how the first differs
+async function checkRows(sql: postgres.Sql, expected: HadithRow[]) {
+  const rows = await sql.unsafe(
+    `SELECT ${COPY_COLUMNS} FROM "HadithText" ORDER BY "hadithNumber"`
+  );
+  const byNumber = new Map(expected.map((row) => [row.hadithNumber, row]));
+  let mismatched = 0;
+  let example = "";
+  for (const row of rows) {
+    const want = byNumber.get(row.hadithNumber);
+    const columns = COPY_COLUMN_NAMES.filter(
+      (column) => want === undefined || row[column] !== want[column]
+    );
+    if (columns.length > 0) {
+      mismatched++;
+      example ||= `hadith ${row.hadithNumber}: ${columns.join(", ")}`;
+    }
+  }
+  return { count: rows.length, mismatched, example };
+}
+
+async function benchHadithCopy() {
+  if (!process.env.PG_URL) {
+    console.log("⊙ PG_URL is not set, skipping the COPY benchmark");
+    return 0;
+  }
+
+  const exportPath = path.join(DATA_DIR, `${COLLECTION}-full.json`);
+  const copyPath = path.join(DATA_DIR, `${COLLECTION}-hadith-text.pgcopy`);
+  if (!(fs.existsSync(exportPath) && fs.existsSync(copyPath))) {
+    throw new Error(
+      `Export not found: ${copyPath} (scrape ${COLLECTION} with --pg-copy first)`
+    );
+  }
+
+  const data = JSON.parse(
+    fs.readFileSync(exportPath, "utf-8")
+  ) as HadithCollection;
+  // The COPY export carries the search forms the embedding export has
+  const searchForms = readSearchForms(
+    path.join(DATA_DIR, `${COLLECTION}-for-embedding.jsonl`)
+  );
+  const rows = data.hadiths.map((hadith) => toRow(hadith, searchForms));
+
+  // One connection, so the temporary table is the one every statement sees
+  const sql = postgres(process.env.PG_URL, { max: 1, onnotice: () => {} });
+  const db = drizzle(sql);
+  let failed = false;
+
+  try {
+    await sql`CREATE TEMP TABLE "HadithText" (LIKE public."HadithText" INCLUDING ALL)`;
+
+    console.log(
+      `🧪 ${rows.length} ${data.collection_name} hadiths, best of ${REPEAT} loads\n`
+    );
+    console.log(
+      `${"method".padEnd(8)} ${"rows".padStart(7)} ${"seconds".padStart(8)} ${"rows/s".padStart(9)}  check`
+    );
+    console.log("-".repeat(50));
+
+    const seconds: Record<string, number> = {};
+    for (const [method, load] of [
+      ["insert", () => insertBatches(db, rows)],
+      ["copy", () => copyFile(sql, copyPath)],
+    ] as const) {
+      seconds[method] = await bestTime(sql, load);
+      const check = await checkRows(sql, rows);
+      const ok = check.count === rows.length && check.mismatched === 0;
+      failed ||= !ok;
+      console.log(
+        `${method.padEnd(8)} ${String(check.count).padStart(7)} ${seconds[method].toFixed(3).padStart(8)} ` +
+          `${Math.round(check.count / seconds[method]).toString().padStart(9)}  ` +
+          (ok
+            ? "✓"
+            : `✗ ${check.count}/${rows.length} rows, ${check.mismatched} differ (${check.example})`)
+      );
+    }
+
+    const speedup = seconds.insert / seconds.copy;
+    console.log(
+      `\n${speedup > 1 ? "✓" : "⚠"} COPY is ${speedup.toFixed(1)}x faster than batched INSERT`
+    );
+  } finally {
+    await sql`DROP TABLE IF EXISTS pg_temp."HadithText"`;
+    await sql.end();
+  }
+
+  return failed ? 1 : 0;
+}
+
+benchHadithCopy()
+  .then((code) => process.exit(code))
+  .catch((err) => {
+    console.error("\n❌ Error:", err);
+    process.exit(1);
+  });
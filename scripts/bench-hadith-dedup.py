@@ -0,0 +1,113 @@
+"""
+Benchmark for near-duplicate detection (--dedup) across collections.
+Builds --collections synthetic collections from a scraper export: each one
+quotes every text of the export with a few words replaced, so every text has
+one planted copy per collection. Reports the time to sign and cluster all
+records and how many planted copies were found.
+
+Usage:
+    python scripts/bench-hadith-dedup.py data/riyadussalihin-full.json
+    python scripts/bench-hadith-dedup.py data/riyadussalihin-full.json --collections 32 --edit-rate 0.05
+"""
+
+import json
+import random
+import time
+
+from hadith_dedup import NearDuplicates
+
+
+def edited(text: str, rate: float, rng: random.Random) -> str:
+    """The text with about `rate` of its words replaced"""
+    words = text.split()
+    for _ in range(round(len(words) * rate)):
+        words[rng.randrange(len(words))] = rng.choice(('indeed', 'verily', 'then', 'and'))
+    return ' '.join(words)
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Time MinHash/LSH near-duplicate detection on a synthetic corpus'
+    )
+    parser.add_argument(
+        'export_file',
+        help='Full JSON export to take texts from (e.g. data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--collections',
+        type=int,
+        default=16,
+        help='Synthetic collections quoting the export (default: 16)'
+    )
+    parser.add_argument(
+        '--edit-rate',
+        type=float,
+        default=0.02,
+        help='Share of words replaced in each quoted copy (default: 0.02)'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.7,
+        help='Similarity threshold (default: 0.7)'
+    )
+    parser.add_argument(
+        '--min-words',
+        type=int,
+        default=30,
+        help='Only count texts with at least this many words for recall (default: 30)'
+    )
+
+    args = parser.parse_args()
+
+    with open(args.export_file, 'r', encoding='utf-8') as f:
+        texts = [h['english_text'] for h in json.load(f)['hadiths']]
+    rng = random.Random(1)
+    corpus = [
+        (f"copy{c}:{number}", edited(text, args.edit_rate, rng) if c else text)
+        for c in range(args.collections)
+        for number, text in enumerate(texts, 1)
+    ]
+
+    duplicates = NearDuplicates(args.threshold)
+    start = time.perf_counter()
+    for record_id, text in corpus:
+        duplicates.add(record_id, text)
+    signed = time.perf_counter()
+    clusters = duplicates.clusters()
+    clustered = time.perf_counter()
+
+    print(f"Records: {len(corpus)} ({args.collections} collections of {len(texts)})\n")
+    print(f"{'stage':<10} {'seconds':>8} {'records/s':>10}")
+    print('-' * 30)
+    for stage, seconds in (('sign', signed - start), ('cluster', clustered - signed),
+                           ('total', clustered - start)):
+        print(f"{stage:<10} {seconds:>8.2f} {len(corpus) / seconds:>10,.0f}")
+
+    # A source text counts as found if all its copies share one cluster
+    cluster_of = {}
+    for i, members in enumerate(clusters):
+        for record_id in members:
+            cluster_of[record_id] = i
+    long_texts = [
+        number for number, text in enumerate(texts, 1)
+        if len(text.split()) >= args.min_words
+    ]
+    found = sum(
+        1 for number in long_texts
+        if len({cluster_of.get(f"copy{c}:{number}", -1 - c) for c in range(args.collections)}) == 1
+    )
+    mixed = sum(1 for members in clusters if len({m.split(':')[1] for m in members}) > 1)
+
+    print()
+    print(f"{'✓' if found == len(long_texts) else '⚠'} {found} of {len(long_texts)} texts of "
+          f"{args.min_words}+ words have all {args.collections} copies in one cluster")
+    print(f"{'✓' if not mixed else '⚠'} {mixed} of {len(clusters)} clusters join different "
+          f"source texts (repeated texts in the export count here too)")
+
+
+if __name__ == "__main__":
+    main()
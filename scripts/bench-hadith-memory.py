@@ -0,0 +1,134 @@
+"""
+Memory benchmark for the hadith scraper's record storage.
+Loads a scraper export and measures the memory retained per hadith by:
+
+- a plain dataclass with the same fields (the original layout)
+- the Hadith dataclass, with repeated metadata strings interned
+- the columnar HadithTable (--compact-memory)
+
+Each layout is measured in a fresh child process, so strings left in the
+interpreter's intern table by one layout are not counted for another.
+
+Usage:
+    python scripts/bench-hadith-memory.py data/riyadussalihin-full.json
+    python scripts/bench-hadith-memory.py data/riyadussalihin-full.json --copies 9
+"""
+
+import gc
+import importlib.util
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts next to this file"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+scraper = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+
+# Same fields as Hadith, without interning
+PlainHadith = make_dataclass(
+    'DictHadith',
+    [(f.name, f.type, f) for f in fields(scraper.Hadith)]
+)
+
+
+def load_records(export_file: str, copies: int) -> List[bytes]:
+    """
+    Raw JSON lines for every record, repeated `copies` times under distinct
+    collection keys to stand in for several collections in one process.
+    Lines hold every Hadith field, as journal lines do.
+    """
+    with open(export_file, 'r', encoding='utf-8') as f:
+        hadiths = json.load(f)['hadiths']
+    lines = []
+    for copy in range(copies):
+        for hadith in hadiths:
+            # Built without interning, so the parent's intern table stays empty
+            record = scraper.asdict(PlainHadith(**dict(hadith, collection=f"{hadith['collection']}{copy or ''}")))
+            lines.append(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+    return lines
+
+
+LAYOUTS: Dict[str, Callable] = {
+    'plain dataclass': lambda records: [PlainHadith(**r) for r in records],
+    'interned Hadith': lambda records: [scraper.Hadith(**r) for r in records],
+    'HadithTable': lambda records: scraper.HadithTable(scraper.Hadith(**r) for r in records),
+}
+
+# Set in the parent before the children fork
+LINES: List[bytes] = []
+
+
+def measure(name: str) -> Dict:
+    """
+    Memory retained by one layout's store, the time to build it and whether
+    it gives back exactly what went in (run in a child process)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = LAYOUTS[name](json.loads(line) for line in LINES)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    expected = [json.loads(line) for line in LINES]
+    round_trips = [scraper.asdict(h) for h in store] == expected
+    return {'bytes': retained, 'seconds': elapsed, 'round_trips': round_trips}
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Measure memory per hadith for each storage layout'
+    )
+    parser.add_argument(
+        'export_file',
+        help='Full JSON export to load (e.g. data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--copies',
+        type=int,
+        default=1,
+        help='Load the export this many times, as separate collections (default: 1)'
+    )
+
+    args = parser.parse_args()
+
+    LINES.extend(load_records(args.export_file, args.copies))
+    print(f"Records: {len(LINES)} ({args.copies} cop{'y' if args.copies == 1 else 'ies'})\n")
+
+    print(f"{'layout':<16} {'bytes/hadith':>13} {'total MB':>10} {'build s':>9}")
+    print('-' * 52)
+    results = {}
+    context = multiprocessing.get_context('fork')
+    for name in LAYOUTS:
+        with context.Pool(1) as pool:
+            result = results[name] = pool.apply(measure, (name,))
+        print(f"{name:<16} {result['bytes'] / len(LINES):>13,.0f} "
+              f"{result['bytes'] / 1e6:>10.1f} {result['seconds']:>9.2f}")
+
+    # The compact layouts must give back exactly what went in
+    print()
+    for name in ('interned Hadith', 'HadithTable'):
+        print(f"{'✓' if results[name]['round_trips'] else '✗'} {name} round-trips every record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Throughput benchmark for the search forms of hadith texts (arabic_normalized,
+english_normalized and their token counts). Times the scraper's translation
+tables on every text of an export and compares them with a per-character
+Python implementation of the same rules, which must give identical output.
+
+--hadiths repeats an export's texts up to that many records, so the Riyad
+as-Salihin export in the repository can stand in for a Bukhari-sized
+collection (7563 hadiths); a scraped Bukhari export gives its real texts.
+
+Usage:
+    python scripts/bench-hadith-normalize.py data/riyadussalihin-full.json
+    python scripts/bench-hadith-normalize.py data/riyadussalihin-full.json --hadiths 7563
+"""
+
+import importlib.util
+import json
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts next to this file"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+scraper = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+
+ARABIC_FOLDS = {
+    'ـ': '', 'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ة': 'ه', 'ى': 'ي',
+    **{chr(0x0660 + d): str(d) for d in range(10)},
+    **{chr(0x06F0 + d): str(d) for d in range(10)},
+}
+ENGLISH_DROPPED = "'`´‘’ʼʾʿ"
+
+
+def by_category(char: str):
+    """' ' for punctuation and symbols, '' for format characters and marks, else None"""
+    category = unicodedata.category(char)
+    if category[0] in 'PS':
+        return ' '
+    if category in ('Cf', 'Mn', 'Me'):
+        return ''
+    return None
+
+
+def reference_arabic(text: str) -> Tuple[str, int]:
+    """Arabic search form, one character at a time"""
+    out = []
+    for char in text:
+        if char in ARABIC_FOLDS:
+            out.append(ARABIC_FOLDS[char])
+            continue
+        replaced = by_category(char)
+        if replaced is not None:
+            out.append(replaced)
+        elif 0xFB50 <= ord(char) < 0xFE00 or 0xFE70 <= ord(char) < 0xFF00:
+            out.append(reference_arabic(unicodedata.normalize('NFKC', char))[0] or ' ')
+        else:
+            out.append(char)
+    words = ''.join(out).split()
+    return ' '.join(words), len(words)
+
+
+def reference_english(text: str) -> Tuple[str, int]:
+    """English search form, one character at a time"""
+    out = []
+    for char in text.lower():
+        if char in ENGLISH_DROPPED:
+            continue
+        if char == 'ﷺ':
+            out.append(' ')
+            continue
+        replaced = by_category(char)
+        if replaced is not None:
+            out.append(replaced)
+            continue
+        if 'LATIN' in unicodedata.name(char, ''):
+            base = unicodedata.normalize('NFKD', char)
+            if len(base) > 1 and all(unicodedata.combining(c) for c in base[1:]):
+                char = base[0]
+        out.append(char)
+    words = ''.join(out).split()
+    return ' '.join(words), len(words)
+
+
+def best_time(normalize: Callable, texts: List[str], repeat: int) -> Tuple[float, List]:
+    """Fastest of `repeat` passes over the texts, and the results of the last"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [normalize(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Time the Arabic and English search forms of hadith texts'
+    )
+    parser.add_argument(
+        'export_file',
+        help='Full JSON export to take texts from (e.g. data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--hadiths',
+        type=int,
+        default=0,
+        help="Repeat the export's texts up to this many records (default: the export as is)"
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Passes per implementation; the fastest counts (default: 3)'
+    )
+
+    args = parser.parse_args()
+
+    with open(args.export_file, 'r', encoding='utf-8') as f:
+        hadiths = json.load(f)['hadiths']
+    count = args.hadiths or len(hadiths)
+    hadiths = [hadiths[i % len(hadiths)] for i in range(count)]
+
+    print(f"Records: {count} from {args.export_file}\n")
+    print(f"{'text':<8} {'impl':<10} {'MB':>7} {'seconds':>8} {'MB/s':>7} {'hadiths/s':>10} {'tokens':>9}")
+    print('-' * 65)
+
+    failed = False
+    for language, field, fast, reference in (
+        ('arabic', 'arabic_text', scraper.arabic_search_text, reference_arabic),
+        ('english', 'english_text', scraper.english_search_text, reference_english),
+    ):
+        texts = [h[field] for h in hadiths]
+        megabytes = sum(len(text.encode('utf-8')) for text in texts) / 1e6
+        outputs = {}
+        for impl, normalize in (('table', fast), ('per-char', reference)):
+            seconds, results = best_time(normalize, texts, args.repeat)
+            outputs[impl] = (seconds, results)
+            tokens = sum(n for _, n in results)
+            print(f"{language:<8} {impl:<10} {megabytes:>7.1f} {seconds:>8.3f} "
+                  f"{megabytes / seconds:>7.1f} {count / seconds:>10,.0f} {tokens:>9,}")
+        (fast_s, fast_results), (slow_s, slow_results) = outputs['table'], outputs['per-char']
+        differ = sum(1 for a, b in zip(fast_results, slow_results) if a != b)
+        if differ:
+            print(f"✗ {language}: {differ} of {count} texts differ from the per-character version")
+            failed = True
+        else:
+            print(f"✓ {language}: identical to the per-character version, {slow_s / fast_s:.1f}x faster")
+        print()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Micro-benchmark for the hadith scraper's parser backends.
+Renders a fixed corpus of sunnah.com-style pages from a scraper export (the
+same markup the local stand-in server serves), parses it with every backend,
+reports per-page timings and checks that all backends produce identical records.
+
+Usage:
+    python scripts/bench-hadith-parser.py data/riyadussalihin-full.json
+    python scripts/bench-hadith-parser.py data/riyadussalihin-full.json --pages 200 --repeat 5
+"""
+
+import importlib.util
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts next to this file"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+scraper = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+fixture = load_script('hadith_fixture_server', 'hadith-fixture-server.py')
+
+
+def build_corpus(export_file: str, pages: int) -> Tuple[List[Tuple[int, bytes]], List[Tuple[str, bytes]], str]:
+    """
+    Render the benchmark corpus.
+
+    Returns (hadith pages, book pages, collection). Hadith pages are spread
+    evenly across the export so every book is represented.
+    """
+    site = fixture.FixtureSite(export_file)
+    numbers = sorted(site.hadiths)
+    step = max(1, len(numbers) // pages) if pages else 1
+    picked = numbers[::step][:pages] if pages else numbers
+
+    hadith_pages = [
+        (n, site.page_for(f"/{site.collection}:{n}").encode('utf-8'))
+        for n in picked
+    ]
+    book_pages = [
+        (book, site.page_for(f"/{site.collection}/{book}").encode('utf-8'))
+        for book in site.books
+    ]
+    return hadith_pages, book_pages, site.collection
+
+
+def comparable(records) -> List[Dict]:
+    """Records without the per-run scrape_date"""
+    rows = []
+    for hadith in records:
+        row = asdict(hadith)
+        row.pop('scrape_date')
+        rows.append(row)
+    return rows
+
+
+def time_pages(parse, pages, repeat: int) -> Tuple[List[float], List]:
+    """Parse every page `repeat` times; returns per-page seconds and the last results"""
+    timings = []
+    results = []
+    for _ in range(repeat):
+        results = []
+        for key, content in pages:
+            start = time.perf_counter()
+            results.append(parse(content, key))
+            timings.append(time.perf_counter() - start)
+    return timings, results
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the hadith scraper parser backends'
+    )
+    parser.add_argument(
+        'export_file',
+        help='Full JSON export to render pages from (e.g. data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--pages',
+        type=int,
+        default=300,
+        help='Hadith pages in the corpus, 0 for all (default: 300)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Times each page is parsed (default: 3)'
+    )
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        choices=scraper.HadithParser.BACKENDS,
+        default=list(scraper.HadithParser.BACKENDS),
+        help='Backends to compare (default: all)'
+    )
+
+    args = parser.parse_args()
+
+    hadith_pages, book_pages, collection = build_corpus(args.export_file, args.pages)
+    print(f"Corpus: {len(hadith_pages)} hadith pages, {len(book_pages)} book pages "
+          f"({collection}), {args.repeat} runs each\n")
+
+    print(f"{'backend':<12} {'kind':<7} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'pages/s':>9}")
+    print('-' * 60)
+
+    outputs = {}
+    for backend in args.backends:
+        hadith_parser = scraper.HadithParser(collection, backend=backend)
+
+        hadith_timings, hadiths = time_pages(
+            lambda content, n: hadith_parser.parse(content, n, f"bench:{n}"),
+            hadith_pages,
+            args.repeat
+        )
+        book_timings, books = time_pages(
+            lambda content, book: hadith_parser.parse_book(content, book, f"bench/{book}"),
+            book_pages,
+            args.repeat
+        )
+
+        for kind, timings in (('hadith', hadith_timings), ('book', book_timings)):
+            mean = statistics.mean(timings)
+            print(f"{backend:<12} {kind:<7} {mean * 1000:>9.3f} "
+                  f"{percentile(timings, 50) * 1000:>9.3f} "
+                  f"{percentile(timings, 99) * 1000:>9.3f} {1 / mean:>9.0f}")
+
+        outputs[backend] = (
+            comparable(h for h in hadiths if h is not None),
+            comparable(h for page in books if page for h in page)
+        )
+
+    print()
+    reference_backend = args.backends[0]
+    mismatched = False
+    for backend in args.backends[1:]:
+        if outputs[backend] == outputs[reference_backend]:
+            print(f"✓ {backend} records match {reference_backend}")
+        else:
+            print(f"✗ {backend} records differ from {reference_backend}")
+            mismatched = True
+
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
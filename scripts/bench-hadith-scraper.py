@@ -0,0 +1,597 @@
+"""
+Offline throughput benchmark for the hadith scraper.
+Serves a scraper export, with the edge cases in
+scripts/fixtures/hadith-edge-cases.json, from the local stand-in server
+(configurable latency, jitter, injected errors and throttling). It then runs
+HadithScraper in each mode in a fresh process and reports pages/sec, p50/p99
+latency per phase (fetch, parse, store, export) and peak RSS. The scraped records are
+checked against the export and the edge-case expectations.
+
+Modes:
+    sequential  one request at a time, --delay between requests
+    concurrent  pipeline with --concurrency fetches in flight, parsing on the fetch threads
+    workers     as concurrent, parsing in --parse-workers processes (parse phase not timed)
+    bulk        whole book pages through the concurrent pipeline
+    reparse     rebuild from the raw page cache without network access
+    sharded     --shards worker processes sharing a SQLite work queue, then a shard
+                merge (phases are not timed, except the export); each worker
+                runs under a --shard-rate token bucket
+
+Usage:
+    python scripts/bench-hadith-scraper.py
+    python scripts/bench-hadith-scraper.py --latency 0.05 --jitter 0.02 --error-rate 0.02 --json bench.json
+    python scripts/bench-hadith-scraper.py --modes concurrent bulk --baseline bench.json
+    python scripts/bench-hadith-scraper.py --modes concurrent --concurrency 16 --max-inflight 4
+    python scripts/bench-hadith-scraper.py --modes concurrent sharded --concurrency 2 --shards 4
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPTS_DIR.parent
+
+MODES = ('sequential', 'concurrent', 'workers', 'bulk', 'reparse', 'sharded')
+PHASES = ('fetch', 'parse', 'store', 'export')
+
+# Fields that legitimately differ from the served export
+IGNORED_FIELDS = ('keywords', 'scrape_date', 'source_url')
+
+# p99 increases smaller than this are timer and disk noise, not regressions
+MIN_P99_CHANGE_MS = 5.0
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts next to this file"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Optional[Dict]:
+    """Count, mean, p50 and p99 in milliseconds (None without samples)"""
+    if not samples:
+        return None
+    return {
+        'count': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def peak_rss_mb(who: int) -> float:
+    """Peak resident set size of this process or its children, in MB"""
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def timed(method: Callable, samples: List[float]) -> Callable:
+    """Wrap a method so every call appends its duration to `samples`"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Child process: one scraper run
+# ---------------------------------------------------------------------------
+
+def scraper_options(args, mode: str) -> Dict:
+    """HadithScraper arguments for a mode"""
+    workdir = Path(args.workdir)
+    options = {
+        'base_url': args.base_url,
+        'parser': args.parser,
+        'delay': args.delay,
+        'output_dir': str(workdir / mode),
+    }
+    if mode in ('concurrent', 'workers', 'bulk', 'warm'):
+        options.update(concurrency=args.concurrency, rate=0)
+    if mode == 'workers':
+        options['parse_workers'] = args.parse_workers
+    if mode in ('warm', 'reparse'):
+        options['cache_dir'] = str(workdir / 'cache')
+    return options
+
+
+def run_sharded(args) -> Dict:
+    """Run --shards queue workers as scraper processes, then merge their shards here"""
+    scraper = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+    output_dir = Path(args.workdir) / 'sharded'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    command = [
+        sys.executable, str(SCRIPTS_DIR / 'scrape-hadith-universal.py'), args.collection,
+        '--base-url', args.base_url,
+        '--start', str(args.start),
+        '--end', str(args.end),
+        '--output-dir', str(output_dir),
+        '--queue', str(output_dir / 'queue.sqlite'),
+        '--range-size', '25',
+        '--concurrency', str(args.concurrency),
+        '--rate', str(args.shard_rate),
+        '--parser', args.parser,
+    ]
+
+    start = time.perf_counter()
+    workers = [
+        subprocess.Popen(
+            command + ['--worker-id', f"worker{i}", '--metrics', str(output_dir / f"worker{i}.json")],
+            stdout=subprocess.DEVNULL
+        )
+        for i in range(args.shards)
+    ]
+    if any(worker.wait() != 0 for worker in workers):
+        raise RuntimeError('a sharded worker failed')
+    elapsed = time.perf_counter() - start
+
+    samples = {phase: [] for phase in PHASES}
+    with contextlib.redirect_stdout(io.StringIO()):
+        hadith_scraper = scraper.HadithScraper(args.collection, **scraper_options(args, 'sharded'))
+        hadith_scraper.merge_shards(output_dir / 'shards')
+        start = time.perf_counter()
+        hadith_scraper.export()
+        samples['export'].append(time.perf_counter() - start)
+
+    pages = {'ok': 0, 'missing': 0, 'failed': 0}
+    for i in range(args.shards):
+        with open(output_dir / f"worker{i}.json", 'r', encoding='utf-8') as f:
+            for counter in json.load(f)['counters']:
+                if counter['name'] == 'pages' and counter['labels'].get('kind') == 'hadith':
+                    pages[counter['labels']['result']] += counter['value']
+    total = int(sum(pages.values()))
+    hadiths = hadith_scraper.scraped_count()
+    return {
+        'pages': total,
+        'hadiths': hadiths,
+        'failed': int(pages['failed']),
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(total / elapsed, 1) if elapsed else None,
+        'hadiths_per_sec': round(hadiths / elapsed, 1) if elapsed else None,
+        'phases': {phase: summarize(values) for phase, values in samples.items()},
+        'peak_rss_mb': peak_rss_mb(resource.RUSAGE_SELF),
+        'worker_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def run_mode(args) -> Dict:
+    """Run one mode in this process and return its measurements"""
+    if args.run_mode == 'sharded':
+        return run_sharded(args)
+    scraper = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+    samples = {phase: [] for phase in PHASES}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        hadith_scraper = scraper.HadithScraper(args.collection, **scraper_options(args, args.run_mode))
+
+        hadith_scraper.fetch_page = timed(hadith_scraper.fetch_page, samples['fetch'])
+        hadith_scraper.checkpoint = timed(hadith_scraper.checkpoint, samples['store'])
+        # Worker processes get a pickled parser, so their parse time is not visible here
+        if hadith_scraper.parse_workers == 0:
+            parser = hadith_scraper.parser
+            parser.parse = timed(parser.parse, samples['parse'])
+            parser.parse_book = timed(parser.parse_book, samples['parse'])
+
+        start = time.perf_counter()
+        if args.run_mode == 'bulk':
+            counts = hadith_scraper.scrape_books(args.start, args.end)
+        elif args.run_mode == 'reparse':
+            hadith_scraper.reparse_from_cache(args.start, args.end)
+            counts = {'fail': 0}
+        else:
+            counts = hadith_scraper.scrape_all(args.start, args.end)
+        elapsed = time.perf_counter() - start
+
+        if args.run_mode != 'warm':
+            start = time.perf_counter()
+            hadith_scraper.export()
+            samples['export'].append(time.perf_counter() - start)
+
+    pages = len(samples['parse'] if args.run_mode == 'reparse' else samples['fetch'])
+    hadiths = hadith_scraper.scraped_count()
+    return {
+        'pages': pages,
+        'hadiths': hadiths,
+        'failed': counts['fail'],
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 1) if elapsed else None,
+        'hadiths_per_sec': round(hadiths / elapsed, 1) if elapsed else None,
+        'phases': {phase: summarize(values) for phase, values in samples.items()},
+        'peak_rss_mb': peak_rss_mb(resource.RUSAGE_SELF),
+        'worker_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parent process: server, runs, checks and report
+# ---------------------------------------------------------------------------
+
+def start_server(args, fixture):
+    """Serve the export from a background thread on a free port"""
+    sites = [fixture.FixtureSite(args.export_file, fixture.load_edge_cases(args.edge_cases))]
+    handler, stats = fixture.make_handler(
+        sites,
+        args.latency,
+        args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        max_inflight=args.max_inflight,
+        rate_limit=args.rate_limit,
+        load_latency=args.load_latency
+    )
+    server = fixture.FixtureServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def run_child(args, mode: str, base_url: str, workdir: str) -> Dict:
+    """Run one mode in a fresh interpreter, so its peak RSS is its own"""
+    command = [
+        sys.executable, __file__, args.export_file,
+        '--run-mode', mode,
+        '--collection', args.collection,
+        '--base-url', base_url,
+        '--workdir', workdir,
+        '--start', str(args.start),
+        '--end', str(args.end),
+        '--delay', str(args.delay),
+        '--concurrency', str(args.concurrency),
+        '--parse-workers', str(args.parse_workers),
+        '--shards', str(args.shards),
+        '--shard-rate', str(args.shard_rate),
+        '--parser', args.parser,
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check_records(export_file: Path, source: Dict[int, Dict], expect: Dict[int, Optional[Dict]],
+                  start: int, end: int) -> Dict:
+    """
+    Compare the scraped records with the served export.
+    `expect` gives the fields that edge-case pages change (None: must be absent).
+    """
+    with open(export_file, 'r', encoding='utf-8') as f:
+        scraped = {h['hadith_number']: h for h in json.load(f)['hadiths']}
+
+    mismatched = []
+    for number, record in scraped.items():
+        if number in expect and expect[number] is None:
+            mismatched.append(number)
+            continue
+        expected = {**source[number], **(expect.get(number) or {})}
+        # Fields the served export predates (the search forms) follow from the texts
+        if any(record[key] != expected[key] for key in record
+               if key not in IGNORED_FIELDS and key in expected):
+            mismatched.append(number)
+
+    wanted = [n for n in range(start, end + 1) if n in source and expect.get(n, {}) is not None]
+    return {
+        'records': len(scraped),
+        'missing': sum(1 for n in wanted if n not in scraped),
+        'mismatched': sorted(mismatched),
+    }
+
+
+def expectations(edge_cases: Dict, collection: str, mode: str) -> Dict[int, Optional[Dict]]:
+    """Expected field changes by hadith number for the pages a mode reads"""
+    cases = edge_cases.get(collection, {})
+    if mode == 'bulk':
+        # Hadiths gone from the site are absent from their book pages too
+        expect = {
+            int(n): None for n, page in cases.get('hadith_pages', {}).items() if page.get('gone')
+        }
+        for page in cases.get('book_pages', {}).values():
+            expect.update({int(n): fields for n, fields in page.get('expect', {}).items()})
+        return expect
+    return {
+        int(n): page['expect']
+        for n, page in cases.get('hadith_pages', {}).items()
+        if 'expect' in page
+    }
+
+
+def find_regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Throughput, p99 and peak RSS changes beyond `tolerance` against a baseline run"""
+    regressions = []
+    for mode, current in results['modes'].items():
+        before = baseline.get('modes', {}).get(mode)
+        if not before:
+            continue
+        if current['pages_per_sec'] < before['pages_per_sec'] * (1 - tolerance):
+            regressions.append(f"{mode}: {current['pages_per_sec']} pages/s "
+                               f"(baseline {before['pages_per_sec']})")
+        for phase, stats in current['phases'].items():
+            old = before['phases'].get(phase)
+            if (stats and old and stats['p99_ms'] > old['p99_ms'] * (1 + tolerance)
+                    and stats['p99_ms'] - old['p99_ms'] > MIN_P99_CHANGE_MS):
+                regressions.append(f"{mode}: {phase} p99 {stats['p99_ms']}ms "
+                                   f"(baseline {old['p99_ms']}ms)")
+        if current['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{mode}: peak RSS {current['peak_rss_mb']}MB "
+                               f"(baseline {before['peak_rss_mb']}MB)")
+    return regressions
+
+
+def print_report(results: Dict):
+    """Human-readable table of the results"""
+    def p50_p99(stats: Optional[Dict]) -> str:
+        return f"{stats['p50_ms']:.2f}/{stats['p99_ms']:.2f}" if stats else '-'
+
+    print(f"{'mode':<11} {'pages':>6} {'pages/s':>8} {'fail':>5} "
+          f"{'fetch p50/p99':>14} {'parse p50/p99':>14} {'store p99':>10} "
+          f"{'export s':>9} {'RSS MB':>7}")
+    print('-' * 92)
+    for mode, result in results['modes'].items():
+        phases = result['phases']
+        store = phases['store']
+        export = phases['export']
+        print(f"{mode:<11} {result['pages']:>6} {result['pages_per_sec']:>8.1f} "
+              f"{result['failed']:>5} {p50_p99(phases['fetch']):>14} "
+              f"{p50_p99(phases['parse']):>14} "
+              f"{store['p99_ms'] if store else '-':>10} "
+              f"{export['mean_ms'] / 1000 if export else 0:>9.2f} "
+              f"{result['peak_rss_mb']:>7.1f}")
+
+    print()
+    for mode, result in results['modes'].items():
+        check = result['check']
+        mark = '✗' if check['mismatched'] else '✓'
+        print(f"{mark} {mode}: {check['records']} records, {check['missing']} missing, "
+              f"{len(check['mismatched'])} mismatched"
+              f"{': ' + ', '.join(map(str, check['mismatched'])) if check['mismatched'] else ''}")
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the hadith scraper against a local stand-in server'
+    )
+    parser.add_argument(
+        'export_file',
+        nargs='?',
+        default=str(REPO_DIR / 'data' / 'riyadussalihin-full.json'),
+        help='Full JSON export to serve (default: data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--edge-cases',
+        default=str(SCRIPTS_DIR / 'fixtures' / 'hadith-edge-cases.json'),
+        help='Edge-case file (default: scripts/fixtures/hadith-edge-cases.json)'
+    )
+    parser.add_argument(
+        '--modes',
+        nargs='+',
+        choices=MODES,
+        default=list(MODES),
+        help='Modes to run (default: all)'
+    )
+    parser.add_argument(
+        '--start',
+        type=int,
+        default=651,
+        help='First hadith number (default: 651)'
+    )
+    parser.add_argument(
+        '--end',
+        type=int,
+        default=900,
+        help='Last hadith number (default: 900)'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.02,
+        help='Server latency per request in seconds (default: 0.02)'
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=0.01,
+        help='Random extra server latency up to this many seconds (default: 0.01)'
+    )
+    parser.add_argument(
+        '--error-rate',
+        type=float,
+        default=0.0,
+        help='Share of requests answered with --error-status (default: 0)'
+    )
+    parser.add_argument(
+        '--error-status',
+        type=int,
+        default=503,
+        help='HTTP status of injected errors (default: 503)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=1,
+        help='Seed for jitter and error injection (default: 1)'
+    )
+    parser.add_argument(
+        '--max-inflight',
+        type=int,
+        help='Server answers 503 above this many requests in flight (default: no limit)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        help='Server answers 429 above this many requests/second (default: no limit)'
+    )
+    parser.add_argument(
+        '--load-latency',
+        type=float,
+        default=0.0,
+        help='Extra server latency per request in flight, in seconds (default: 0)'
+    )
+    parser.add_argument(
+        '--delay',
+        type=float,
+        default=0.0,
+        help='Scraper delay between requests in sequential mode (default: 0)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Requests in flight for the concurrent modes (default: 8)'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=2,
+        help='Parser processes for the workers mode (default: 2)'
+    )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=4,
+        help='Worker processes for the sharded mode, each with --concurrency (default: 4)'
+    )
+    parser.add_argument(
+        '--shard-rate',
+        type=float,
+        default=200.0,
+        help='Requests/second per sharded worker, 0 for no limit (default: 200)'
+    )
+    parser.add_argument(
+        '--parser',
+        default='compiled',
+        help='Parser backend (default: compiled)'
+    )
+    parser.add_argument(
+        '--json',
+        help='Write the results as JSON to this file'
+    )
+    parser.add_argument(
+        '--baseline',
+        help='Earlier --json results to compare against; exits non-zero on regressions'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Allowed relative change against the baseline (default: 0.25)'
+    )
+    # Internal: run a single mode and print its measurements as JSON
+    parser.add_argument('--run-mode', help=argparse.SUPPRESS)
+    parser.add_argument('--collection', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args)))
+        return
+
+    fixture = load_script('hadith_fixture_server', 'hadith-fixture-server.py')
+    with open(args.export_file, 'r', encoding='utf-8') as f:
+        export = json.load(f)
+    args.collection = export['collection']
+    source = {h['hadith_number']: h for h in export['hadiths']}
+    edge_cases = fixture.load_edge_cases(args.edge_cases)
+
+    server, stats = start_server(args, fixture)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Serving {len(source)} {export['collection_name']} hadiths at {base_url} "
+          f"(latency {args.latency}s, jitter {args.jitter}s, errors {args.error_rate:.0%})")
+    print(f"Hadiths {args.start}-{args.end}, modes: {', '.join(args.modes)}\n")
+
+    results = {
+        'benchmark': 'hadith-scraper',
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            key: getattr(args, key) for key in (
+                'export_file', 'start', 'end', 'latency', 'jitter', 'error_rate',
+                'error_status', 'seed', 'max_inflight', 'rate_limit', 'load_latency',
+                'delay', 'concurrency', 'parse_workers', 'shards', 'parser'
+            )
+        },
+        'modes': {},
+    }
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for mode in args.modes:
+                if mode == 'reparse':
+                    run_child(args, 'warm', base_url, workdir)
+                requests_before = dict(stats)
+                result = run_child(args, mode, base_url, workdir)
+                result['requests'] = stats['requests'] - requests_before['requests']
+                result['injected_errors'] = stats['errors'] - requests_before['errors']
+                result['throttled'] = stats['throttled'] - requests_before['throttled']
+                result['check'] = check_records(
+                    Path(workdir) / mode / f"{args.collection}-full.json",
+                    source,
+                    expectations(edge_cases, args.collection, mode),
+                    args.start,
+                    args.end
+                )
+                results['modes'][mode] = result
+                print(f"✓ {mode}: {result['pages']} pages in {result['seconds']}s")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print()
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"\n✓ Results written to {args.json}")
+
+    failed = any(result['check']['mismatched'] for result in results['modes'].values())
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        print()
+        if baseline.get('config') != results['config']:
+            print(f"⚠ {args.baseline} was run with different settings")
+        for regression in regressions:
+            print(f"✗ Regression: {regression}")
+        if not regressions:
+            print(f"✓ No regressions against {args.baseline}")
+        failed = failed or bool(regressions)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
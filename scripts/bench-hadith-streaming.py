@@ -0,0 +1,251 @@
+"""
+Memory check for the hadith scraper's streaming mode (--streaming).
+Writes a synthetic progress journal of --records hadiths (texts taken from a
+scraper export, numbered and shuffled across --books books), then loads and
+exports it in a fresh process with the disk-backed HadithSpool. The run fails
+if that process's peak RSS exceeds --max-rss-mb or if the exports are not
+complete and in (book, hadith) order.
+
+With --compare, the same journal is also exported with the in-memory store and
+the export digests of both runs must match.
+
+Usage:
+    python scripts/bench-hadith-streaming.py data/riyadussalihin-full.json
+    python scripts/bench-hadith-streaming.py data/riyadussalihin-full.json --records 20000 --compare
+"""
+
+import importlib.util
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+COLLECTION = 'riyadussalihin'
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts next to this file"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def write_corpus(export_file: str, journal: Path, records: int, books: int, seed: int = 1) -> int:
+    """
+    Write `records` synthetic hadiths to a progress journal in random order.
+    Every tenth record is written twice, the second time with changed text,
+    so the export must keep the latest line. Returns the bytes written.
+    """
+    with open(export_file, 'r', encoding='utf-8') as f:
+        templates = json.load(f)['hadiths']
+
+    rng = random.Random(seed)
+    numbers = list(range(1, records + 1))
+    rng.shuffle(numbers)
+    written = 0
+    with open(journal, 'w', encoding='utf-8') as f:
+        for number in numbers:
+            template = templates[number % len(templates)]
+            record = dict(
+                template,
+                collection=COLLECTION,
+                hadith_number=number,
+                book_number=1 + (number * 7919) % books,
+                reference=f"Synthetic {number}"
+            )
+            line = json.dumps(record, ensure_ascii=False) + '\n'
+            if number % 10 == 0:
+                f.write(json.dumps(dict(record, english_text='superseded'), ensure_ascii=False) + '\n')
+            f.write(line)
+            written += len(line.encode('utf-8'))
+    return written
+
+
+def run_export(workdir: Path, streaming: bool, sort_window: int) -> Dict:
+    """Load and export the journal in `workdir` (runs in the child process)"""
+    scraper_module = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+
+    start = time.perf_counter()
+    scraper = scraper_module.HadithScraper(
+        COLLECTION,
+        output_dir=str(workdir),
+        cache_dir=None,
+        streaming=streaming,
+        sort_window=sort_window
+    )
+    loaded = time.perf_counter()
+    scraper.export()
+    exported = time.perf_counter()
+
+    return {
+        'records': scraper.scraped_count(),
+        'load_s': round(loaded - start, 2),
+        'export_s': round(exported - loaded, 2),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def check_order(embedding_file: Path, records: int) -> bool:
+    """True if the embedding export holds every record once, in export order"""
+    previous = None
+    count = 0
+    with open(embedding_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            key = (record['metadata']['book_number'], int(record['id'].rsplit(':', 1)[1]))
+            if previous is not None and key <= previous:
+                return False
+            if record['text'] == 'superseded':
+                return False
+            previous = key
+            count += 1
+    return count == records
+
+
+def export_digests(workdir: Path) -> Dict[str, str]:
+    """Stable-content digests of the exports (see HadithExporter)"""
+    with open(workdir / '.export-state.json', 'r', encoding='utf-8') as f:
+        return {name: entry['sha256'] for name, entry in json.load(f).items()}
+
+
+def child(workdir: Path, streaming: bool, sort_window: int) -> Dict:
+    """Run one export in a fresh process and return its report"""
+    command = [
+        sys.executable, __file__, '--run-export', str(workdir),
+        '--sort-window', str(sort_window)
+    ]
+    if streaming:
+        command.append('--streaming')
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Export failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Check that --streaming keeps memory bounded on a large synthetic corpus'
+    )
+    parser.add_argument(
+        'export_file',
+        nargs='?',
+        help='Full JSON export to take texts from (e.g. data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--records',
+        type=int,
+        default=100000,
+        help='Synthetic hadiths in the journal (default: 100000)'
+    )
+    parser.add_argument(
+        '--books',
+        type=int,
+        default=100,
+        help='Books the hadiths are spread across (default: 100)'
+    )
+    parser.add_argument(
+        '--sort-window',
+        type=int,
+        default=2000,
+        help='Records per sorted run (default: 2000)'
+    )
+    parser.add_argument(
+        '--max-rss-mb',
+        type=float,
+        default=150,
+        help='Fail if the streaming export peaks above this RSS (default: 150)'
+    )
+    parser.add_argument(
+        '--compare',
+        action='store_true',
+        help='Also export with the in-memory store and compare the outputs'
+    )
+    parser.add_argument(
+        '--workdir',
+        help='Directory for the journal and exports (default: a temporary directory)'
+    )
+    # Internal: run one export and print its report as JSON
+    parser.add_argument('--run-export', help=argparse.SUPPRESS)
+    parser.add_argument('--streaming', action='store_true', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_export:
+        print(json.dumps(run_export(Path(args.run_export), args.streaming, args.sort_window)))
+        return
+    if not args.export_file:
+        parser.error('export_file is required')
+
+    with tempfile.TemporaryDirectory(prefix='hadith-streaming-') as tmp:
+        base = Path(args.workdir or tmp)
+        modes = [('streaming', True)] + ([('in-memory', False)] if args.compare else [])
+        for name, _ in modes:
+            (base / name).mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        journal = base / 'streaming' / f"{COLLECTION}_progress.jsonl"
+        size = write_corpus(args.export_file, journal, args.records, args.books)
+        if args.compare:
+            (base / 'in-memory' / journal.name).write_bytes(journal.read_bytes())
+        print(f"Corpus: {args.records} records, {size / 1e6:.0f} MB of JSON "
+              f"({time.perf_counter() - start:.1f}s to write)\n")
+
+        print(f"{'store':<10} {'records':>8} {'load s':>8} {'export s':>9} {'peak RSS MB':>12}")
+        print('-' * 51)
+        reports = {}
+        for name, streaming in modes:
+            report = child(base / name, streaming, args.sort_window)
+            reports[name] = report
+            print(f"{name:<10} {report['records']:>8} {report['load_s']:>8.2f} "
+                  f"{report['export_s']:>9.2f} {report['peak_rss_mb']:>12.1f}")
+
+        print()
+        failed = False
+        streaming_report = reports['streaming']
+        if streaming_report['peak_rss_mb'] <= args.max_rss_mb:
+            print(f"✓ Streaming peak RSS {streaming_report['peak_rss_mb']:.1f} MB "
+                  f"is within {args.max_rss_mb:g} MB")
+        else:
+            print(f"✗ Streaming peak RSS {streaming_report['peak_rss_mb']:.1f} MB "
+                  f"exceeds {args.max_rss_mb:g} MB")
+            failed = True
+
+        embedding_file = base / 'streaming' / f"{COLLECTION}-for-embedding.jsonl"
+        if check_order(embedding_file, args.records):
+            print(f"✓ Streaming export holds all {args.records} records in (book, hadith) order")
+        else:
+            print(f"✗ Streaming export is incomplete or out of order")
+            failed = True
+
+        if args.compare:
+            if export_digests(base / 'streaming') == export_digests(base / 'in-memory'):
+                print("✓ Streaming and in-memory exports are identical")
+            else:
+                print("✗ Streaming and in-memory exports differ")
+                failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+"""
+Offline evaluation of hadith retrieval over the scraper's exports.
+Loads <collection>-for-embedding.jsonl files and a labeled query set, ranks
+all hadiths for every query with exact cosine kNN (the ground truth) and
+scores each retrieval strategy against the labels and against that ranking:
+
+- vector: exact kNN, one query at a time
+- keyword: BM25 over the local search index (--search-index)
+- fused: reciprocal rank fusion of the keyword and vector rankings
+- hnsw: pgvector HNSW index on a local PostgreSQL, once per --ef-search value
+
+Reports recall@k and MRR against the labels, the share of the exact top k
+each strategy returns, and p50/p99 latency per query. Vectors come from the
+deterministic stand-in embedder unless --embedder says otherwise, so runs are
+reproducible without an API key or network; vectors cached by --vectors are
+reused when they were made with the same embedder. Hits on a near-duplicate
+of a relevant hadith (see --dedup) count as relevant.
+
+Query sets are JSONL, one {"query": "...", "relevant": ["riyadussalihin:47", ...]}
+per line. Without --queries, known-item queries are drawn from the corpus.
+
+Usage:
+    python scripts/eval-hadith-retrieval.py --queries scripts/fixtures/hadith-eval-queries.jsonl
+    python scripts/eval-hadith-retrieval.py --data-dir data --generate 500 --k 20
+    python scripts/eval-hadith-retrieval.py --queries queries.jsonl --pg-url postgres://localhost/hadith --ef-search 10,40,100
+"""
+
+import heapq
+import importlib.util
+import json
+import math
+import operator
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from hadith_search import HadithSearchIndex
+from hadith_vectors import EMBEDDERS, VectorMatrix, VectorSink
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Results taken from each ranking before fusing them, and the RRF constant
+FUSION_DEPTH = 50
+RRF_K = 60
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts next to this file"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+scraper = load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+
+
+def unit(vector) -> array:
+    """The vector scaled to unit length, as float32"""
+    values = array('f', vector)
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return array('f', (v / norm for v in values))
+
+
+def percentile(timings: List[float], share: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Corpus:
+    """Records of the embedding exports, with one unit-length vector each"""
+
+    def __init__(self, files: List[Path], embedder, batch_size: int = 100):
+        """
+        Args:
+            files: *-for-embedding.jsonl exports
+            embedder: Object with name, dims and embed(texts) -> vectors
+                (HashEmbedder, GeminiEmbedder)
+            batch_size: Texts per embed() call for records without cached vectors
+        """
+        self.dims = embedder.dims
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.text_hashes: List[str] = []
+        self.canonical: Dict[str, str] = {}
+        self.vectors = array('f')
+        self.cached = 0
+        self.embedded = 0
+
+        for path in files:
+            cache = self._cached_vectors(path, embedder)
+            missing = []
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.ids.append(record['id'])
+                    self.texts.append(record['text'])
+                    self.text_hashes.append(record.get('text_hash') or record['id'])
+                    self.canonical[record['id']] = record.get('canonical_id', record['id'])
+                    vector = cache.get(record['id'])
+                    if vector is None:
+                        missing.append(len(self.ids) - 1)
+                        vector = bytes(4 * self.dims)
+                    else:
+                        self.cached += 1
+                    self.vectors.frombytes(bytes(vector))
+            for i in range(0, len(missing), batch_size):
+                rows = missing[i:i + batch_size]
+                for row, vector in zip(rows, embedder.embed([self.texts[r] for r in rows])):
+                    self.vectors[row * self.dims:(row + 1) * self.dims] = unit(vector)
+            self.embedded += len(missing)
+        self.row_of = {record_id: row for row, record_id in enumerate(self.ids)}
+
+    @staticmethod
+    def _cached_vectors(path: Path, embedder) -> Dict[str, array]:
+        """Record id -> vector from the export's --vectors cache, if made with this embedder"""
+        collection = path.name[:-len(scraper.EmbeddingSink.suffix)]
+        index_file = path.with_name(collection + VectorSink.suffix)
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get('embedder') != embedder.name or index.get('dims') != embedder.dims:
+            return {}
+        try:
+            matrix = VectorMatrix(index_file.with_name(index['matrix']), embedder.dims)
+        except (OSError, ValueError) as e:
+            print(f"⚠ {e}; embedding {collection} instead")
+            return {}
+        try:
+            return {record_id: unit(matrix.row(row)) for record_id, row in index['ids'].items()}
+        finally:
+            matrix.close()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def vector(self, row: int) -> array:
+        return self.vectors[row * self.dims:(row + 1) * self.dims]
+
+
+class ExactKnn:
+    """
+    Exact cosine top k over the corpus: batched float32 matrix products with
+    NumPy, or a plain Python scan without it (much slower, same ranking)
+    """
+
+    # Queries per matrix product
+    BATCH = 256
+
+    def __init__(self, corpus: Corpus):
+        self.dims = corpus.dims
+        self.size = len(corpus)
+        if np is not None:
+            self.matrix = np.frombuffer(corpus.vectors, dtype=np.float32).reshape(self.size, self.dims)
+        else:
+            self.rows = [corpus.vector(row) for row in range(self.size)]
+
+    @property
+    def engine(self) -> str:
+        return 'NumPy' if np is not None else 'pure Python'
+
+    def search(self, queries: List[array], k: int) -> List[List[int]]:
+        """Rows of the k nearest vectors to each query (unit-length), nearest first"""
+        k = min(k, self.size)
+        if np is None:
+            return [
+                heapq.nlargest(k, range(self.size), key=[
+                    sum(map(operator.mul, query, row)) for row in self.rows
+                ].__getitem__)
+                for query in queries
+            ]
+        results = []
+        for i in range(0, len(queries), self.BATCH):
+            batch = array('f')
+            for query in queries[i:i + self.BATCH]:
+                batch.extend(query)
+            for scores in np.frombuffer(batch, dtype=np.float32).reshape(-1, self.dims) @ self.matrix.T:
+                kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+                # Ties broken by row, as in the plain Python scan
+                tied = np.flatnonzero(scores >= kth)
+                results.append(tied[np.lexsort((tied, -scores[tied]))[:k]].tolist())
+        return results
+
+
+class PgVectorIndex:
+    """
+    The corpus vectors in a temporary pgvector table with an HNSW index built
+    like hadith_embedding_hnsw_idx (vector_cosine_ops, default m and
+    ef_construction). The table goes away with the connection.
+    """
+
+    def __init__(self, url: str, corpus: Corpus):
+        try:
+            import psycopg
+        except ImportError:
+            raise RuntimeError("--pg-url needs psycopg: pip install 'psycopg[binary]'")
+        self.db = psycopg.connect(url, autocommit=True)
+        self.db.execute(
+            f'CREATE TEMP TABLE eval_embedding (item integer PRIMARY KEY, embedding vector({corpus.dims}))'
+        )
+        with self.db.cursor() as cursor:
+            with cursor.copy('COPY eval_embedding (item, embedding) FROM STDIN') as copy:
+                for row in range(len(corpus)):
+                    copy.write_row((row, self.literal(corpus.vector(row))))
+        start = time.perf_counter()
+        self.db.execute('CREATE INDEX ON eval_embedding USING hnsw (embedding vector_cosine_ops)')
+        self.build_seconds = time.perf_counter() - start
+        self.db.execute('ANALYZE eval_embedding')
+        # The planner would scan a small table instead; measure the index
+        self.db.execute('SET enable_seqscan = off')
+
+    @staticmethod
+    def literal(vector: array) -> str:
+        return '[' + ','.join(f'{v:.7g}' for v in vector) + ']'
+
+    def set_ef_search(self, ef_search: int):
+        self.db.execute(f'SET hnsw.ef_search = {int(ef_search)}')
+
+    def search(self, query: array, k: int) -> List[int]:
+        return [
+            row for row, in self.db.execute(
+                'SELECT item FROM eval_embedding ORDER BY embedding <=> %s::vector LIMIT %s',
+                (self.literal(query), k)
+            )
+        ]
+
+    def close(self):
+        self.db.close()
+
+
+def load_queries(path: Path) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def generate_queries(corpus: Corpus, count: int, seed: int = 1, words: int = 8) -> List[Dict]:
+    """
+    Known-item queries: `words` consecutive words from a random hadith. Every
+    record with the same text is relevant.
+    """
+    rng = random.Random(seed)
+    same_text: Dict[str, List[str]] = {}
+    for record_id, text_hash in zip(corpus.ids, corpus.text_hashes):
+        same_text.setdefault(text_hash, []).append(record_id)
+    candidates = [row for row, text in enumerate(corpus.texts) if len(text.split()) >= 2 * words]
+    queries = []
+    for row in rng.sample(candidates, min(count, len(candidates))):
+        tokens = corpus.texts[row].split()
+        start = rng.randrange(len(tokens) - words + 1)
+        queries.append({
+            'query': ' '.join(tokens[start:start + words]),
+            'relevant': same_text[corpus.text_hashes[row]]
+        })
+    return queries
+
+
+def fuse(*rankings: List[str]) -> List[str]:
+    """Reciprocal rank fusion: ids ordered by the sum of 1 / (RRF_K + rank)"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, record_id in enumerate(ranking, 1):
+            scores[record_id] = scores.get(record_id, 0.0) + 1.0 / (RRF_K + rank)
+    return sorted(scores, key=lambda record_id: -scores[record_id])
+
+
+def run_strategy(search: Callable[[int], List[str]], count: int) -> Tuple[List[List[str]], List[float]]:
+    """Rankings of queries 0..count-1 and the milliseconds each took"""
+    search(0)  # warm caches and connections
+    rankings, timings = [], []
+    for i in range(count):
+        start = time.perf_counter()
+        rankings.append(search(i))
+        timings.append((time.perf_counter() - start) * 1000)
+    return rankings, timings
+
+
+def score(
+    rankings: List[List[str]],
+    timings: List[float],
+    relevant: List[Set[str]],
+    exact: List[List[str]],
+    canonical: Dict[str, str],
+    k: int
+) -> Dict[str, float]:
+    """
+    Args:
+        rankings: Record ids returned for each query, best first
+        timings: Milliseconds per query
+        relevant: Canonical ids of the relevant hadiths of each query
+        exact: Exact kNN top k of each query
+        canonical: Record id -> canonical id
+        k: Cutoff
+
+    Returns:
+        recall (recall@k), mrr (MRR@k), exact (share of the exact top k
+        returned in the top k), p50_ms and p99_ms
+    """
+    recall = reciprocal = overlap = 0.0
+    for ranking, wanted, truth in zip(rankings, relevant, exact):
+        top = [canonical.get(record_id, record_id) for record_id in ranking[:k]]
+        recall += len(wanted.intersection(top)) / len(wanted)
+        reciprocal += next((1.0 / rank for rank, found in enumerate(top, 1) if found in wanted), 0.0)
+        overlap += len(set(ranking[:k]).intersection(truth)) / len(truth) if truth else 1.0
+    count = len(rankings)
+    return {
+        'recall': round(recall / count, 4),
+        'mrr': round(reciprocal / count, 4),
+        'exact': round(overlap / count, 4),
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+    }
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Measure retrieval quality and latency over exported hadiths'
+    )
+    parser.add_argument(
+        '--data-dir',
+        default='./data',
+        help='Directory with the *-for-embedding.jsonl exports (default: ./data)'
+    )
+    parser.add_argument(
+        '--collection',
+        action='append',
+        help='Only load this collection (repeatable; default: all exports)'
+    )
+    parser.add_argument(
+        '--queries',
+        help='Labeled query set (JSONL of {"query", "relevant"})'
+    )
+    parser.add_argument(
+        '--generate',
+        type=int,
+        default=200,
+        metavar='N',
+        help='Without --queries, draw N known-item queries from the corpus (default: 200)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=1,
+        help='Seed for --generate (default: 1)'
+    )
+    parser.add_argument(
+        '--k',
+        type=int,
+        default=10,
+        help='Results per query scored by recall@k and MRR@k (default: 10)'
+    )
+    parser.add_argument(
+        '--embedder',
+        choices=list(EMBEDDERS),
+        default='stand-in',
+        help='Embedder for hadiths and queries (default: stand-in, deterministic and offline)'
+    )
+    parser.add_argument(
+        '--strategies',
+        default='vector,keyword,fused,hnsw',
+        help='Comma-separated strategies to score (default: vector,keyword,fused,hnsw)'
+    )
+    parser.add_argument(
+        '--search-index',
+        help='Search index for keyword and fused (default: <data-dir>/hadith-search.sqlite)'
+    )
+    parser.add_argument(
+        '--pg-url',
+        help='PostgreSQL with pgvector for hnsw; vectors go to a temporary table'
+    )
+    parser.add_argument(
+        '--ef-search',
+        default='10,40,100',
+        help='Comma-separated hnsw.ef_search values to score (default: 10,40,100)'
+    )
+    parser.add_argument(
+        '--json',
+        metavar='FILE',
+        help='Also write the results as JSON'
+    )
+
+    args = parser.parse_args()
+
+    strategies = [name.strip() for name in args.strategies.split(',') if name.strip()]
+    unknown = set(strategies) - {'vector', 'keyword', 'fused', 'hnsw'}
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+    data_dir = Path(args.data_dir)
+    files = sorted(data_dir.glob(f"*{scraper.EmbeddingSink.suffix}"))
+    if args.collection:
+        wanted = {f"{name}{scraper.EmbeddingSink.suffix}" for name in args.collection}
+        files = [path for path in files if path.name in wanted]
+    if not files:
+        print(f"✗ No embedding exports in {data_dir} (run the scraper first)")
+        sys.exit(1)
+
+    try:
+        embedder = EMBEDDERS[args.embedder]()
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    corpus = Corpus(files, embedder)
+    print(f"Corpus: {len(corpus)} hadiths from {len(files)} exports "
+          f"({corpus.cached} cached vectors, {corpus.embedded} embedded with {embedder.name}) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    queries = load_queries(Path(args.queries)) if args.queries else generate_queries(corpus, args.generate, args.seed)
+    relevant = [
+        {corpus.canonical[record_id] for record_id in query['relevant'] if record_id in corpus.row_of}
+        for query in queries
+    ]
+    kept = [(query['query'], wanted) for query, wanted in zip(queries, relevant) if wanted]
+    if len(kept) < len(queries):
+        print(f"⚠ {len(queries) - len(kept)} queries have no relevant hadith in the loaded exports; skipped")
+    if not kept:
+        print("✗ No queries to evaluate")
+        sys.exit(1)
+    texts = [text for text, _ in kept]
+    relevant = [wanted for _, wanted in kept]
+
+    start = time.perf_counter()
+    query_vectors = [unit(vector) for vector in embedder.embed(texts)]
+    print(f"Queries: {len(texts)} {'from ' + args.queries if args.queries else 'generated'}, "
+          f"embedded in {time.perf_counter() - start:.2f}s")
+
+    knn = ExactKnn(corpus)
+    start = time.perf_counter()
+    exact = [[corpus.ids[row] for row in rows] for rows in knn.search(query_vectors, args.k)]
+    elapsed = time.perf_counter() - start
+    print(f"⏱ Exact kNN ({knn.engine}): {len(texts)} queries x {len(corpus)} hadiths in "
+          f"{elapsed:.2f}s ({len(texts) / elapsed:,.0f} queries/s)\n")
+
+    def vector(i: int, depth: int = args.k) -> List[str]:
+        return [corpus.ids[row] for row in knn.search([query_vectors[i]], depth)[0]]
+
+    # (name, search, setup run before the strategy's queries)
+    runs: List[Tuple[str, Callable[[int], List[str]], Optional[Callable]]] = []
+    if 'vector' in strategies:
+        runs.append(('vector', vector, None))
+
+    index = None
+    if 'keyword' in strategies or 'fused' in strategies:
+        index_path = Path(args.search_index or data_dir / HadithSearchIndex.FILENAME)
+        try:
+            index = HadithSearchIndex(index_path, readonly=True)
+        except FileNotFoundError:
+            print(f"⚠ {index_path} not found (export with --search-index); skipping keyword and fused")
+    if index:
+        def keyword(i: int, depth: int = args.k) -> List[str]:
+            return [
+                result['id'] for result in index.search(texts[i], limit=depth)
+                if result['id'] in corpus.row_of
+            ]
+
+        def fused(i: int) -> List[str]:
+            return fuse(keyword(i, FUSION_DEPTH), vector(i, FUSION_DEPTH))[:args.k]
+
+        if 'keyword' in strategies:
+            runs.append(('keyword', keyword, None))
+        if 'fused' in strategies:
+            runs.append(('fused', fused, None))
+
+    pg_index = None
+    if 'hnsw' in strategies:
+        if not args.pg_url:
+            print("⊙ hnsw skipped (no --pg-url)")
+        else:
+            try:
+                pg_index = PgVectorIndex(args.pg_url, corpus)
+            except Exception as e:
+                print(f"✗ Could not set up the pgvector index: {e}")
+                sys.exit(1)
+            print(f"⏱ HNSW index built in {pg_index.build_seconds:.2f}s")
+            def hnsw(i: int) -> List[str]:
+                return [corpus.ids[row] for row in pg_index.search(query_vectors[i], args.k)]
+
+            for ef_search in [int(value) for value in args.ef_search.split(',')]:
+                runs.append((f"hnsw ef={ef_search}", hnsw,
+                             lambda ef_search=ef_search: pg_index.set_ef_search(ef_search)))
+
+    results = {}
+    k = args.k
+    print()
+    print(f"{'strategy':<14} {f'recall@{k}':>10} {f'MRR@{k}':>8} {f'exact@{k}':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    print('-' * 62)
+    for name, search, setup in runs:
+        if setup:
+            setup()
+        rankings, timings = run_strategy(search, len(texts))
+        result = score(rankings, timings, relevant, exact, corpus.canonical, k)
+        results[name] = result
+        print(f"{name:<14} {result['recall']:>10.3f} {result['mrr']:>8.3f} {result['exact']:>9.3f} "
+              f"{result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f}")
+
+    if index:
+        index.close()
+    if pg_index:
+        pg_index.close()
+
+    if args.json:
+        report = {
+            'embedder': embedder.name,
+            'knn': knn.engine,
+            'hadiths': len(corpus),
+            'queries': len(texts),
+            'k': k,
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
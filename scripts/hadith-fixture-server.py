@@ -0,0 +1,487 @@
+"""
+Local stand-in for sunnah.com used to exercise the hadith scraper offline.
+Renders sunnah.com-style hadith pages (/{collection}:{n}), book pages
+(/{collection}/{book}) and collection index pages (/{collection}) from
+existing scraper exports (one per collection), and adds artificial latency so
+concurrency and rate limiting can be measured.
+
+An edge-case file (scripts/fixtures/hadith-edge-cases.json) alters chosen pages
+to cover markup the scraper must cope with: no breadcrumb, no book header, no
+chapter header, several grading rows or a missing hadith container, or remove
+a hadith altogether to mimic sparse numbering. A share of
+requests can fail with an injected error status, and the server can throttle
+on purpose like an overloaded site: 503 above a number of requests in flight,
+429 with Retry-After above a request rate, and latency that grows with load.
+
+Usage:
+    python scripts/hadith-fixture-server.py data/riyadussalihin-full.json --latency 0.2
+    python scripts/hadith-fixture-server.py data/riyadussalihin-full.json \\
+        --edge-cases scripts/fixtures/hadith-edge-cases.json --error-rate 0.05
+    python scripts/hadith-fixture-server.py data/riyadussalihin-full.json \\
+        --max-inflight 6 --rate-limit 40 --load-latency 0.01
+    python scripts/scrape-hadith-universal.py riyadussalihin \\
+        --base-url http://127.0.0.1:8765 --concurrency 8 --rate 0
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def render_hadith(hadith: Dict, grading_rows: Optional[List[List[str]]] = None) -> str:
+    """
+    Render one hadith container the way sunnah.com marks it up.
+    `grading_rows` replaces the single (graded_by, grade) row with several.
+    """
+    collection = hadith['collection']
+    book_number = hadith.get('book_number') or 0
+    in_book = hadith.get('hadith_number_in_book')
+
+    rows = [
+        f'<tr><td><b>Reference</b></td><td>&nbsp;:&nbsp;'
+        f'<a href="/{collection}:{hadith["hadith_number"]}">{escape(hadith["reference"])}</a></td></tr>'
+    ]
+    if book_number and in_book:
+        rows.append(
+            f'<tr><td>In-book reference</td><td>&nbsp;:&nbsp;'
+            f'Book {book_number}, Hadith {in_book}</td></tr>'
+        )
+
+    if grading_rows is None and hadith.get('graded_by'):
+        grading_rows = [[hadith['graded_by'], hadith['grade']]]
+    grading = ""
+    if grading_rows:
+        grading = '<table class="hadith_grading">' + ''.join(
+            f'<tr><td>{escape(scholar)}</td><td>{escape(grade)}</td></tr>'
+            for scholar, grade in grading_rows
+        ) + '</table>'
+
+    return f"""
+<a name="{hadith['hadith_number']}"></a>
+<div class="actualHadithContainer hadith_container_{collection}">
+  <div class="englishcontainer">
+    <div class="english_hadith_full">
+      <div class="hadith_narrated"><p>{escape(hadith.get('narrator_chain', ''))}</p></div>
+      <div class="text_details"><p>{escape(hadith.get('english_text', ''))}</p></div>
+    </div>
+  </div>
+  <div class="arabic_hadith_full arabic">{escape(hadith.get('arabic_text', ''))}</div>
+  <div class="bottomItems">
+    {grading}
+    <table class="hadith_reference">{''.join(rows)}</table>
+  </div>
+</div>
+"""
+
+
+def render_chapter(hadith: Dict) -> str:
+    """Render the chapter header that precedes a hadith"""
+    parts = []
+    if hadith.get('chapter_number'):
+        parts.append(f'<div class="echapno">({hadith["chapter_number"]})</div>')
+    if hadith.get('chapter_name'):
+        parts.append(f'<div class="englishchapter">Chapter: {escape(hadith["chapter_name"])}</div>')
+    return f'\n<div class="chapter">{"".join(parts)}</div>\n'
+
+
+def book_id(hadith: Dict) -> str:
+    """Book page id: the book number, or 'introduction' for unnumbered books"""
+    return str(hadith.get('book_number') or 'introduction')
+
+
+def render_index(collection: str, collection_name: str, books: Dict[str, List[Dict]]) -> str:
+    """Render the collection index page: one link per book, among other site links"""
+    titles = ''.join(
+        f"""
+<div class="book_title title">
+  <a href="/{collection}/{book}">
+    <div class="book_number title">{escape(book.title())}</div>
+    <div class="english english_book_name">{escape(hadiths[0].get('book_name', ''))}</div>
+  </a>
+</div>"""
+        for book, hadiths in books.items()
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{escape(collection_name)}</title></head>
+<body>
+<ol class="breadcrumb"><li><a href="/">Home</a></li><li>{escape(collection_name)}</li></ol>
+<div class="collection_info"><a href="/{collection}/about">About {escape(collection_name)}</a></div>
+<div class="book_titles">{titles}
+</div>
+</body></html>
+"""
+
+
+def render_page(
+    collection_name: str,
+    hadiths: List[Dict],
+    single: bool,
+    page_options: Optional[Dict] = None,
+    hadith_options: Optional[Dict[int, Dict]] = None
+) -> str:
+    """
+    Render a full page with breadcrumb, book header and hadith containers.
+    `single` renders a per-hadith page, otherwise a whole book page.
+
+    Edge cases: `page_options` can drop the "breadcrumb" or "book_info"
+    block; `hadith_options` (by hadith number) can drop a hadith's
+    "container" or the "chapter" header before it, or give it several
+    "grading" rows.
+    """
+    page_options = page_options or {}
+    hadith_options = hadith_options or {}
+    first = hadiths[0]
+    collection = first['collection']
+    book_number = first.get('book_number') or ''
+
+    crumbs = [
+        '<li><a href="/">Home</a></li>',
+        f'<li><a href="/{collection}">{escape(collection_name)}</a></li>',
+        f'<li><a href="/{collection}/{book_id(first)}">{escape(first.get("book_name", ""))}</a></li>',
+    ]
+    if single and first.get('chapter_name'):
+        crumbs.append(f'<li>{escape(first["chapter_name"])}</li>')
+        crumbs.append(f'<li>{escape(first["reference"])}</li>')
+
+    body = []
+    chapter = None
+    for hadith in hadiths:
+        options = hadith_options.get(hadith['hadith_number'], {})
+        if (hadith.get('chapter_number'), hadith.get('chapter_name')) != chapter:
+            chapter = (hadith.get('chapter_number'), hadith.get('chapter_name'))
+            if options.get('chapter', True):
+                body.append(render_chapter(hadith))
+        if options.get('container', True):
+            body.append(render_hadith(hadith, options.get('grading')))
+
+    breadcrumb = ''
+    if page_options.get('breadcrumb', True):
+        breadcrumb = f'<ol class="breadcrumb">{"".join(crumbs)}</ol>'
+    book_info = ''
+    if page_options.get('book_info', True):
+        book_info = f"""<div class="book_info">
+  <div class="book_page_number">{book_number}</div>
+  <div class="book_page_english_name">{escape(first.get('book_name', ''))}</div>
+</div>"""
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{escape(collection_name)}</title></head>
+<body>
+{breadcrumb}
+{book_info}
+<div class="AllHadith">
+{''.join(body)}
+</div>
+</body></html>
+"""
+
+
+def load_edge_cases(edge_cases_file: Optional[str]) -> Dict[str, Dict]:
+    """
+    Read an edge-case file: per collection, page options for "hadith_pages"
+    (by hadith number) and "book_pages" (by book id). A book page takes the
+    options of the hadiths it lists from its own "hadiths" entry.
+    """
+    if not edge_cases_file:
+        return {}
+    with open(edge_cases_file, 'r', encoding='utf-8') as f:
+        return json.load(f)['collections']
+
+
+class FixtureSite:
+    """In-memory corpus loaded from a scraper export (*-full.json)"""
+
+    def __init__(self, export_file: str, edge_cases: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            export_file: Full JSON export to serve
+            edge_cases: Edge cases by collection, as read by load_edge_cases()
+        """
+        with open(export_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.collection = data['collection']
+        self.collection_name = data['collection_name']
+        cases = (edge_cases or {}).get(self.collection, {})
+        self.hadith_pages = {int(n): options for n, options in cases.get('hadith_pages', {}).items()}
+        self.book_pages = cases.get('book_pages', {})
+
+        # Hadiths marked "gone" are left out entirely: 404 and absent from their book page
+        gone = {n for n, options in self.hadith_pages.items() if options.get('gone')}
+        hadiths = [h for h in data['hadiths'] if h['hadith_number'] not in gone]
+        self.hadiths = {h['hadith_number']: h for h in hadiths}
+        self.books: Dict[str, List[Dict]] = {}
+        for hadith in sorted(hadiths, key=lambda h: h['hadith_number']):
+            self.books.setdefault(book_id(hadith), []).append(hadith)
+
+    def page_for(self, path: str) -> Optional[str]:
+        """Return the HTML for a request path, or None for a 404"""
+        if path.rstrip('/') == f'/{self.collection}':
+            return render_index(self.collection, self.collection_name, self.books)
+
+        match = re.fullmatch(rf'/{re.escape(self.collection)}:(\d+)', path)
+        if match:
+            hadith = self.hadiths.get(int(match.group(1)))
+            if hadith:
+                options = self.hadith_pages.get(hadith['hadith_number'], {})
+                return render_page(
+                    self.collection_name,
+                    [hadith],
+                    single=True,
+                    page_options=options,
+                    hadith_options={hadith['hadith_number']: options}
+                )
+            return None
+
+        match = re.fullmatch(rf'/{re.escape(self.collection)}/(\w+)', path)
+        if match and match.group(1) in self.books:
+            options = self.book_pages.get(match.group(1), {})
+            return render_page(
+                self.collection_name,
+                self.books[match.group(1)],
+                single=False,
+                page_options=options,
+                hadith_options={int(n): o for n, o in options.get('hadiths', {}).items()}
+            )
+        return None
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Threaded server with a backlog large enough for concurrent scrapes"""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_handler(
+    sites: List[FixtureSite],
+    latency: float,
+    jitter: float,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    retry_after: Optional[float] = None,
+    seed: Optional[int] = None,
+    max_inflight: Optional[int] = None,
+    rate_limit: Optional[float] = None,
+    load_latency: float = 0.0
+):
+    """
+    Build a request handler serving one or more fixture sites.
+
+    Args:
+        sites: Fixture sites to serve
+        latency: Artificial latency per request in seconds
+        jitter: Random extra latency up to this many seconds
+        error_rate: Share of requests answered with `error_status` instead
+        error_status: HTTP status of injected errors
+        retry_after: Retry-After header (seconds) sent with injected errors
+        seed: Seed for jitter and error injection, for repeatable runs
+        max_inflight: Answer 503 while this many requests are being served
+        rate_limit: Answer 429 with Retry-After above this many requests per second
+        load_latency: Extra latency per request already in flight, in seconds
+    """
+    stats = {'requests': 0, 'not_modified': 0, 'errors': 0, 'throttled': 0, 'peak_inflight': 0}
+    state = {'inflight': 0, 'tokens': rate_limit or 0.0, 'updated': time.monotonic()}
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    def throttle() -> Optional[Tuple[int, Optional[float]]]:
+        """(status, Retry-After) when the request must be refused; call with the lock held"""
+        if max_inflight and state['inflight'] >= max_inflight:
+            return 503, None
+        if rate_limit:
+            now = time.monotonic()
+            state['tokens'] = min(rate_limit, state['tokens'] + (now - state['updated']) * rate_limit)
+            state['updated'] = now
+            if state['tokens'] < 1:
+                return 429, max(1.0, math.ceil((1 - state['tokens']) / rate_limit))
+            state['tokens'] -= 1
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats['requests'] += 1
+                refused = throttle()
+                if refused:
+                    stats['throttled'] += 1
+                else:
+                    delay = latency + rng.uniform(0, jitter) + load_latency * state['inflight']
+                    state['inflight'] += 1
+                    stats['peak_inflight'] = max(stats['peak_inflight'], state['inflight'])
+                    failed = error_rate > 0 and rng.random() < error_rate
+                    if failed:
+                        stats['errors'] += 1
+
+            if refused:
+                self.send_error_status(*refused)
+                return
+            try:
+                self.serve(delay, failed)
+            finally:
+                with lock:
+                    state['inflight'] -= 1
+
+        def send_error_status(self, status: int, retry: Optional[float]):
+            self.send_response(status)
+            if retry is not None:
+                self.send_header('Retry-After', f'{retry:g}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def serve(self, delay: float, failed: bool):
+            if delay > 0:
+                time.sleep(delay)
+
+            if failed:
+                self.send_error_status(error_status, retry_after)
+                return
+
+            path = self.path.split('?')[0]
+            page = next(
+                (page for page in (site.page_for(path) for site in sites) if page),
+                None
+            )
+            if page is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            body = page.encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                with lock:
+                    stats['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler, stats
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Serve sunnah.com-style pages from a scraper export'
+    )
+    parser.add_argument(
+        'export_files',
+        nargs='+',
+        help='Full JSON exports to serve, one per collection '
+             '(e.g. data/riyadussalihin-full.json)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='Port to listen on (default: 8765)'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.1,
+        help='Artificial latency per request in seconds (default: 0.1)'
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=0.0,
+        help='Random extra latency up to this many seconds (default: 0)'
+    )
+    parser.add_argument(
+        '--edge-cases',
+        help='Edge-case file altering chosen pages '
+             '(e.g. scripts/fixtures/hadith-edge-cases.json)'
+    )
+    parser.add_argument(
+        '--error-rate',
+        type=float,
+        default=0.0,
+        help='Share of requests that fail with --error-status (default: 0)'
+    )
+    parser.add_argument(
+        '--error-status',
+        type=int,
+        default=503,
+        help='HTTP status of injected errors (default: 503)'
+    )
+    parser.add_argument(
+        '--retry-after',
+        type=float,
+        help='Retry-After seconds sent with injected errors (default: none)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Seed for jitter and error injection (default: random)'
+    )
+    parser.add_argument(
+        '--max-inflight',
+        type=int,
+        help='Answer 503 while this many requests are being served (default: no limit)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        help='Answer 429 with Retry-After above this many requests/second (default: no limit)'
+    )
+    parser.add_argument(
+        '--load-latency',
+        type=float,
+        default=0.0,
+        help='Extra latency per request already in flight, in seconds (default: 0)'
+    )
+
+    args = parser.parse_args()
+
+    edge_cases = load_edge_cases(args.edge_cases)
+    sites = [FixtureSite(export_file, edge_cases) for export_file in args.export_files]
+    handler, stats = make_handler(
+        sites,
+        args.latency,
+        args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        max_inflight=args.max_inflight,
+        rate_limit=args.rate_limit,
+        load_latency=args.load_latency
+    )
+    server = FixtureServer(('127.0.0.1', args.port), handler)
+
+    for site in sites:
+        print(f"✓ Serving {len(site.hadiths)} {site.collection_name} hadiths")
+    print(f"✓ Listening at http://127.0.0.1:{args.port} (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n✓ Served {stats['requests']} requests "
+              f"({stats['not_modified']} not modified, {stats['errors']} injected errors, "
+              f"{stats['throttled']} throttled, peak {stats['peak_inflight']} in flight)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+// Hadith export records (the scraper's full JSON) and the HadithText rows
+// they become, shared by ingest-hadith.ts and bench-hadith-copy.ts
+
+import { createHash } from "node:crypto";
+import fs from "node:fs";
+
+export type HadithData = {
+  collection: string;
+  collection_name: string;
+  hadith_number: number;
+  reference: string;
+  english_text: string;
+  arabic_text: string;
+  book_number: number;
+  book_name: string;
+  chapter_number: number;
+  chapter_name: string;
+  grade: string;
+  narrator_chain: string;
+  source_url: string;
+};
+
+// Search forms of a record's texts, derived by the scraper for its embedding
+// export (the full export leaves them out)
+export type SearchForms = {
+  english_normalized: string;
+  arabic_normalized: string;
+  english_tokens: number;
+  arabic_tokens: number;
+};
+
+export type HadithCollection = {
+  collection: string;
+  collection_name: string;
+  total_hadiths: number;
+  export_date: string;
+  hadiths: HadithData[];
+};
+
+export type HadithRow = {
+  id: string;
+  collection: string;
+  collectionName: string;
+  hadithNumber: number;
+  reference: string;
+  englishText: string;
+  arabicText: string;
+  bookNumber: number | null;
+  bookName: string | null;
+  chapterNumber: number | null;
+  chapterName: string | null;
+  grade: string | null;
+  narratorChain: string | null;
+  sourceUrl: string | null;
+  englishNormalized: string | null;
+  arabicNormalized: string | null;
+  englishTokenCount: number | null;
+  arabicTokenCount: number | null;
+};
+
+// Namespace of the scraper's HADITH_UUID_NAMESPACE,
+// uuid5(NAMESPACE_URL, "https://sunnah.com/")
+const HADITH_UUID_NAMESPACE = Buffer.from(
+  "f4c7dd263e795a6a8bbc579a927ba7ec",
+  "hex"
+);
+
+// The scraper's hadith_uuid: a version 5 UUID of
+// "<collection>:<hadith_number>", so every ingestion path gives a hadith the
+// id its embedding export refers to
+export function hadithRowId(collection: string, hadithNumber: number): string {
+  const hash = createHash("sha1")
+    .update(HADITH_UUID_NAMESPACE)
+    .update(`${collection}:${hadithNumber}`)
+    .digest();
+  hash[6] = (hash[6] & 0x0f) | 0x50;
+  hash[8] = (hash[8] & 0x3f) | 0x80;
+  const hex = hash.subarray(0, 16).toString("hex");
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
+// Column order of the scraper's --pg-copy export (PgCopySink.COLUMNS)
+export const COPY_COLUMN_NAMES = [
+  "id",
+  "collection",
+  "collectionName",
+  "hadithNumber",
+  "reference",
+  "englishText",
+  "arabicText",
+  "bookNumber",
+  "bookName",
+  "chapterNumber",
+  "chapterName",
+  "grade",
+  "narratorChain",
+  "sourceUrl",
+  "englishNormalized",
+  "arabicNormalized",
+  "englishTokenCount",
+  "arabicTokenCount",
+] as const;
+
+export const COPY_COLUMNS = COPY_COLUMN_NAMES.map(
+  (column) => `"${column}"`
+).join(", ");
+
+// Search forms by record id ("<collection>:<hadith_number>") from a
+// *-for-embedding.jsonl export; empty if there is none
+export function readSearchForms(
+  embeddingPath: string
+): Map<string, SearchForms> {
+  const forms = new Map<string, SearchForms>();
+  if (!fs.existsSync(embeddingPath)) {
+    return forms;
+  }
+  for (const line of fs.readFileSync(embeddingPath, "utf-8").split("\n")) {
+    if (line.length > 0) {
+      const record = JSON.parse(line) as SearchForms & { id: string };
+      forms.set(record.id, {
+        english_normalized: record.english_normalized,
+        arabic_normalized: record.arabic_normalized,
+        english_tokens: record.english_tokens,
+        arabic_tokens: record.arabic_tokens,
+      });
+    }
+  }
+  return forms;
+}
+
+// HadithText row of an export record, with its search forms if `searchForms`
+// (see readSearchForms) has them
+export function toRow(
+  hadith: HadithData,
+  searchForms?: Map<string, SearchForms>
+): HadithRow {
+  const forms = searchForms?.get(
+    `${hadith.collection}:${hadith.hadith_number}`
+  );
+  return {
+    id: hadithRowId(hadith.collection, hadith.hadith_number),
+    collection: hadith.collection,
+    collectionName: hadith.collection_name,
+    hadithNumber: hadith.hadith_number,
+    reference: hadith.reference,
+    englishText: hadith.english_text,
+    arabicText: hadith.arabic_text,
+    bookNumber: hadith.book_number ?? null,
+    bookName: hadith.book_name || null,
+    chapterNumber: hadith.chapter_number ?? null,
+    chapterName: hadith.chapter_name || null,
+    grade: hadith.grade || null,
+    narratorChain: hadith.narrator_chain || null,
+    sourceUrl: hadith.source_url || null,
+    englishNormalized: forms?.english_normalized || null,
+    arabicNormalized: forms?.arabic_normalized || null,
+    englishTokenCount: forms?.english_tokens ?? null,
+    arabicTokenCount: forms?.arabic_tokens ?? null,
+  };
+}
@@ -0,0 +1,158 @@
+"""
+Near-duplicate hadiths across collections (--dedup): MinHash clustering of the
+English texts, and the canonical record that stands for each cluster.
+"""
+
+import random
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from hadith_records import Hadith, hadith_id, tokenize
+
+
+# Collections in order of precedence for the canonical copy of a hadith that
+# appears in several: the primary sources before the anthologies quoting them
+CANONICAL_ORDER = (
+    'bukhari', 'muslim', 'abudawud', 'tirmidhi', 'nasai', 'ibnmajah', 'malik',
+    'bulugh', 'nawawi40', 'riyadussalihin'
+)
+
+
+def canonical_rank(record_id: str) -> Tuple[int, str, int]:
+    """Sort key that puts the canonical copy of a near-duplicate cluster first"""
+    collection, _, number = record_id.rpartition(':')
+    order = CANONICAL_ORDER.index(collection) if collection in CANONICAL_ORDER else len(CANONICAL_ORDER)
+    return (order, collection, int(number))
+
+
+def canonical_id(hadith: Hadith) -> str:
+    """
+    Id of the copy that stands for the hadith's near-duplicate cluster
+    (related_hadiths, see NearDuplicates); its own id if it has none
+    """
+    own = hadith_id(hadith)
+    if not hadith.related_hadiths:
+        return own
+    return min([own, *hadith.related_hadiths], key=canonical_rank)
+
+
+class NearDuplicates:
+    """
+    Clusters of near-identical English texts across collections, found with
+    MinHash and locality-sensitive hashing (LSH).
+    
+    Each text is reduced to its set of word 3-grams. The MinHash signature
+    uses one-permutation hashing: every 3-gram hash falls into one of BINS
+    bins by its low bits and each bin keeps its smallest value; empty bins
+    copy filled ones. That costs one pass over the 3-grams
+    instead of one per hash function. The share of equal bins estimates the
+    Jaccard similarity of two texts.
+    
+    Signatures are cut into BANDS bands; texts with an equal band are
+    candidates, linked if their estimated similarity reaches the threshold.
+    With 16 bands of 4 bins, a pair at 0.7 similarity becomes a candidate
+    with probability 0.99, a pair at 0.3 about one time in eight.
+    Linked texts form the clusters.
+    """
+    
+    BINS = 64
+    BANDS = 16
+    
+    EMPTY = 0xFFFFFFFF
+    
+    def __init__(self, threshold: float = 0.7):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity of the word 3-grams at
+                which two texts count as near-duplicates
+        """
+        self.threshold = threshold
+        self.ids: List[str] = []
+        # All signatures, BINS 32-bit values per text, back to back
+        self.signatures = array('I')
+        # Where empty bins borrow from (see signature)
+        self.permutations = [random.Random(seed).sample(range(self.BINS), self.BINS) for seed in range(7)]
+        self.permutations.append(list(range(1, self.BINS)) + [0])
+    
+    def signature(self, text: str) -> Optional[List[int]]:
+        """MinHash signature of a text, or None if it has no words"""
+        words = tokenize(text)
+        if not words:
+            return None
+        if len(words) < 3:
+            shingles = {b' '.join(words)}
+        else:
+            shingles = set(map(b' '.join, zip(words, words[1:], words[2:])))
+        
+        # The low bits of a 3-gram's CRC-32 pick its bin. Hashes are sorted
+        # in descending order so the smallest per bin is written last.
+        hashes = sorted(map(zlib.crc32, shingles), reverse=True)
+        smallest = dict(zip(map((self.BINS - 1).__and__, hashes), hashes))
+        bins = [smallest.get(slot, self.EMPTY) for slot in range(self.BINS)]
+        
+        # Densify: in each round every empty bin copies the bin a fixed
+        # permutation maps it to, if that one is filled. The permutations are
+        # the same for every text, so similar texts borrow alike; the last one
+        # is a rotation, which guarantees progress.
+        rounds = 0
+        while self.EMPTY in bins:
+            permutation = self.permutations[rounds % len(self.permutations)]
+            bins = [
+                value if value != self.EMPTY else bins[source]
+                for value, source in zip(bins, permutation)
+            ]
+            rounds += 1
+        return bins
+    
+    def add(self, record_id: str, text: str):
+        """Add one record's text; records without words are ignored"""
+        bins = self.signature(text)
+        if bins is not None:
+            self.ids.append(record_id)
+            self.signatures.extend(bins)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def similarity(self, i: int, j: int) -> float:
+        """Estimated Jaccard similarity of the i-th and j-th texts"""
+        a = self.signatures[i * self.BINS:(i + 1) * self.BINS]
+        b = self.signatures[j * self.BINS:(j + 1) * self.BINS]
+        return sum(1 for x, y in zip(a, b) if x == y) / self.BINS
+    
+    def clusters(self) -> List[List[str]]:
+        """
+        Near-duplicate clusters of two or more records, each with its
+        canonical record first (see canonical_rank)
+        """
+        parent = list(range(len(self.ids)))
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        rows = self.BINS // self.BANDS
+        signatures = self.signatures.tobytes()
+        width = self.BINS * 4
+        # One band at a time, so only one bucket table is held in memory
+        for band in range(self.BANDS):
+            start = band * rows * 4
+            buckets: Dict[bytes, List[int]] = {}
+            for i in range(len(self.ids)):
+                offset = i * width + start
+                bucket = buckets.setdefault(signatures[offset:offset + rows * 4], [])
+                for j in bucket:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j and self.similarity(i, j) >= self.threshold:
+                        parent[root_i] = root_j
+                bucket.append(i)
+        
+        groups: Dict[int, List[str]] = {}
+        for i, record_id in enumerate(self.ids):
+            groups.setdefault(find(i), []).append(record_id)
+        clusters = [sorted(members, key=canonical_rank) for members in groups.values() if len(members) > 1]
+        clusters.sort(key=lambda members: canonical_rank(members[0]))
+        return clusters
@@ -0,0 +1,185 @@
+"""
+Hadith records and what the scraper's exports share about them: record and
+row ids, the word tokenizer, and the interface of export sinks.
+
+Imported by scrape-hadith-universal.py and by the search, vector cache and
+near-duplicate modules next to it (hadith_search.py, hadith_vectors.py,
+hadith_dedup.py), which can be used and tested without the scraper.
+"""
+
+import hashlib
+import os
+import sys
+import uuid
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Metadata fields whose values repeat across a collection; Hadith interns them
+# so every record shares one copy of each distinct string
+INTERNED_FIELDS = (
+    'collection', 'collection_name', 'book_name', 'book_topic', 'chapter_name',
+    'chapter_topic', 'grade', 'graded_by', 'primary_narrator'
+)
+
+
+@dataclass
+class Hadith:
+    """
+    Comprehensive hadith data structure optimized for semantic search
+    Repeated metadata strings are interned (see HadithTable for the columnar
+    store used with --compact-memory)
+    """
+    # Core identifiers
+    collection: str  # bukhari, muslim, abudawud, etc.
+    collection_name: str  # "Sahih Bukhari", "Sahih Muslim", etc.
+    hadith_number: int
+    hadith_number_in_book: Optional[int] = None
+    reference: str = ""  # Full reference string
+    
+    # Content
+    english_text: str = ""
+    arabic_text: str = ""
+    
+    # Structural metadata
+    book_number: int = 0
+    book_name: str = ""
+    chapter_number: int = 0
+    chapter_name: str = ""
+    
+    # Authentication metadata
+    grade: str = ""  # Sahih, Hasan, Daif, etc.
+    graded_by: str = ""  # Scholar who graded it
+    narrator_chain: str = ""  # Full isnad
+    primary_narrator: str = ""  # First narrator (usually companion)
+    
+    # Thematic metadata
+    book_topic: str = ""  # E.g., "Prayer", "Fasting"
+    chapter_topic: str = ""
+    keywords: List[str] = field(default_factory=list)
+    
+    # Technical metadata
+    source_url: str = ""
+    scrape_date: str = ""
+    notes: str = ""
+    
+    # Cross-references (for future enhancement)
+    related_quran_verses: List[str] = field(default_factory=list)
+    related_hadiths: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        for name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+        self.keywords = [sys.intern(keyword) for keyword in self.keywords]
+    
+    def __reduce__(self):
+        # Rebuild through __init__ so records from parser processes are interned too
+        return (Hadith, tuple(getattr(self, name) for name in HADITH_FIELDS))
+
+
+# Field names in declaration order, as they appear in exports
+HADITH_FIELDS = tuple(f.name for f in fields(Hadith))
+
+
+# Words ignored by TF-IDF keyword selection and by search (as tokenize returns them)
+STOPWORDS = frozenset(word.encode('ascii') for word in '''
+    a about after again against all also am an and any are as at be because been
+    before being between both but by came can come could did do does doing down
+    during each even every for from further had has have having he her here hers
+    him himself his how i if in into is it its itself just let like made make
+    many may me might more most much must my myself no nor not now o of off on
+    once one only or other our ours out over own said same say says see shall
+    she should so some such than that the their theirs them themselves then
+    there these they this those through thus till to too two under until up
+    upon us very was we went were what when where which while who whom why will
+    with would ye yes you your yours yourself whoever whatever anyone someone
+    allah allahs messenger prophet prophets narrated reported replied asked told
+'''.split())
+
+
+# Bytes that make up words (lowercased); everything else separates words
+WORD_BYTES = bytes(
+    c | 0x20 if chr(c).isalpha() else c if chr(c).isdigit() else 0x20
+    for c in range(128)
+) + b' ' * 128
+
+
+def tokenize(text: str) -> List[bytes]:
+    """Lowercase ASCII words, with apostrophes (straight or curly) removed"""
+    if '’' in text:
+        text = text.replace('’', "'")
+    return text.encode('utf-8').translate(WORD_BYTES, b"'").split()
+
+
+# Namespace of the name-based (version 5) UUIDs used as HadithText row ids
+HADITH_UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'https://sunnah.com/')
+
+
+def hadith_id(hadith: Hadith) -> str:
+    """Stable record id used by the embedding export and ingestion"""
+    return f"{hadith.collection}:{hadith.hadith_number}"
+
+
+def hadith_uuid(hadith: Hadith) -> uuid.UUID:
+    """
+    HadithText row id derived from hadith_id, so the same hadith always gets
+    the same id and embeddings can reference it before the row is loaded
+    """
+    return uuid.uuid5(HADITH_UUID_NAMESPACE, hadith_id(hadith))
+
+
+def english_text_hash(hadith: Hadith) -> str:
+    """SHA-256 of the English text, the input to the embedding (text_hash)"""
+    return hashlib.sha256(hadith.english_text.encode('utf-8')).hexdigest()
+
+
+class ExportOutput:
+    """
+    Temporary file for one export sink.
+    Hashes everything written except volatile parts (like the export date), so
+    an unchanged export can be detected without rereading the old file.
+    """
+    
+    def __init__(self, path: Path, binary: bool = False):
+        self.path = path
+        self.tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self.binary = binary
+        self._file = open(self.tmp_path, 'wb') if binary else open(self.tmp_path, 'w', encoding='utf-8')
+        self._digest = hashlib.sha256()
+    
+    def write(self, text, volatile: bool = False):
+        """Write text, or bytes for a binary output"""
+        self._file.write(text)
+        if not volatile:
+            self._digest.update(text if self.binary else text.encode('utf-8'))
+    
+    def close(self) -> str:
+        """Close the file and return the digest of its stable content"""
+        self._file.close()
+        return self._digest.hexdigest()
+
+
+class ExportSink:
+    """One output format written by HadithExporter, one record at a time"""
+    
+    label = ''
+    suffix = ''
+    binary = False
+    
+    def __init__(self, filename: Optional[str] = None):
+        self.filename = filename
+    
+    def filename_for(self, collection: str) -> str:
+        return self.filename or f"{collection}{self.suffix}"
+    
+    def begin(self, out: ExportOutput, meta: Dict):
+        """Write anything that precedes the records"""
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        raise NotImplementedError
+    
+    def end(self, out: ExportOutput, meta: Dict):
+        """Write anything that follows the records"""
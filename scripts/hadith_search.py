@@ -0,0 +1,442 @@
+"""
+Local keyword search over exported hadiths (--search-index): the SQLite FTS5
+index that search-hadith.py queries, and the export sink that keeps it current.
+"""
+
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hadith_records import (
+    HADITH_UUID_NAMESPACE, STOPWORDS, ExportOutput, ExportSink, Hadith, hadith_id, tokenize
+)
+
+
+# Narrator name at the start of a narrator line or of primary_narrator:
+# "Narrated 'A'ishah (May Allah be pleased with her) reported:" -> 'A'ishah
+NARRATOR_NAME_RE = re.compile(
+    r"^(?:Narrated\s+)?([^(:,]{2,60}?)\s*(?:[(:,]|\s(?:reported|narrated|said)\b|$)",
+    re.IGNORECASE
+)
+
+
+def narrator_name(hadith: Hadith) -> str:
+    """Narrator's name without honorifics, from primary_narrator or the narrator line"""
+    match = NARRATOR_NAME_RE.match(hadith.primary_narrator or hadith.narrator_chain)
+    return match.group(1) if match else ''
+
+
+class HadithSearchIndex:
+    """
+    Local keyword search over exported hadiths, in one SQLite file shared by
+    all collections (see SearchIndexSink).
+    
+    - hadith_fts: FTS5 table over english_text, chapter_name and keywords
+      (porter stemming, diacritics removed), ranked with BM25
+    - terms / term_grams: vocabulary of narrators and text words with their
+      trigrams, for typo-tolerant lookups (pg_trgm-style similarity)
+    
+    Query words missing from the vocabulary are expanded with their closest
+    terms, so "patiense" still finds hadiths about patience.
+    """
+    
+    FILENAME = 'hadith-search.sqlite'
+    SCHEMA_VERSION = 1
+    
+    # BM25 weights of english_text, chapter_name and keywords
+    WEIGHTS = (1.0, 2.0, 3.0)
+    
+    # Minimum trigram similarity for a fuzzy match (as pg_trgm)
+    SIMILARITY = 0.3
+    
+    def __init__(self, path: Path, readonly: bool = False):
+        """
+        Args:
+            path: SQLite file, created on first use unless readonly
+            readonly: Open for queries only
+        """
+        self.path = Path(path)
+        if readonly:
+            if not self.path.exists():
+                raise FileNotFoundError(f"No search index at {self.path}")
+            self.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, isolation_level=None)
+            self.db.execute('PRAGMA mmap_size = 268435456')
+            self.db.execute('PRAGMA cache_size = -65536')
+            return
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, self.SCHEMA_VERSION):
+            raise ValueError(f"{self.path} has search index schema {version}, "
+                             f"expected {self.SCHEMA_VERSION}; delete it to rebuild")
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS hadiths (
+                id INTEGER PRIMARY KEY,
+                record_id TEXT NOT NULL UNIQUE,
+                collection TEXT NOT NULL,
+                hadith_number INTEGER NOT NULL,
+                book_number INTEGER NOT NULL,
+                reference TEXT NOT NULL,
+                narrator TEXT NOT NULL,
+                narrator_key TEXT NOT NULL,
+                digest BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS hadiths_collection ON hadiths (collection);
+            CREATE INDEX IF NOT EXISTS hadiths_narrator ON hadiths (narrator_key);
+            CREATE VIRTUAL TABLE IF NOT EXISTS hadith_fts USING fts5(
+                english_text, chapter_name, keywords,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS terms (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                term TEXT NOT NULL,
+                grams INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (kind, term)
+            );
+            CREATE TABLE IF NOT EXISTS term_grams (
+                kind TEXT NOT NULL,
+                gram TEXT NOT NULL,
+                grams INTEGER NOT NULL,
+                term_id INTEGER NOT NULL,
+                PRIMARY KEY (kind, gram, grams, term_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS term_counts (
+                collection TEXT NOT NULL,
+                term_id INTEGER NOT NULL,
+                hits INTEGER NOT NULL,
+                PRIMARY KEY (collection, term_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS term_counts_term ON term_counts (term_id);
+            PRAGMA user_version = {self.SCHEMA_VERSION};
+        """)
+    
+    def close(self):
+        self.db.close()
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Search form of a text: apostrophes dropped, as tokenize does (Qur'an -> Quran)"""
+        return text.replace("'", '').replace('’', '')
+    
+    @classmethod
+    def term(cls, text: str) -> str:
+        """Vocabulary form of a word or name: normalized and lowercased"""
+        return cls.normalize(text).lower()
+    
+    @staticmethod
+    def trigrams(term: str) -> set:
+        """Trigrams of each word, padded with two spaces in front and one behind"""
+        grams = set()
+        for word in term.split():
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+    
+    # -- Updates (used by SearchIndexSink) --
+    
+    def digests(self, collection: str) -> Dict[int, Tuple[int, bytes]]:
+        """Hadith number -> (row id, digest of the indexed fields) for one collection"""
+        return {
+            number: (row, digest)
+            for row, number, digest in self.db.execute(
+                'SELECT id, hadith_number, digest FROM hadiths WHERE collection = ?', (collection,)
+            )
+        }
+    
+    def put(self, row: Optional[int], hadith: Hadith, narrator: str, digest: bytes):
+        """Insert a hadith, or replace the one stored at `row`"""
+        if row is not None:
+            self.db.execute('DELETE FROM hadith_fts WHERE rowid = ?', (row,))
+            self.db.execute('DELETE FROM hadiths WHERE id = ?', (row,))
+        cursor = self.db.execute(
+            'INSERT INTO hadiths (record_id, collection, hadith_number, book_number, '
+            'reference, narrator, narrator_key, digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (hadith_id(hadith), hadith.collection, hadith.hadith_number, hadith.book_number,
+             hadith.reference, narrator, self.term(narrator), digest)
+        )
+        self.db.execute(
+            'INSERT INTO hadith_fts (rowid, english_text, chapter_name, keywords) VALUES (?, ?, ?, ?)',
+            (cursor.lastrowid, self.normalize(hadith.english_text),
+             self.normalize(hadith.chapter_name), ' '.join(hadith.keywords))
+        )
+    
+    def remove(self, rows: Iterable[int]):
+        """Remove hadiths by row id"""
+        rows = [(row,) for row in rows]
+        self.db.executemany('DELETE FROM hadith_fts WHERE rowid = ?', rows)
+        self.db.executemany('DELETE FROM hadiths WHERE id = ?', rows)
+    
+    def set_terms(self, collection: str, counts: Dict[Tuple[str, str], int]):
+        """
+        Replace a collection's vocabulary: (kind, term) -> number of hadiths.
+        Terms no collection uses any more are dropped with their trigrams.
+        """
+        ids = {
+            (kind, term): term_id
+            for term_id, kind, term in self.db.execute('SELECT id, kind, term FROM terms')
+        }
+        for key in counts:
+            if key not in ids:
+                grams = self.trigrams(key[1])
+                term_id = self.db.execute(
+                    'INSERT INTO terms (kind, term, grams) VALUES (?, ?, ?)',
+                    (key[0], key[1], len(grams))
+                ).lastrowid
+                self.db.executemany(
+                    'INSERT INTO term_grams VALUES (?, ?, ?, ?)',
+                    [(key[0], gram, len(grams), term_id) for gram in grams]
+                )
+                ids[key] = term_id
+        
+        self.db.execute('DELETE FROM term_counts WHERE collection = ?', (collection,))
+        self.db.executemany(
+            'INSERT INTO term_counts VALUES (?, ?, ?)',
+            [(collection, ids[key], hits) for key, hits in counts.items()]
+        )
+        # Separate statements: executescript would commit the open transaction
+        self.db.execute('DELETE FROM term_grams WHERE term_id NOT IN (SELECT term_id FROM term_counts)')
+        self.db.execute('DELETE FROM terms WHERE id NOT IN (SELECT term_id FROM term_counts)')
+        self.db.execute('UPDATE terms SET hits = (SELECT SUM(hits) FROM term_counts WHERE term_id = terms.id)')
+    
+    def optimize(self):
+        """Merge the full-text index into one b-tree, for faster queries"""
+        self.db.execute("INSERT INTO hadith_fts (hadith_fts) VALUES ('optimize')")
+    
+    # -- Queries --
+    
+    def similar_terms(self, text: str, kind: str = 'word', limit: int = 5) -> List[Tuple[str, float, int]]:
+        """
+        Vocabulary terms closest to `text` by trigram similarity
+        (shared trigrams / all trigrams of both), best first
+        
+        Args:
+            text: Word or name to look up, with or without typos
+            kind: 'word' (text words) or 'narrator'
+            limit: Maximum terms returned
+        
+        Returns:
+            (term, similarity, number of hadiths) tuples
+        """
+        grams = self.trigrams(self.term(text))
+        if not grams:
+            return []
+        # Similarity s needs s * |q| <= |t| <= |q| / s, which bounds the
+        # index range scanned for each trigram
+        low = math.ceil(len(grams) * self.SIMILARITY)
+        high = math.floor(len(grams) / self.SIMILARITY)
+        # Similarity is computed while grouping, so only matching terms are
+        # joined to their names
+        rows = self.db.execute(
+            f"""
+            SELECT t.term, m.similarity, t.hits FROM (
+                SELECT term_id, COUNT(*) * 1.0 / (? + grams - COUNT(*)) AS similarity
+                FROM term_grams
+                WHERE kind = ? AND gram IN ({','.join('?' * len(grams))}) AND grams BETWEEN ? AND ?
+                GROUP BY term_id HAVING similarity >= ?
+            ) m JOIN terms t ON t.id = m.term_id
+            ORDER BY m.similarity DESC, t.hits DESC, t.term LIMIT ?
+            """,
+            (len(grams), kind, *grams, low, high, self.SIMILARITY, limit)
+        )
+        return [(term, round(similarity, 3), hits) for term, similarity, hits in rows]
+    
+    def match_query(self, query: str, fuzzy: bool = True) -> str:
+        """
+        FTS5 query for free text: any of its words but stopwords, each also
+        matching its closest vocabulary terms if it is not in the vocabulary
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        # Stopwords match almost every hadith and only slow ranking down
+        tokens = [token for token in tokens if token not in STOPWORDS] or tokens
+        clauses = []
+        for token in tokens:
+            word = token.decode('ascii')
+            alternatives = [word]
+            if fuzzy and len(token) >= 4 and token.isalpha():
+                known = self.db.execute(
+                    "SELECT 1 FROM terms WHERE kind = 'word' AND term = ?", (word,)
+                ).fetchone()
+                if not known:
+                    alternatives += [term for term, _, _ in self.similar_terms(word, limit=3)]
+            clauses.append(' OR '.join(f'"{term}"' for term in alternatives))
+        return ' OR '.join(f'({clause})' for clause in clauses)
+    
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        collection: Optional[str] = None,
+        narrator: Optional[str] = None,
+        fuzzy: bool = True
+    ) -> List[Dict]:
+        """
+        Hadiths matching a free-text query, best BM25 score first
+        
+        Args:
+            query: Words to look for (any of them; more matches rank higher)
+            limit: Maximum results
+            collection: Only search this collection
+            narrator: Only hadiths from the narrator closest to this name
+            fuzzy: Expand unknown query words with similar vocabulary terms
+        
+        Returns:
+            Result dicts: id, row_id (HadithText id), collection,
+            hadith_number, reference, narrator, score and snippet
+        """
+        match = self.match_query(query, fuzzy)
+        if not match:
+            return []
+        
+        filters, params = [], [match]
+        if collection:
+            filters.append('h.collection = ?')
+            params.append(collection)
+        if narrator:
+            names = self.similar_terms(narrator, kind='narrator', limit=1)
+            if not names:
+                return []
+            filters.append('h.narrator_key = ?')
+            params.append(names[0][0])
+        params.append(limit)
+        
+        # Rank first and build snippets for the top hits only: snippet() is
+        # several times slower than bm25() and would otherwise run for every match
+        top = self.db.execute(
+            f"""
+            SELECT hadith_fts.rowid, bm25(hadith_fts, {', '.join(map(str, self.WEIGHTS))}) AS score
+            FROM hadith_fts {'JOIN hadiths h ON h.id = hadith_fts.rowid' if filters else ''}
+            WHERE hadith_fts MATCH ? {''.join(f' AND {f}' for f in filters)}
+            ORDER BY score LIMIT ?
+            """,
+            params
+        ).fetchall()
+        if not top:
+            return []
+        
+        details = {
+            row[0]: row[1:]
+            for row in self.db.execute(
+                f"""
+                SELECT h.id, h.record_id, h.collection, h.hadith_number, h.reference, h.narrator,
+                    snippet(hadith_fts, 0, '[', ']', '…', 16)
+                FROM hadith_fts JOIN hadiths h ON h.id = hadith_fts.rowid
+                WHERE hadith_fts MATCH ? AND hadith_fts.rowid IN ({','.join('?' * len(top))})
+                """,
+                (match, *(row for row, _ in top))
+            )
+        }
+        results = []
+        for row, score in top:
+            record_id, collection_key, number, reference, narrator, snippet = details[row]
+            results.append({
+                'id': record_id,
+                'row_id': str(uuid.uuid5(HADITH_UUID_NAMESPACE, record_id)),
+                'collection': collection_key,
+                'hadith_number': number,
+                'reference': reference,
+                'narrator': narrator,
+                # FTS5 reports BM25 negated (lower is better)
+                'score': round(-score, 3),
+                'snippet': snippet
+            })
+        return results
+    
+    def stats(self) -> Dict[str, int]:
+        """Hadiths per collection"""
+        return dict(self.db.execute(
+            'SELECT collection, COUNT(*) FROM hadiths GROUP BY collection ORDER BY collection'
+        ))
+
+
+class SearchIndexSink(ExportSink):
+    """
+    Updates the collection in the local search index (HadithSearchIndex,
+    hadith-search.sqlite in the output directory, shared by all collections).
+    This sink's output, <collection>-search.json, summarises what is indexed.
+    
+    Only hadiths whose indexed fields changed are rewritten; the vocabulary
+    for fuzzy lookups is rebuilt from every record, which is cheap. All
+    changes land in one transaction, committed when the export completes.
+    """
+    
+    label = 'search index'
+    suffix = '-search.json'
+    
+    def __init__(self, filename: Optional[str] = None, index_file: Optional[str] = None):
+        """
+        Args:
+            filename: Summary file name (default: <collection>-search.json)
+            index_file: SQLite file (default: hadith-search.sqlite)
+        """
+        super().__init__(filename)
+        self.index_file = index_file or HadithSearchIndex.FILENAME
+    
+    def begin(self, out: ExportOutput, meta: Dict):
+        self.index = HadithSearchIndex(meta['output_dir'] / self.index_file)
+        self.index.db.execute('BEGIN IMMEDIATE')
+        self.existing = self.index.digests(meta['collection'])
+        self.seen = set()
+        self.updated = 0
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.content = hashlib.sha256()
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        narrator = narrator_name(hadith)
+        digest = hashlib.blake2b(json.dumps(
+            [hadith.reference, hadith.book_number, narrator,
+             hadith.english_text, hadith.chapter_name, hadith.keywords],
+            ensure_ascii=False
+        ).encode('utf-8'), digest_size=16).digest()
+        self.content.update(digest)
+        
+        number = hadith.hadith_number
+        self.seen.add(number)
+        row, previous = self.existing.get(number, (None, None))
+        if previous != digest:
+            self.index.put(row, hadith, narrator, digest)
+            self.updated += 1
+        
+        words = {
+            word for word in tokenize(f"{hadith.english_text} {hadith.chapter_name}")
+            if len(word) >= 4 and word.isalpha() and word not in STOPWORDS
+        }
+        for word in words:
+            key = ('word', word.decode('ascii'))
+            self.counts[key] = self.counts.get(key, 0) + 1
+        if narrator:
+            key = ('narrator', HadithSearchIndex.term(narrator))
+            self.counts[key] = self.counts.get(key, 0) + 1
+    
+    def end(self, out: ExportOutput, meta: Dict):
+        try:
+            removed = [row for number, (row, _) in self.existing.items() if number not in self.seen]
+            self.index.remove(removed)
+            self.index.set_terms(meta['collection'], self.counts)
+            if self.updated or removed:
+                self.index.optimize()
+            self.index.db.execute('COMMIT')
+        except BaseException:
+            self.index.db.execute('ROLLBACK')
+            raise
+        finally:
+            self.index.close()
+        
+        narrators = sum(1 for kind, _ in self.counts if kind == 'narrator')
+        out.write('{\n')
+        out.write(f'  "collection": {json.dumps(meta["collection"])},\n')
+        out.write(f'  "index": {json.dumps(self.index_file)},\n')
+        out.write(f'  "records": {len(self.seen)},\n')
+        out.write(f'  "words": {len(self.counts) - narrators},\n')
+        out.write(f'  "narrators": {narrators},\n')
+        out.write(f'  "content_sha256": {json.dumps(self.content.hexdigest())}\n}}\n')
+        
+        print(f"✓ Search index: {self.updated} hadiths indexed, {len(removed)} removed, "
+              f"{len(self.seen) - self.updated} unchanged")
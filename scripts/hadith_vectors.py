@@ -0,0 +1,333 @@
+"""
+Embedding vector cache (--vectors): the float32 .npy matrix, the embedders that
+fill it, and the export sink that keeps it next to the embedding export.
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hadith_dedup import canonical_id
+from hadith_records import ExportOutput, ExportSink, Hadith, english_text_hash, hadith_id
+
+
+# Dimensions of Gemini text-embedding-004, the model ingest-hadith.ts uses
+EMBEDDING_DIMS = 768
+
+
+class VectorMatrix:
+    """
+    Float32 matrix in a .npy file (readable with numpy.load(..., mmap_mode='r')),
+    memory-mapped for reading and grown by appending rows.
+    
+    The header is padded to a fixed size so the row count can be updated in
+    place; appending never rewrites the existing rows.
+    """
+    
+    MAGIC = b'\x93NUMPY\x01\x00'
+    HEADER_SIZE = 128
+    
+    def __init__(self, path: Path, dims: int):
+        """
+        Args:
+            path: .npy file, created on the first append
+            dims: Values per row
+        
+        Raises:
+            ValueError: If the file is not a little-endian float32 matrix with
+                `dims` columns
+        """
+        self.path = Path(path)
+        self.dims = dims
+        self.rows = 0
+        self._map = None
+        if self.path.exists():
+            self.rows = self._read_header()
+            self._open_map()
+    
+    def _header(self, rows: int) -> bytes:
+        text = f"{{'descr': '<f4', 'fortran_order': False, 'shape': ({rows}, {self.dims}), }}"
+        text = text.ljust(self.HEADER_SIZE - len(self.MAGIC) - 3) + '\n'
+        return self.MAGIC + struct.pack('<H', len(text)) + text.encode('latin-1')
+    
+    def _read_header(self) -> int:
+        with open(self.path, 'rb') as f:
+            head = f.read(self.HEADER_SIZE)
+        match = re.search(rb"'descr': '<f4', 'fortran_order': False, 'shape': \((\d+), (\d+)\)", head)
+        if not head.startswith(self.MAGIC) or not match:
+            raise ValueError(f"{self.path} is not a float32 .npy matrix written by this scraper")
+        rows, dims = int(match.group(1)), int(match.group(2))
+        if dims != self.dims:
+            raise ValueError(f"{self.path} has {dims}-dimensional rows, expected {self.dims}")
+        return rows
+    
+    def _open_map(self):
+        self.close()
+        if self.rows:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+    
+    def row(self, index: int) -> array:
+        """Row `index` as an array of floats"""
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        offset = self.HEADER_SIZE + index * self.dims * 4
+        values = array('f', self._map[offset:offset + self.dims * 4])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+    
+    def append(self, vectors: List[Iterable[float]]) -> int:
+        """
+        Append rows to the end of the file.
+        
+        Returns:
+            Index of the first appended row
+        """
+        first = self.rows
+        data = array('f')
+        for vector in vectors:
+            values = array('f', vector)
+            if len(values) != self.dims:
+                raise ValueError(f"Vector has {len(values)} values, expected {self.dims}")
+            data.extend(values)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        
+        self.close()
+        mode = 'r+b' if self.path.exists() else 'wb'
+        with open(self.path, mode) as f:
+            if mode == 'wb':
+                f.write(self._header(0))
+            f.seek(self.HEADER_SIZE + first * self.dims * 4)
+            f.write(data.tobytes())
+            f.truncate()
+            self.rows = first + len(vectors)
+            f.seek(0)
+            f.write(self._header(self.rows))
+        self._open_map()
+        return first
+    
+    def copy_rows(self, keep: List[int], path: Path) -> 'VectorMatrix':
+        """
+        Write the rows in `keep`, in that order, to a new matrix at `path`;
+        this one is left unchanged
+        """
+        Path(path).unlink(missing_ok=True)
+        copy = VectorMatrix(path, self.dims)
+        for i in range(0, len(keep), 1024):
+            copy.append([self.row(index) for index in keep[i:i + 1024]])
+        return copy
+
+
+class HashEmbedder:
+    """
+    Deterministic local stand-in for the embedding API: signed feature hashing
+    of a text's words and word pairs, L2-normalised. Texts that share words get
+    similar vectors, which is enough to exercise caching and retrieval offline.
+    """
+    
+    name = 'stand-in-hash-v1'
+    
+    def __init__(self, dims: int = EMBEDDING_DIMS):
+        self.dims = dims
+    
+    def _slot(self, token: str) -> Tuple[int, float]:
+        value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+        return value % self.dims, 1.0 if value >> 63 else -1.0
+    
+    def embed(self, texts: List[str]) -> List[array]:
+        vectors = []
+        for text in texts:
+            words = re.findall(r'\w+', text.lower())
+            vector = array('f', bytes(4 * self.dims))
+            for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                index, sign = self._slot(token)
+                vector[index] += sign
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append(array('f', (v / norm for v in vector)))
+        return vectors
+
+
+class GeminiEmbedder:
+    """
+    Gemini text-embedding-004 through the Generative Language REST API, with
+    the task type lib/ai/embeddings.ts uses, so cached vectors match the ones
+    ingestion would generate. Needs GOOGLE_GENERATIVE_AI_API_KEY.
+    """
+    
+    name = 'text-embedding-004'
+    URL = 'https://generativelanguage.googleapis.com/v1beta/models/text-embedding-004:batchEmbedContents'
+    
+    def __init__(self, dims: int = EMBEDDING_DIMS, api_key: Optional[str] = None, timeout: float = 60):
+        self.dims = dims
+        self.api_key = api_key or os.environ.get('GOOGLE_GENERATIVE_AI_API_KEY')
+        if not self.api_key:
+            raise ValueError('GOOGLE_GENERATIVE_AI_API_KEY is not set')
+        self.timeout = timeout
+        import requests
+        self.session = requests.Session()
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        body = {'requests': [
+            {
+                'model': 'models/text-embedding-004',
+                'content': {'parts': [{'text': text}]},
+                'taskType': 'RETRIEVAL_QUERY'
+            }
+            for text in texts
+        ]}
+        response = self.session.post(
+            self.URL, params={'key': self.api_key}, json=body, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return [item['values'] for item in response.json()['embeddings']]
+
+
+EMBEDDERS = {'stand-in': HashEmbedder, 'gemini': GeminiEmbedder}
+
+
+class VectorSink(ExportSink):
+    """
+    Persistent embedding cache next to the embedding export:
+    <collection>-vectors.npy (float32 matrix, one row per distinct text) and
+    this sink's output, <collection>-vectors.json, mapping each record id to
+    its row and each row to the SHA-256 of its text.
+    
+    Rows whose text hash is already cached are reused, so only new or changed
+    texts are sent to the embedder; their vectors are appended to the matrix.
+    Rows no longer referenced are dropped once they outnumber the live ones.
+    
+    The index names its matrix file. Compaction writes the live rows to the
+    next generation's file (<collection>-vectors.1.npy, ...) instead of
+    replacing the matrix, so until the new index is in place the old one still
+    describes the file it names. Matrices no index names are deleted on the
+    next export.
+    """
+    
+    label = 'vector index'
+    suffix = '-vectors.json'
+    
+    def __init__(
+        self,
+        embedder,
+        filename: Optional[str] = None,
+        batch_size: int = 100,
+        canonical_only: bool = False
+    ):
+        """
+        Args:
+            embedder: Object with name, dims and embed(texts) -> vectors
+                (HashEmbedder, GeminiEmbedder)
+            filename: Index file name (default: <collection>-vectors.json)
+            batch_size: Texts per embed() call
+            canonical_only: Skip records whose near-duplicate cluster is
+                represented by another record (see canonical_id)
+        """
+        super().__init__(filename)
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.canonical_only = canonical_only
+    
+    @staticmethod
+    def _matrix_file(index_path: Path, generation: int) -> Path:
+        if generation == 0:
+            return index_path.with_suffix('.npy')
+        return index_path.with_name(f"{index_path.stem}.{generation}.npy")
+    
+    def begin(self, out: ExportOutput, meta: Dict):
+        self.generation = 0
+        self.matrix_path = self._matrix_file(out.path, 0)
+        index = {}
+        if out.path.exists():
+            try:
+                with open(out.path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+        
+        self.row_hashes: List[str] = []
+        if index.get('embedder') == self.embedder.name and index.get('dims') == self.embedder.dims:
+            self.generation = index.get('generation', 0)
+            self.matrix_path = out.path.with_name(index.get('matrix', self.matrix_path.name))
+            try:
+                self.matrix = VectorMatrix(self.matrix_path, self.embedder.dims)
+                self.row_hashes = index['text_hashes'][:self.matrix.rows]
+                # Rows appended by an export that failed before its index was
+                # written are unknown; the next append overwrites them
+                self.matrix.rows = len(self.row_hashes)
+            except ValueError as e:
+                print(f"⚠ {e}; rebuilding the vector cache")
+        if not self.row_hashes:
+            if index:
+                print(f"⚠ Vector cache was built with {index.get('embedder')}, "
+                      f"rebuilding it with {self.embedder.name}")
+            self.generation = 0
+            self.matrix_path = self._matrix_file(out.path, 0)
+            self.matrix_path.unlink(missing_ok=True)
+            self.matrix = VectorMatrix(self.matrix_path, self.embedder.dims)
+        
+        # Earlier generations, and compactions whose index was never written
+        for path in [self._matrix_file(out.path, 0), *out.path.parent.glob(f"{out.path.stem}.*.npy")]:
+            if path != self.matrix_path:
+                path.unlink(missing_ok=True)
+        
+        self.row_of = {}
+        for row, text_hash in enumerate(self.row_hashes):
+            self.row_of.setdefault(text_hash, row)
+        self.ids: Dict[str, str] = {}
+        self.pending: Dict[str, str] = {}
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        if self.canonical_only and canonical_id(hadith) != hadith_id(hadith):
+            return
+        text_hash = english_text_hash(hadith)
+        self.ids[hadith_id(hadith)] = text_hash
+        if text_hash not in self.row_of:
+            self.pending.setdefault(text_hash, hadith.english_text)
+    
+    def end(self, out: ExportOutput, meta: Dict):
+        pending = list(self.pending.items())
+        for i in range(0, len(pending), self.batch_size):
+            batch = pending[i:i + self.batch_size]
+            first = self.matrix.append(self.embedder.embed([text for _, text in batch]))
+            for offset, (text_hash, _) in enumerate(batch):
+                self.row_of[text_hash] = first + offset
+                self.row_hashes.append(text_hash)
+        
+        live = sorted({self.row_of[text_hash] for text_hash in self.ids.values()})
+        if len(self.row_hashes) - len(live) > len(live):
+            self.generation += 1
+            compacted = self.matrix.copy_rows(live, self._matrix_file(out.path, self.generation))
+            self.matrix.close()
+            self.matrix, self.matrix_path = compacted, compacted.path
+            self.row_hashes = [self.row_hashes[row] for row in live]
+            self.row_of = {text_hash: row for row, text_hash in enumerate(self.row_hashes)}
+        self.matrix.close()
+        
+        out.write('{\n')
+        out.write(f'  "embedder": {json.dumps(self.embedder.name)},\n')
+        out.write(f'  "dims": {self.embedder.dims},\n')
+        out.write(f'  "matrix": {json.dumps(self.matrix_path.name)},\n')
+        out.write(f'  "generation": {self.generation},\n')
+        out.write(f'  "rows": {len(self.row_hashes)},\n')
+        out.write(f'  "text_hashes": {json.dumps(self.row_hashes)},\n')
+        ids = {record_id: self.row_of[text_hash] for record_id, text_hash in self.ids.items()}
+        out.write(f'  "ids": {json.dumps(ids)}\n}}\n')
+        
+        reused = sum(1 for text_hash in self.ids.values() if text_hash not in self.pending)
+        print(f"✓ Vectors: {len(pending)} texts embedded with {self.embedder.name}, "
+              f"{reused} records reused cached vectors")
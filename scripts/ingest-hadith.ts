@@ -1,39 +1,86 @@
 import fs from "node:fs";
 import path from "node:path";
+import { Readable } from "node:stream";
+import { pipeline } from "node:stream/promises";
 import { config } from "dotenv";
+import { and, eq, inArray } from "drizzle-orm";
 import { drizzle } from "drizzle-orm/postgres-js";
 import postgres from "postgres";
 import { generateEmbeddings } from "@/lib/ai/embeddings";
 import { hadithEmbedding, hadithText } from "@/lib/db/schema";
+import {
+  COPY_COLUMNS,
+  type HadithCollection,
+  type HadithData,
+  type HadithRow,
+  readSearchForms,
+  toRow,
+} from "./hadith-rows";
 
 config({
   path: ".env.local",
 });
 
-type HadithData = {
-  collection: string;
-  collection_name: string;
-  hadith_number: number;
-  reference: string;
-  english_text: string;
-  arabic_text: string;
-  book_number: number;
-  book_name: string;
-  chapter_number: number;
-  chapter_name: string;
-  grade: string;
-  narrator_chain: string;
-  source_url: string;
+type EmbeddingRecord = {
+  id: string;
+  row_id: string;
+  text: string;
+  text_hash: string;
+  canonical_id?: string;
+};
+
+type VectorIndex = {
+  embedder: string;
+  dims: number;
+  matrix: string;
+  rows: number;
+  text_hashes: string[];
+  ids: Record<string, number>;
 };
 
-type HadithCollection = {
+type DeltaManifest = {
   collection: string;
-  collection_name: string;
-  total_hadiths: number;
-  export_date: string;
-  hadiths: HadithData[];
+  generated_at: string;
+  since: string | null;
+  total: number;
+  added: string[];
+  changed: string[];
+  text_changed: string[];
+  removed: string[];
+  unchanged: number;
+  applied_at?: string;
+};
+
+type Database = ReturnType<typeof drizzle>;
+
+type Transaction = Parameters<Parameters<Database["transaction"]>[0]>[0];
+
+type Embedding = {
+  hadithId: string;
+  embedding: number[];
+  content: string;
 };
 
+// `--delta` applies each collection's *-delta.json instead of a full load
+const DELTA_MODE = process.argv.includes("--delta");
+
+// `--copy` streams each collection's *-hadith-text.pgcopy with COPY FROM STDIN
+const COPY_MODE = process.argv.includes("--copy");
+
+// `--canonical-only` (with --copy) embeds one hadith per near-duplicate
+// cluster found by the scraper's --dedup; the others are stored without one
+const CANONICAL_ONLY = process.argv.includes("--canonical-only");
+
+// `--data-dir <path>` reads exports from elsewhere than scripts/data
+const dataDirFlag = process.argv.indexOf("--data-dir");
+const DATA_DIR =
+  dataDirFlag === -1
+    ? path.join(process.cwd(), "scripts", "data")
+    : path.resolve(process.argv[dataDirFlag + 1]);
+
+const INSERT_BATCH_SIZE = 500;
+const EMBEDDING_BATCH_SIZE = 100;
+
 const HADITH_FILES = [
   "bukhari-full.json",
   "muslim-full.json",
@@ -51,131 +98,72 @@ function parseHadithFile(filePath: string): HadithCollection {
   return data;
 }
 
-async function ingestHadith() {
-  console.log("🕌 Starting Hadith ingestion...\n");
-
-  if (!process.env.POSTGRES_URL) {
-    throw new Error("POSTGRES_URL is not defined");
-  }
-
-  if (!process.env.GOOGLE_GENERATIVE_AI_API_KEY) {
-    throw new Error("GOOGLE_GENERATIVE_AI_API_KEY is not defined");
-  }
+// Delta ids are "<collection>:<hadith_number>"
+function hadithNumberOf(id: string): number {
+  return Number(id.slice(id.lastIndexOf(":") + 1));
+}
 
-  // biome-ignore lint: Forbidden non-null assertion.
-  const client = postgres(process.env.POSTGRES_URL!);
-  const db = drizzle(client);
+// The scraper's delta manifest written next to a collection's full export
+function manifestPathFor(filePath: string): string {
+  return filePath.replace(/-full\.json$/, "-delta.json");
+}
 
-  const dataDir = path.join(process.cwd(), "scripts", "data");
+// The scraper's embedding export, which also carries the search forms
+function embeddingPathFor(filePath: string): string {
+  return filePath.replace(/-full\.json$/, "-for-embedding.jsonl");
+}
 
-  // Check if data directory exists
-  if (!fs.existsSync(dataDir)) {
-    throw new Error(
-      `Data directory not found: ${dataDir}. Please ensure hadith JSON files are in scripts/data/`
-    );
+// Stamps a collection's delta manifest as applied once its export has been
+// loaded by any path, so the next export starts a fresh delta instead of
+// folding in changes the database already has
+function markDeltaApplied(manifestPath: string) {
+  if (!fs.existsSync(manifestPath)) {
+    return;
   }
-
-  // Parse all hadith files
-  const allHadiths: Array<{
-    collection: string;
-    collectionName: string;
-    hadithNumber: number;
-    reference: string;
-    englishText: string;
-    arabicText: string;
-    bookNumber: number | null;
-    bookName: string | null;
-    chapterNumber: number | null;
-    chapterName: string | null;
-    grade: string | null;
-    narratorChain: string | null;
-    sourceUrl: string | null;
-  }> = [];
-
-  for (const filename of HADITH_FILES) {
-    const filePath = path.join(dataDir, filename);
-
-    if (!fs.existsSync(filePath)) {
-      console.warn(`⚠️  File not found: ${filename}, skipping...`);
-      continue;
-    }
-
-    const data = parseHadithFile(filePath);
-
-    for (const hadith of data.hadiths) {
-      allHadiths.push({
-        collection: hadith.collection,
-        collectionName: hadith.collection_name,
-        hadithNumber: hadith.hadith_number,
-        reference: hadith.reference,
-        englishText: hadith.english_text,
-        arabicText: hadith.arabic_text,
-        bookNumber: hadith.book_number ?? null,
-        bookName: hadith.book_name || null,
-        chapterNumber: hadith.chapter_number ?? null,
-        chapterName: hadith.chapter_name || null,
-        grade: hadith.grade || null,
-        narratorChain: hadith.narrator_chain || null,
-        sourceUrl: hadith.source_url || null,
-      });
-    }
+  const manifest = JSON.parse(
+    fs.readFileSync(manifestPath, "utf-8")
+  ) as DeltaManifest;
+  if (manifest.applied_at) {
+    return;
   }
+  manifest.applied_at = new Date().toISOString();
+  fs.writeFileSync(manifestPath, `${JSON.stringify(manifest, null, 2)}\n`);
+  console.log(`   ✓ Marked ${path.basename(manifestPath)} as applied`);
+}
 
-  console.log(`\n📊 Total hadiths to ingest: ${allHadiths.length}\n`);
-
-  // Insert hadiths into database in batches (to avoid stack overflow)
-  console.log("💾 Inserting hadiths into database...");
-  const INSERT_BATCH_SIZE = 500;
-  const insertedHadiths: Array<{
-    id: string;
-    collection: string;
-    collectionName: string;
-    hadithNumber: number;
-    reference: string;
-    englishText: string;
-    arabicText: string;
-    bookNumber: number | null;
-    bookName: string | null;
-    chapterNumber: number | null;
-    chapterName: string | null;
-    grade: string | null;
-    narratorChain: string | null;
-    sourceUrl: string | null;
-    createdAt: Date;
-  }> = [];
-
-  const totalInsertBatches = Math.ceil(allHadiths.length / INSERT_BATCH_SIZE);
-  for (let i = 0; i < allHadiths.length; i += INSERT_BATCH_SIZE) {
-    const batch = allHadiths.slice(i, i + INSERT_BATCH_SIZE);
+async function insertHadiths(db: Database | Transaction, rows: HadithRow[]) {
+  const inserted: Array<{ id: string; englishText: string }> = [];
+  const totalInsertBatches = Math.ceil(rows.length / INSERT_BATCH_SIZE);
+  for (let i = 0; i < rows.length; i += INSERT_BATCH_SIZE) {
+    const batch = rows.slice(i, i + INSERT_BATCH_SIZE);
     const batchNum = Math.floor(i / INSERT_BATCH_SIZE) + 1;
     process.stdout.write(
-      `   Batch ${batchNum}/${totalInsertBatches} (${i + 1}-${Math.min(i + INSERT_BATCH_SIZE, allHadiths.length)})...`
+      `   Batch ${batchNum}/${totalInsertBatches} (${i + 1}-${Math.min(i + INSERT_BATCH_SIZE, rows.length)})...`
     );
 
     const result = await db.insert(hadithText).values(batch).returning();
-    insertedHadiths.push(...result);
+    inserted.push(...result);
     console.log(" ✓");
   }
-  console.log(`✅ Inserted ${insertedHadiths.length} hadiths\n`);
+  return inserted;
+}
 
+async function generateHadithEmbeddings(
+  hadiths: Array<{ id: string; englishText: string }>
+) {
   // Generate embeddings in batches
-  const BATCH_SIZE = 100;
-  const embeddings: Array<{
-    hadithId: string;
-    embedding: number[];
-    content: string;
-  }> = [];
-  const totalBatches = Math.ceil(insertedHadiths.length / BATCH_SIZE);
+  const embeddings: Embedding[] = [];
+  const totalBatches = Math.ceil(hadiths.length / EMBEDDING_BATCH_SIZE);
 
   console.log(`🤖 Generating embeddings (${totalBatches} batches)...`);
 
-  for (let i = 0; i < insertedHadiths.length; i += BATCH_SIZE) {
-    const batch = insertedHadiths.slice(i, i + BATCH_SIZE);
+  for (let i = 0; i < hadiths.length; i += EMBEDDING_BATCH_SIZE) {
+    const batch = hadiths.slice(i, i + EMBEDDING_BATCH_SIZE);
     const texts = batch.map((h) => h.englishText);
-    const batchNumber = Math.floor(i / BATCH_SIZE) + 1;
+    const batchNumber = Math.floor(i / EMBEDDING_BATCH_SIZE) + 1;
 
     process.stdout.write(
-      `   Batch ${batchNumber}/${totalBatches} (hadiths ${i + 1}-${Math.min(i + BATCH_SIZE, insertedHadiths.length)})...`
+      `   Batch ${batchNumber}/${totalBatches} (hadiths ${i + 1}-${Math.min(i + EMBEDDING_BATCH_SIZE, hadiths.length)})...`
     );
 
     try {
@@ -192,7 +180,7 @@ async function ingestHadith() {
       console.log(" ✓");
 
       // Rate limit delay (1 second between batches)
-      if (i + BATCH_SIZE < insertedHadiths.length) {
+      if (i + EMBEDDING_BATCH_SIZE < hadiths.length) {
         await new Promise((resolve) => setTimeout(resolve, 1000));
       }
     } catch (error) {
@@ -203,18 +191,416 @@ async function ingestHadith() {
   }
 
   console.log(`\n✅ Generated ${embeddings.length} embeddings\n`);
+  return embeddings;
+}
+
+async function embedHadiths(
+  db: Database | Transaction,
+  hadiths: Array<{ id: string; englishText: string }>
+) {
+  const embeddings = await generateHadithEmbeddings(hadiths);
 
   // Insert embeddings
-  console.log("💾 Inserting embeddings into database...");
-  await db.insert(hadithEmbedding).values(embeddings);
-  console.log(`✅ Inserted ${embeddings.length} embeddings\n`);
+  if (embeddings.length > 0) {
+    console.log("💾 Inserting embeddings into database...");
+    await db.insert(hadithEmbedding).values(embeddings);
+    console.log(`✅ Inserted ${embeddings.length} embeddings\n`);
+  }
+  return embeddings.length;
+}
+
+async function deleteHadiths(
+  db: Database | Transaction,
+  collection: string,
+  hadithNumbers: number[]
+) {
+  // Embeddings go with their hadith (ON DELETE CASCADE)
+  for (let i = 0; i < hadithNumbers.length; i += INSERT_BATCH_SIZE) {
+    await db
+      .delete(hadithText)
+      .where(
+        and(
+          eq(hadithText.collection, collection),
+          inArray(
+            hadithText.hadithNumber,
+            hadithNumbers.slice(i, i + INSERT_BATCH_SIZE)
+          )
+        )
+      );
+  }
+}
+
+async function applyDelta(
+  db: Database,
+  filePath: string,
+  manifestPath: string
+) {
+  const manifest = JSON.parse(
+    fs.readFileSync(manifestPath, "utf-8")
+  ) as DeltaManifest;
+
+  if (manifest.applied_at) {
+    console.log(
+      `   ⊙ ${manifest.collection} delta already applied at ${manifest.applied_at}, skipping`
+    );
+    return { rows: 0, embeddings: 0 };
+  }
+
+  const data = parseHadithFile(filePath);
+  const searchForms = readSearchForms(embeddingPathFor(filePath));
+  const byId = new Map(
+    data.hadiths.map((h) => [`${h.collection}:${h.hadith_number}`, h])
+  );
+  console.log(
+    `   Δ ${manifest.added.length} added, ${manifest.changed.length} changed ` +
+      `(${manifest.text_changed.length} text), ${manifest.removed.length} removed, ` +
+      `${manifest.unchanged} unchanged`
+  );
+
+  // One transaction, so a failed statement or embedding batch leaves the
+  // collection and the manifest as they were and the delta can be rerun
+  const result = await db.transaction(async (tx) => {
+    await deleteHadiths(
+      tx,
+      manifest.collection,
+      manifest.removed.map(hadithNumberOf)
+    );
+
+    // Changed rows keep their id; only changed text needs a new embedding
+    const textChanged = new Set(manifest.text_changed);
+    const toEmbed: Array<{ id: string; englishText: string }> = [];
+    const missing: HadithRow[] = [];
+    for (const id of manifest.changed) {
+      const hadith = byId.get(id);
+      if (!hadith) {
+        continue;
+      }
+      // Rows from an ingestion before ids were derived keep their random id
+      const { id: rowId, ...row } = toRow(hadith, searchForms);
+      const [updated] = await tx
+        .update(hadithText)
+        .set(row)
+        .where(
+          and(
+            eq(hadithText.collection, row.collection),
+            eq(hadithText.hadithNumber, row.hadithNumber)
+          )
+        )
+        .returning();
+
+      if (!updated) {
+        missing.push({ id: rowId, ...row });
+      } else if (textChanged.has(id)) {
+        await tx
+          .delete(hadithEmbedding)
+          .where(eq(hadithEmbedding.hadithId, updated.id));
+        toEmbed.push(updated);
+      }
+    }
+
+    // Added rows replace any copy left by an earlier full ingestion
+    const added = manifest.added
+      .map((id) => byId.get(id))
+      .filter((h): h is HadithData => h !== undefined)
+      .map((h) => toRow(h, searchForms));
+    await deleteHadiths(
+      tx,
+      manifest.collection,
+      added.map((row) => row.hadithNumber)
+    );
+    const inserted = await insertHadiths(tx, [...added, ...missing]);
+    toEmbed.push(...inserted);
+
+    const embeddings = await embedHadiths(tx, toEmbed);
+
+    return {
+      rows: inserted.length + manifest.changed.length - missing.length,
+      embeddings,
+    };
+  });
+
+  markDeltaApplied(manifestPath);
+  return result;
+}
+
+async function ingestHadithDelta(db: Database) {
+  let rows = 0;
+  let embeddings = 0;
+
+  for (const filename of HADITH_FILES) {
+    const filePath = path.join(DATA_DIR, filename);
+    const manifestPath = manifestPathFor(filePath);
+
+    if (!(fs.existsSync(filePath) && fs.existsSync(manifestPath))) {
+      console.warn(`⚠️  No export or delta for ${filename}, skipping...`);
+      continue;
+    }
+
+    const result = await applyDelta(db, filePath, manifestPath);
+    rows += result.rows;
+    embeddings += result.embeddings;
+  }
+
+  console.log("🎉 Complete! Hadith delta ingestion successful!");
+  console.log("\n📊 Summary:");
+  console.log(`   - Hadiths written: ${rows}`);
+  console.log(`   - Embeddings created: ${embeddings}`);
+}
+
+// Text-format COPY escapes for one field
+function copyText(value: string): string {
+  return value
+    .replace(/\\/g, "\\\\")
+    .replace(/\t/g, "\\t")
+    .replace(/\n/g, "\\n")
+    .replace(/\r/g, "\\r");
+}
+
+// Vectors cached by the scraper's `--vectors gemini` export, by record id,
+// with the hash of the text each one was computed from
+function readCachedVectors(
+  indexPath: string
+): Map<string, { textHash: string; values: number[] }> {
+  const vectors = new Map<string, { textHash: string; values: number[] }>();
+  if (!fs.existsSync(indexPath)) {
+    return vectors;
+  }
+  const index = JSON.parse(fs.readFileSync(indexPath, "utf-8")) as VectorIndex;
+  if (index.embedder !== "text-embedding-004") {
+    return vectors;
+  }
+
+  // .npy: 8-byte magic and version, little-endian header length, header, rows
+  const matrix = fs.readFileSync(
+    path.join(path.dirname(indexPath), index.matrix)
+  );
+  const dataOffset = 10 + matrix.readUInt16LE(8);
+  for (const [id, row] of Object.entries(index.ids)) {
+    const offset = dataOffset + row * index.dims * 4;
+    const values: number[] = [];
+    for (let i = 0; i < index.dims; i++) {
+      values.push(matrix.readFloatLE(offset + i * 4));
+    }
+    vectors.set(id, { textHash: index.text_hashes[row], values });
+  }
+  return vectors;
+}
+
+async function copyEmbeddings(
+  sql: postgres.TransactionSql,
+  embeddings: Embedding[]
+) {
+  const lines = embeddings.map(
+    (e) =>
+      `${e.hadithId}\t[${e.embedding.join(",")}]\t${copyText(e.content)}\n`
+  );
+  const writable = await sql`
+    COPY "HadithEmbedding" ("hadithId", "embedding", "content") FROM STDIN
+  `.writable();
+  await pipeline(Readable.from(lines), writable);
+}
+
+async function copyCollection(
+  sql: postgres.Sql,
+  collection: string,
+  filePath: string,
+  embeddings: Embedding[]
+) {
+  // Ids are derived from "<collection>:<hadith_number>", so reloading a
+  // collection replaces its rows (embeddings cascade) instead of duplicating
+  // them. The embeddings are copied in the same transaction, so a failure
+  // leaves the collection as it was instead of without embeddings.
+  await sql.begin(async (tx) => {
+    await tx`DELETE FROM "HadithText" WHERE "collection" = ${collection}`;
+    const writable = await tx
+      .unsafe(
+        `COPY "HadithText" (${COPY_COLUMNS}) FROM STDIN (FORMAT binary)`
+      )
+      .writable();
+    await pipeline(fs.createReadStream(filePath), writable);
+    if (embeddings.length > 0) {
+      await copyEmbeddings(tx, embeddings);
+    }
+  });
+}
+
+async function ingestHadithCopy(sql: postgres.Sql) {
+  let rows = 0;
+  let created = 0;
+  let reused = 0;
+  let duplicates = 0;
+  const started = Date.now();
+
+  console.log("💾 Copying hadiths into database...");
+  for (const filename of HADITH_FILES) {
+    const copyPath = path.join(
+      DATA_DIR,
+      filename.replace(/-full\.json$/, "-hadith-text.pgcopy")
+    );
+    const embeddingPath = embeddingPathFor(path.join(DATA_DIR, filename));
+    const vectorIndexPath = path.join(
+      DATA_DIR,
+      filename.replace(/-full\.json$/, "-vectors.json")
+    );
+
+    if (!(fs.existsSync(copyPath) && fs.existsSync(embeddingPath))) {
+      console.warn(
+        `⚠️  No COPY or embedding export for ${filename}, skipping...`
+      );
+      continue;
+    }
+
+    // Row ids come precomputed with the export, so embeddings need no
+    // RETURNING round trip to find the hadith they belong to
+    const records = fs
+      .readFileSync(embeddingPath, "utf-8")
+      .split("\n")
+      .filter((line) => line.length > 0)
+      .map((line) => JSON.parse(line) as EmbeddingRecord);
+    if (records.length === 0) {
+      continue;
+    }
+
+    // Embeddings are ready before anything is deleted, so an embedding API
+    // failure leaves the database untouched
+    const vectors = readCachedVectors(vectorIndexPath);
+    const cached: Embedding[] = [];
+    const toEmbed: Array<{ id: string; englishText: string }> = [];
+    for (const record of records) {
+      if (
+        CANONICAL_ONLY &&
+        record.canonical_id &&
+        record.canonical_id !== record.id
+      ) {
+        duplicates++;
+        continue;
+      }
+      const vector = vectors.get(record.id);
+      if (vector && vector.textHash === record.text_hash) {
+        cached.push({
+          hadithId: record.row_id,
+          embedding: vector.values,
+          content: record.text,
+        });
+      } else {
+        toEmbed.push({ id: record.row_id, englishText: record.text });
+      }
+    }
+    if (cached.length > 0) {
+      console.log(`   ⊙ ${cached.length} embeddings read from the vector cache`);
+    }
+    const embeddings = [
+      ...cached,
+      ...(toEmbed.length > 0 ? await generateHadithEmbeddings(toEmbed) : []),
+    ];
+
+    const fileStarted = Date.now();
+    await copyCollection(
+      sql,
+      records[0].id.split(":")[0],
+      copyPath,
+      embeddings
+    );
+    markDeltaApplied(manifestPathFor(path.join(DATA_DIR, filename)));
+    console.log(
+      `   ✓ ${path.basename(copyPath)}: ${records.length} rows and ${embeddings.length} embeddings in ${((Date.now() - fileStarted) / 1000).toFixed(1)}s`
+    );
+    rows += records.length;
+    created += embeddings.length - cached.length;
+    reused += cached.length;
+  }
+  console.log(
+    `✅ Copied ${rows} hadiths in ${((Date.now() - started) / 1000).toFixed(1)}s\n`
+  );
+
+  if (duplicates > 0) {
+    console.log(
+      `   ⊙ ${duplicates} near-duplicates not embedded (see hadith-duplicates.json)`
+    );
+  }
+
+  console.log("🎉 Complete! Hadith COPY ingestion successful!");
+  console.log("\n📊 Summary:");
+  console.log(`   - Hadiths copied: ${rows}`);
+  console.log(`   - Embeddings created: ${created}`);
+  console.log(`   - Embeddings reused: ${reused}`);
+  console.log(`   - Near-duplicates skipped: ${duplicates}`);
+}
+
+async function ingestHadith() {
+  console.log("🕌 Starting Hadith ingestion...\n");
+
+  if (!process.env.POSTGRES_URL) {
+    throw new Error("POSTGRES_URL is not defined");
+  }
+
+  if (!process.env.GOOGLE_GENERATIVE_AI_API_KEY) {
+    throw new Error("GOOGLE_GENERATIVE_AI_API_KEY is not defined");
+  }
+
+  // biome-ignore lint: Forbidden non-null assertion.
+  const client = postgres(process.env.POSTGRES_URL!);
+  const db = drizzle(client);
+
+  // Check if data directory exists
+  if (!fs.existsSync(DATA_DIR)) {
+    throw new Error(
+      `Data directory not found: ${DATA_DIR}. Please ensure hadith JSON files are in scripts/data/`
+    );
+  }
+
+  if (DELTA_MODE) {
+    await ingestHadithDelta(db);
+    await client.end();
+    return;
+  }
+
+  if (COPY_MODE) {
+    await ingestHadithCopy(client);
+    await client.end();
+    return;
+  }
+
+  // Parse all hadith files
+  const allHadiths: HadithRow[] = [];
+  const loadedFiles: string[] = [];
+
+  for (const filename of HADITH_FILES) {
+    const filePath = path.join(DATA_DIR, filename);
+
+    if (!fs.existsSync(filePath)) {
+      console.warn(`⚠️  File not found: ${filename}, skipping...`);
+      continue;
+    }
+
+    const data = parseHadithFile(filePath);
+    const searchForms = readSearchForms(embeddingPathFor(filePath));
+    loadedFiles.push(filePath);
+
+    for (const hadith of data.hadiths) {
+      allHadiths.push(toRow(hadith, searchForms));
+    }
+  }
+
+  console.log(`\n📊 Total hadiths to ingest: ${allHadiths.length}\n`);
+
+  // Insert hadiths into database in batches (to avoid stack overflow)
+  console.log("💾 Inserting hadiths into database...");
+  const insertedHadiths = await insertHadiths(db, allHadiths);
+  console.log(`✅ Inserted ${insertedHadiths.length} hadiths\n`);
+
+  const embeddingCount = await embedHadiths(db, insertedHadiths);
+
+  for (const filePath of loadedFiles) {
+    markDeltaApplied(manifestPathFor(filePath));
+  }
 
   await client.end();
 
   console.log("🎉 Complete! Hadith ingestion successful!");
   console.log("\n📊 Summary:");
   console.log(`   - Hadiths processed: ${insertedHadiths.length}`);
-  console.log(`   - Embeddings created: ${embeddings.length}`);
+  console.log(`   - Embeddings created: ${embeddingCount}`);
   console.log(
     `   - Collections: ${new Set(allHadiths.map((h) => h.collection)).size}`
   );
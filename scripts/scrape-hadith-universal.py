@@ -4,57 +4,309 @@ Supports all major hadith collections with enhanced metadata for semantic search
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+import lxml.html
+from lxml import etree
+import asyncio
+import gzip
+import hashlib
+import heapq
+import math
+import os
+import random
 import time
 import json
 import csv
 import re
+import socket
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import unicodedata
+from bisect import bisect_left
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict, field
-from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dataclasses import asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from collections import deque
 from urllib.parse import urljoin
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 
+from hadith_dedup import NearDuplicates, canonical_id
+from hadith_records import (
+    HADITH_FIELDS, INTERNED_FIELDS, STOPWORDS, ExportOutput, ExportSink, Hadith,
+    english_text_hash, hadith_id, hadith_uuid, tokenize
+)
+from hadith_search import SearchIndexSink
+from hadith_vectors import EMBEDDERS, VectorSink
 
-@dataclass
-class Hadith:
-    """Comprehensive hadith data structure optimized for semantic search"""
-    # Core identifiers
-    collection: str  # bukhari, muslim, abudawud, etc.
-    collection_name: str  # "Sahih Bukhari", "Sahih Muslim", etc.
-    hadith_number: int
-    hadith_number_in_book: Optional[int] = None
-    reference: str = ""  # Full reference string
+
+class _SearchTable(dict):
+    """
+    str.translate table for one search form, filled in one code point at a
+    time on first use, so importing the scraper does not classify the whole
+    of Unicode. Punctuation and symbols become spaces; format characters
+    (direction marks, joiners) and combining marks are dropped.
+    
+    Args:
+        mapping: Explicit entries, applied over those rules
+        fold_ranges: Code points whose remaining characters go through `fold`
+        fold: Maps a character and this table to its search form
+    """
+    
+    def __init__(
+        self,
+        mapping: Dict[str, Optional[str]],
+        fold_ranges: Iterable[range] = (),
+        fold: Optional[Callable[[str, Dict], str]] = None
+    ):
+        super().__init__({ord(char): value for char, value in mapping.items()})
+        self.fold_ranges = tuple(fold_ranges)
+        self.fold = fold
+    
+    def __missing__(self, code: int) -> Optional[str]:
+        char = chr(code)
+        category = unicodedata.category(char)
+        if category[0] in 'PS':
+            value = ' '
+        elif category in ('Cf', 'Mn', 'Me'):
+            value = None
+        elif any(code in block for block in self.fold_ranges):
+            # Kept as it is while folding, for forms that fold to themselves
+            self[code] = char
+            value = self.fold(char, self) or None
+        else:
+            value = char
+        self[code] = value
+        return value
+
+
+def _latin_fold(char: str, table: Dict) -> str:
+    # Latin letters with diacritics (ā, ḥ, ṣ ...) to the base letter
+    base = unicodedata.normalize('NFKD', char)
+    return base[0] if len(base) > 1 and all(unicodedata.combining(c) for c in base[1:]) else char
+
+
+# Arabic search form, as Lucene's ArabicNormalizer: harakat, Quranic marks and
+# tatweel dropped, alef forms to bare alef, ta marbuta to ha, alef maqsura to
+# ya; Arabic-Indic digits to ASCII. Presentation forms (contextual shapes,
+# ligatures such as ﷺ) are spelled out with plain letters.
+ARABIC_SEARCH_TABLE = _SearchTable(
+    {
+        '\u0640': None,  # tatweel
+        **dict.fromkeys('أإآٱ', 'ا'),
+        'ة': 'ه',
+        'ى': 'ي',
+        **{chr(0x0660 + d): str(d) for d in range(10)},
+        **{chr(0x06F0 + d): str(d) for d in range(10)},
+    },
+    [range(0xFB50, 0xFE00), range(0xFE70, 0xFF00)],
+    lambda char, table: unicodedata.normalize('NFKC', char).translate(table)
+)
+
+# English search form (of lowercased text): apostrophes and transliteration
+# marks dropped as in HadithSearchIndex.normalize (Qur'an -> quran, ʿAʾisha ->
+# aisha), Latin letters with diacritics to their base letter, ﷺ removed
+ENGLISH_SEARCH_TABLE = _SearchTable(
+    {**dict.fromkeys("'`´‘’ʼʾʿ", None), 'ﷺ': ' '},
+    [range(0xC0, 0x250), range(0x1E00, 0x1F00)],
+    _latin_fold
+)
+
+
+def arabic_search_text(text: str) -> Tuple[str, int]:
+    """Arabic search form of a text (see ARABIC_SEARCH_TABLE) and its word count"""
+    words = text.translate(ARABIC_SEARCH_TABLE).split()
+    return ' '.join(words), len(words)
+
+
+# Runs of non-ASCII characters. Folding these first leaves English text ASCII,
+# which str.translate then maps through its cached ASCII fast path (about 3x
+# faster than translating a text with ﷺ in it character by character)
+NON_ASCII_RE = re.compile(r'[^\x00-\x7f]+')
+
+
+def english_search_text(text: str) -> Tuple[str, int]:
+    """English search form of a text (see ENGLISH_SEARCH_TABLE) and its word count"""
+    text = NON_ASCII_RE.sub(lambda match: match.group().translate(ENGLISH_SEARCH_TABLE), text.lower())
+    words = text.translate(ENGLISH_SEARCH_TABLE).split()
+    return ' '.join(words), len(words)
+
+
+class HadithTable:
+    """
+    Columnar, dictionary-encoded store of Hadith records.
+    
+    Repeated metadata (collection, book, chapter, grade, narrator, keywords and
+    the source URL prefix) is stored once per distinct value and referenced by
+    integer codes; free text is kept as UTF-8 in one buffer per column with
+    Arrow-style offsets. Records come back as regular Hadith objects, built on
+    access. Supports the list operations the scraper uses (append, extend,
+    len, iteration, indexing).
+    """
+    
+    CATEGORY_COLUMNS = INTERNED_FIELDS
+    TEXT_COLUMNS = ('reference', 'english_text', 'arabic_text', 'narrator_chain', 'scrape_date', 'notes')
+    INT_COLUMNS = ('hadith_number', 'book_number', 'chapter_number')
+    LIST_COLUMNS = ('keywords', 'related_quran_verses', 'related_hadiths')
+    
+    def __init__(self, hadiths: Iterable[Hadith] = ()):
+        self._size = 0
+        self._ints = {name: array('q') for name in self.INT_COLUMNS}
+        self._in_book = array('q')  # -1 for None
+        self._categories = {name: ({}, [], array('I')) for name in self.CATEGORY_COLUMNS}
+        self._texts = {name: (bytearray(), array('Q', [0])) for name in self.TEXT_COLUMNS}
+        # Source URLs as a dictionary-encoded site prefix plus the page path
+        self._url_prefix = ({}, [], array('I'))
+        self._url_path = (bytearray(), array('Q', [0]))
+        # Lists as flattened codes into a per-column dictionary plus offsets
+        self._lists = {name: ({}, [], array('I'), array('Q', [0])) for name in self.LIST_COLUMNS}
+        self.extend(hadiths)
+    
+    @staticmethod
+    def _encode(column: Tuple, value: str) -> int:
+        index, values = column[0], column[1]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+    
+    @staticmethod
+    def _append_text(column: Tuple, value: str):
+        buffer, offsets = column
+        buffer += value.encode('utf-8')
+        offsets.append(len(buffer))
+    
+    @staticmethod
+    def _text_at(column: Tuple, i: int) -> str:
+        buffer, offsets = column
+        return buffer[offsets[i]:offsets[i + 1]].decode('utf-8')
+    
+    def append(self, hadith: Hadith):
+        for name in self.INT_COLUMNS:
+            self._ints[name].append(getattr(hadith, name))
+        in_book = hadith.hadith_number_in_book
+        self._in_book.append(-1 if in_book is None else in_book)
+        
+        for name, column in self._categories.items():
+            column[2].append(self._encode(column, getattr(hadith, name)))
+        for name, column in self._texts.items():
+            self._append_text(column, getattr(hadith, name))
+        
+        prefix, slash, path = hadith.source_url.rpartition('/')
+        self._url_prefix[2].append(self._encode(self._url_prefix, prefix + slash))
+        self._append_text(self._url_path, path)
+        
+        for name, column in self._lists.items():
+            codes, offsets = column[2], column[3]
+            for value in getattr(hadith, name):
+                codes.append(self._encode(column, value))
+            offsets.append(len(codes))
+        
+        self._size += 1
+    
+    def extend(self, hadiths: Iterable[Hadith]):
+        for hadith in hadiths:
+            self.append(hadith)
     
-    # Content
-    english_text: str = ""
-    arabic_text: str = ""
+    def __len__(self) -> int:
+        return self._size
     
-    # Structural metadata
-    book_number: int = 0
-    book_name: str = ""
-    chapter_number: int = 0
-    chapter_name: str = ""
+    def __getitem__(self, i: int) -> Hadith:
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError('HadithTable index out of range')
+        
+        values = {name: column[i] for name, column in self._ints.items()}
+        in_book = self._in_book[i]
+        values['hadith_number_in_book'] = None if in_book < 0 else in_book
+        for name, (_, categories, codes) in self._categories.items():
+            values[name] = categories[codes[i]]
+        for name, column in self._texts.items():
+            values[name] = self._text_at(column, i)
+        values['source_url'] = self._url_prefix[1][self._url_prefix[2][i]] + self._text_at(self._url_path, i)
+        for name, (_, list_values, codes, offsets) in self._lists.items():
+            values[name] = [list_values[code] for code in codes[offsets[i]:offsets[i + 1]]]
+        return Hadith(**values)
+    
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
     
-    # Authentication metadata
-    grade: str = ""  # Sahih, Hasan, Daif, etc.
-    graded_by: str = ""  # Scholar who graded it
-    narrator_chain: str = ""  # Full isnad
-    primary_narrator: str = ""  # First narrator (usually companion)
+    def ordered(self):
+        """Iterate records in export order (book, hadith) without materializing them all"""
+        books, numbers = self._ints['book_number'], self._ints['hadith_number']
+        for i in sorted(range(self._size), key=lambda i: (books[i], numbers[i])):
+            yield self[i]
     
-    # Thematic metadata
-    book_topic: str = ""  # E.g., "Prayer", "Fasting"
-    chapter_topic: str = ""
-    keywords: List[str] = field(default_factory=list)
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and dictionaries"""
+        total = sum(sys.getsizeof(column) for column in self._ints.values())
+        total += sys.getsizeof(self._in_book)
+        for index, values, *arrays in [*self._categories.values(), self._url_prefix, *self._lists.values()]:
+            total += sys.getsizeof(index) + sys.getsizeof(values)
+            total += sum(sys.getsizeof(value) for value in values)
+            total += sum(sys.getsizeof(column) for column in arrays)
+        for buffer, offsets in [*self._texts.values(), self._url_path]:
+            total += sys.getsizeof(buffer) + sys.getsizeof(offsets)
+        return total
     
-    # Technical metadata
-    source_url: str = ""
-    scrape_date: str = ""
-    notes: str = ""
+    def to_arrow(self):
+        """
+        Convert to a pyarrow.Table with dictionary-encoded categorical columns.
+        Requires pyarrow (pip install pyarrow).
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Arrow/Parquet export needs pyarrow: pip install pyarrow")
+        
+        columns = {}
+        for name in HADITH_FIELDS:
+            if name in self._ints:
+                columns[name] = pa.array(self._ints[name], type=pa.int64())
+            elif name == 'hadith_number_in_book':
+                columns[name] = pa.array(
+                    [None if n < 0 else n for n in self._in_book], type=pa.int64()
+                )
+            elif name in self._categories:
+                _, categories, codes = self._categories[name]
+                columns[name] = pa.DictionaryArray.from_arrays(
+                    pa.array(codes, type=pa.uint32()), pa.array(categories, type=pa.string())
+                )
+            elif name in self._texts:
+                columns[name] = pa.array(
+                    [self._text_at(self._texts[name], i) for i in range(self._size)],
+                    type=pa.string()
+                )
+            elif name == 'source_url':
+                _, prefixes, codes = self._url_prefix
+                columns[name] = pa.array(
+                    [prefixes[codes[i]] + self._text_at(self._url_path, i) for i in range(self._size)],
+                    type=pa.string()
+                )
+            else:
+                _, list_values, codes, offsets = self._lists[name]
+                columns[name] = pa.ListArray.from_arrays(
+                    pa.array(offsets, type=pa.int32()),
+                    pa.array([list_values[code] for code in codes], type=pa.string())
+                )
+        return pa.table(columns)
     
-    # Cross-references (for future enhancement)
-    related_quran_verses: List[str] = field(default_factory=list)
-    related_hadiths: List[str] = field(default_factory=list)
+    def write_parquet(self, path: Path):
+        """Write the table as a Parquet file (requires pyarrow)"""
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+        pq.write_table(table, str(path))
 
 
 # Available collections on sunnah.com
@@ -105,6 +357,7 @@ HADITH_COLLECTIONS = {
         'name': 'Riyad as-Salihin',
         'total_hadiths': 1896,
         'books': 19,
+        'extra_books': ['introduction'],  # Unnumbered book pages
         'default_grade': 'Sahih'
     },
     # 'nawawi40': {
@@ -122,276 +375,690 @@ HADITH_COLLECTIONS = {
 }
 
 
-class HadithScraper:
-    """Universal scraper for hadith collections from sunnah.com"""
+# Parts of a sunnah.com page the parser reads, as (tag, class) selectors; a tag
+# of None matches any element. Collections can override entries through a
+# 'selectors' key in HADITH_COLLECTIONS.
+PAGE_SELECTORS = {
+    # Blocks: each hadith container and the chapter header preceding it
+    'container': ('div', 'actualHadithContainer'),
+    'chapter': ('div', 'chapter'),
+    # Page header
+    'book_name': ('div', 'book_page_english_name'),
+    'book_number': ('div', 'book_page_number'),
+    'breadcrumb': ('ol', 'breadcrumb'),
+    # Inside a chapter header
+    'chapter_number': (None, 'echapno'),
+    'chapter_name': ('div', 'englishchapter'),
+    # Inside a hadith container
+    'english': ('div', 'text_details'),
+    'arabic': ('div', 'arabic_hadith_full'),
+    'narrator': ('div', 'hadith_narrated'),
+    'reference': ('table', 'hadith_reference'),
+    'grading': ('table', 'hadith_grading'),
+}
+
+CHAPTER_FIELDS = ('chapter_number', 'chapter_name')
+CONTAINER_FIELDS = ('english', 'arabic', 'narrator', 'reference', 'grading')
+PAGE_FIELDS = ('book_name', 'book_number', 'breadcrumb') + CHAPTER_FIELDS + ('reference', 'grading')
+
+# Extraction patterns, compiled once
+WHITESPACE_RE = re.compile(r'\s+')
+NARRATED_RE = re.compile(r'Narrated\s+([^:]+)')
+IN_BOOK_BOOK_RE = re.compile(r'Book\s+(\d+)')
+IN_BOOK_HADITH_RE = re.compile(r'Hadith\s+(\d+)')
+NUMBER_RE = re.compile(r'(\d+)')
+BOOK_LINK_RE = re.compile(r'/(\d+)/?$')
+CHAPTER_NUMBER_RE = re.compile(r'\((\d+)\)')
+CHAPTER_PREFIX_RE = re.compile(r'^Chapter:\s*', re.IGNORECASE)
+TOPIC_PREFIX_RE = re.compile(r'^(Book\s+of|Book\s+\d+:|Chapter:|\d+\s*-)\s*', re.IGNORECASE)
+
+
+# Keyword vocabulary loaded by default (see KeywordEngine)
+DEFAULT_KEYWORDS_FILE = Path(__file__).resolve().parent / 'hadith-keywords.json'
+
+class KeywordEngine:
+    """
+    Matches a keyword vocabulary against hadith text in one pass.
     
-    BASE_URL = "https://sunnah.com"
+    Text is lowercased and split into ASCII words once (one bytes.translate and
+    split); single-word variants are then found with a set intersection and
+    multi-word phrases are only tried where their first word occurs. Matching
+    is on whole words, so 'hell' does not match 'shell'. Apostrophes are
+    dropped (Qur'an -> quran) and possessives match their word (Allah's ->
+    allahs, registered for every single-word variant). Each variant (synonym,
+    plural, transliteration) maps to one canonical keyword.
+    """
+    
+    def __init__(self, terms: Dict[str, List[str]], titles_only: Iterable[str] = ()):
+        """
+        Args:
+            terms: Canonical keyword -> variants that count as a mention
+            titles_only: Keywords matched in book/chapter names but not in the text
+        """
+        self.titles_only = frozenset(titles_only)
+        self.words: Dict[bytes, str] = {}
+        self.phrases: Dict[bytes, List[Tuple[Tuple[bytes, ...], str]]] = {}
+        
+        possessives = {}
+        for keyword, variants in terms.items():
+            for variant in [keyword, *variants]:
+                tokens = tuple(tokenize(variant))
+                if len(tokens) == 1:
+                    self.words[tokens[0]] = keyword
+                    possessives[tokens[0] + b's'] = keyword
+                elif tokens:
+                    self.phrases.setdefault(tokens[0], []).append((tokens, keyword))
+        for word, keyword in possessives.items():
+            self.words.setdefault(word, keyword)
+        
+        self._word_set = frozenset(self.words)
+        self._phrase_heads = frozenset(self.phrases)
+        # Book and chapter names repeat for every hadith on a page
+        self._title_cache: Dict[str, frozenset] = {}
+    
+    @classmethod
+    def from_file(cls, path: Path) -> 'KeywordEngine':
+        """Load a vocabulary file ({"terms": {...}, "titles_only": [...]})"""
+        with open(path, 'r', encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        return cls(vocabulary['terms'], vocabulary.get('titles_only', ()))
+    
+    def match(self, text: str) -> set:
+        """Canonical keywords mentioned in the text"""
+        words = tokenize(text)
+        if not words:
+            return set()
+        
+        unique = set(words)
+        found = {self.words[word] for word in unique.intersection(self._word_set)}
+        
+        if not unique.isdisjoint(self._phrase_heads):
+            for i, word in enumerate(words):
+                for tokens, keyword in self.phrases.get(word, ()):
+                    if tuple(words[i:i + len(tokens)]) == tokens:
+                        found.add(keyword)
+        return found
+    
+    def extract(self, book_name: str, chapter_name: str, text: str) -> List[str]:
+        """Sorted keywords from the book and chapter names and the hadith text"""
+        title = f"{book_name} {chapter_name}"
+        title_keywords = self._title_cache.get(title)
+        if title_keywords is None:
+            if len(self._title_cache) >= 4096:
+                self._title_cache.clear()
+            title_keywords = self._title_cache[title] = frozenset(self.match(title))
+        return sorted(title_keywords | (self.match(text) - self.titles_only))
+    
+    def tfidf_terms(self, texts: List[str], top_n: int, max_df: float = 0.2) -> List[List[str]]:
+        """
+        Most distinctive words of each text within a collection, by TF-IDF.
+        
+        Words must appear in at least two texts and in at most `max_df` of
+        them; stopwords, numbers and words shorter than four letters are
+        ignored. Ties are broken alphabetically so results are deterministic.
+        """
+        documents = []
+        document_frequency: Dict[bytes, int] = {}
+        for text in texts:
+            counts: Dict[bytes, int] = {}
+            for word in tokenize(text):
+                if len(word) >= 4 and word.isalpha() and word not in STOPWORDS:
+                    counts[word] = counts.get(word, 0) + 1
+            documents.append(counts)
+            for word in counts:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        
+        total = len(documents)
+        idf = {
+            word: math.log(total / df)
+            for word, df in document_frequency.items()
+            if df >= 2 and df <= max_df * total
+        }
+        
+        results = []
+        for counts in documents:
+            length = sum(counts.values()) or 1
+            scored = [
+                (-count / length * idf[word], word)
+                for word, count in counts.items() if word in idf
+            ]
+            scored.sort()
+            results.append([word.decode('ascii') for _, word in scored[:top_n]])
+        return results
+
+
+_default_keyword_engine: Optional[KeywordEngine] = None
+
+
+def default_keyword_engine() -> KeywordEngine:
+    """Keyword engine for the bundled vocabulary, built once per process"""
+    global _default_keyword_engine
+    if _default_keyword_engine is None:
+        _default_keyword_engine = KeywordEngine.from_file(DEFAULT_KEYWORDS_FILE)
+    return _default_keyword_engine
+
+
+class ParseError(Exception):
+    """A hadith page that could not be parsed (transient, unlike a page without a hadith)"""
+
+
+class HadithParser:
+    """
+    Turns downloaded sunnah.com pages into Hadith records.
+    Holds no network state so it can be shipped to parser worker processes.
+
+    Each backend reduces a page to plain field values (texts, table rows,
+    breadcrumb items) that are turned into Hadith records by shared code:
+
+    - 'compiled' (default): the selector spec is compiled into a class-name
+      dispatch table and evaluated in a single walk over an lxml tree
+    - 'html.parser' / 'lxml': BeautifulSoup lookups with the given tree builder
+    """
+    
+    BACKENDS = ('compiled', 'html.parser', 'lxml')
     
     def __init__(
-        self, 
+        self,
         collection: str,
-        delay: float = 0.25,
-        output_dir: str = "./data"
+        backend: str = 'compiled',
+        base_url: str = "https://sunnah.com",
+        keywords: Optional[KeywordEngine] = None
     ):
         """
-        Initialize scraper
-        
         Args:
             collection: Collection key (e.g., 'bukhari', 'muslim')
-            delay: Delay between requests in seconds
-            output_dir: Directory to save output files
+            backend: 'compiled', or a BeautifulSoup tree builder ('html.parser', 'lxml')
+            base_url: Site root used to build source URLs for book pages
+            keywords: Keyword engine (default: the bundled vocabulary)
         """
-        if collection not in HADITH_COLLECTIONS:
+        if backend not in self.BACKENDS:
             raise ValueError(
-                f"Unknown collection: {collection}. "
-                f"Available: {', '.join(HADITH_COLLECTIONS.keys())}"
+                f"Unknown parser backend: {backend}. "
+                f"Available: {', '.join(self.BACKENDS)}"
             )
         
         self.collection = collection
         self.collection_info = HADITH_COLLECTIONS[collection]
-        self.delay = delay
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
-        
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9',
-            'Accept-Language': 'en-GB,en-US;q=0.9,en;q=0.8',
-        })
+        self.backend = backend
+        self.base_url = base_url
+        self.keywords = keywords or default_keyword_engine()
+        # Phase timings (parse, extract) go here when set; see ScrapeMetrics
+        self.metrics: Optional['ScrapeMetrics'] = None
+        self._hadith_link_re = re.compile(rf'/{re.escape(collection)}:(\d+)/?$')
+        self._book_link_re = re.compile(rf'/{re.escape(collection)}/(\w+)/?$')
         
-        self.hadiths: List[Hadith] = []
-        self.progress_file = self.output_dir / f"{collection}_progress.json"
-        self.load_progress()
+        self.selectors = {**PAGE_SELECTORS, **self.collection_info.get('selectors', {})}
+        # class name -> [(role, required tag)] for the single-pass walk
+        self._dispatch: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        for role, (tag, class_name) in self.selectors.items():
+            self._dispatch.setdefault(class_name, []).append((role, tag))
     
-    def load_progress(self):
-        """Load previously scraped data"""
-        if self.progress_file.exists():
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.hadiths = [Hadith(**h) for h in data.get('hadiths', [])]
-                    print(f"✓ Loaded {len(self.hadiths)} previously scraped hadiths")
-            except Exception as e:
-                print(f"⚠ Could not load progress: {e}")
+    def __getstate__(self):
+        # Worker processes record into their own metrics (see parse_in_worker)
+        state = self.__dict__.copy()
+        state['metrics'] = None
+        return state
     
-    def save_progress(self):
-        """Save current progress"""
+    def parse(self, content: bytes, hadith_num: int, url: str) -> Optional[Hadith]:
+        """
+        Parse a single hadith page with comprehensive metadata. Returns None
+        for a page without a hadith container and raises ParseError when the
+        page could not be parsed.
+        """
         try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'collection': self.collection,
-                    'collection_name': self.collection_info['name'],
-                    'hadiths': [asdict(h) for h in self.hadiths],
-                    'total': len(self.hadiths),
-                    'last_updated': datetime.now().isoformat()
-                }, f, ensure_ascii=False, indent=2)
+            timer = PerformanceTimer('parse', self.metrics)
+            page, blocks = self._read_page(content)
+            timer.log()
+            
+            # Find the hadith container and the first chapter header
+            container = next((raw for kind, raw in blocks if kind == 'container'), None)
+            if container is None:
+                return None
+            chapter = next((raw for kind, raw in blocks if kind == 'chapter'), None)
+            
+            with PerformanceTimer('extract', self.metrics):
+                return self._build_hadith(
+                    page,
+                    container,
+                    chapter,
+                    self._book_info(page, single_page=True),
+                    hadith_num,
+                    url,
+                    single_page=True
+                )
+        
         except Exception as e:
-            print(f"⚠ Could not save progress: {e}")
+            print(f"✗ Error parsing hadith {hadith_num}: {e}")
+            raise ParseError(f"parse error: {e}") from None
     
-    def scrape_hadith(self, hadith_num: int) -> Optional[Hadith]:
-        """Scrape a single hadith with comprehensive metadata"""
-        url = f"{self.BASE_URL}/{self.collection}:{hadith_num}"
-        
+    def parse_book(self, content: bytes, book: str, url: str) -> Optional[List[Hadith]]:
+        """
+        Parse a book page (/{collection}/{book}) into every hadith it lists.
+        Each hadith takes the chapter header that precedes it on the page.
+        """
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            timer = PerformanceTimer('parse', self.metrics)
+            page, blocks = self._read_page(content)
+            timer.log()
+            book_info = self._book_info(page, single_page=False)
+            hadiths = []
+            chapter = None
             
-            # Find the hadith container
-            hadith_container = soup.find('div', class_='actualHadithContainer')
-            if not hadith_container:
-                return None
-            
-            # Extract English text
-            english_div = hadith_container.find('div', class_='text_details')
-            english_text = self._clean_text(english_div.get_text() if english_div else "")
+            for kind, raw in blocks:
+                if kind == 'chapter':
+                    chapter = raw
+                    continue
+                
+                hadith_num = self._container_hadith_number(raw)
+                if hadith_num is None:
+                    continue
+                
+                with PerformanceTimer('extract', self.metrics):
+                    hadiths.append(self._build_hadith(
+                        page,
+                        raw,
+                        chapter,
+                        book_info,
+                        hadith_num,
+                        f"{self.base_url}/{self.collection}:{hadith_num}",
+                        single_page=False
+                    ))
             
-            # Extract Arabic text
-            arabic_div = hadith_container.find('div', class_='arabic_hadith_full')
-            arabic_text = self._clean_text(arabic_div.get_text() if arabic_div else "")
+            return hadiths
+        
+        except Exception as e:
+            print(f"✗ Error parsing book {book}: {e}")
+            return None
+    
+    def parse_index(self, content: bytes, key: Any, url: str) -> Optional[List]:
+        """
+        Book ids linked from the collection index page (/{collection}), in
+        page order: numbers as ints, plus the collection's unnumbered books
+        """
+        try:
+            extra_books = self.collection_info.get('extra_books', [])
+            books = []
+            for href in lxml.html.fromstring(content).xpath('//a/@href'):
+                match = self._book_link_re.search(href)
+                if not match:
+                    continue
+                book = int(match.group(1)) if match.group(1).isdigit() else match.group(1)
+                if (isinstance(book, int) or book in extra_books) and book not in books:
+                    books.append(book)
+            return books
+        
+        except Exception as e:
+            print(f"✗ Error parsing collection index: {e}")
+            return None
+    
+    def parse_book_numbers(self, content: bytes, book: str, url: str) -> Optional[List[int]]:
+        """Hadith numbers listed on a book page, without building the records"""
+        try:
+            _, blocks = self._read_page(content)
+            numbers = (self._container_hadith_number(raw) for kind, raw in blocks if kind == 'container')
+            return [n for n in numbers if n is not None]
+        
+        except Exception as e:
+            print(f"✗ Error parsing book {book}: {e}")
+            return None
+    
+    def parse_cached(self, cache: 'PageCache', hadith_num: int, url: str, entry: Dict) -> Optional[Hadith]:
+        """Parse a page straight from the raw page cache (None if it could not be parsed)"""
+        try:
+            return self.parse(cache.read(entry), hadith_num, url)
+        except ParseError:
+            return None
+    
+    def parse_book_cached(self, cache: 'PageCache', book: str, url: str, entry: Dict) -> Optional[List[Hadith]]:
+        """Parse a book page straight from the raw page cache"""
+        return self.parse_book(cache.read(entry), book, url)
+    
+    def _read_page(self, content: bytes) -> Tuple[Dict, List[Tuple[str, Dict]]]:
+        """
+        Reduce a page to field values.
+        
+        Returns the page-level fields (first match in the document) and the
+        chapter/container blocks in document order, each with its own fields.
+        Missing elements are None; table fields are {'rows', 'links'} where
+        each row is a list of (stripped, full) cell texts.
+        """
+        if self.backend == 'compiled':
+            return self._read_page_compiled(content)
+        return self._read_page_soup(content)
+    
+    def _read_page_compiled(self, content: bytes) -> Tuple[Dict, List[Tuple[str, Dict]]]:
+        """Collect every field in one walk over the lxml tree"""
+        try:
+            markup = content.decode('utf-8')
+        except UnicodeDecodeError:
+            markup = UnicodeDammit(content, is_html=True).unicode_markup
+        root = lxml.html.document_fromstring(markup)
+        
+        page = dict.fromkeys(PAGE_FIELDS)
+        blocks = []
+        scopes = []  # open chapter/container elements: (element, fields)
+        dispatch = self._dispatch
+        
+        for event, el in etree.iterwalk(root, events=('start', 'end')):
+            if event == 'end':
+                if scopes and scopes[-1][0] is el:
+                    scopes.pop()
+                continue
             
-            # Extract narrator chain
-            narrator_div = hadith_container.find('div', class_='hadith_narrated')
-            narrator_chain = self._clean_text(narrator_div.get_text() if narrator_div else "")
+            class_attr = el.get('class') if isinstance(el.tag, str) else None
+            if not class_attr:
+                continue
             
-            # Extract primary narrator (usually after "Narrated")
-            primary_narrator = ""
-            if narrator_chain:
-                match = re.search(r'Narrated\s+([^:]+)', narrator_chain)
+            for class_name in class_attr.split():
+                for role, tag in dispatch.get(class_name, ()):
+                    if tag is not None and el.tag != tag:
+                        continue
+                    
+                    if role in ('container', 'chapter'):
+                        fields = dict.fromkeys(CONTAINER_FIELDS if role == 'container' else CHAPTER_FIELDS)
+                        blocks.append((role, fields))
+                        scopes.append((el, fields))
+                        continue
+                    
+                    value = None
+                    if role in page and page[role] is None:
+                        value = self._compiled_value(role, el)
+                        page[role] = value
+                    
+                    # Innermost open block that reads this field
+                    for _, fields in reversed(scopes):
+                        if role in fields:
+                            if fields[role] is None:
+                                fields[role] = value if value is not None else self._compiled_value(role, el)
+                            break
+        
+        return page, blocks
+    
+    def _compiled_value(self, role: str, el):
+        """Field value of an lxml element"""
+        if role in ('reference', 'grading'):
+            rows = [
+                [self._lxml_texts(td) for td in tr.iter('td')]
+                for tr in el.iter('tr')
+            ]
+            links = [a.get('href') for a in el.iter('a') if a.get('href') is not None]
+            return {'rows': rows, 'links': links}
+        if role == 'breadcrumb':
+            crumbs = []
+            for li in el.iter('li'):
+                link = next(li.iter('a'), None)
+                crumbs.append((''.join(li.itertext()), link.get('href') if link is not None else None))
+            return crumbs
+        stripped, full = self._lxml_texts(el)
+        return stripped if role in ('book_number', 'chapter_number') else full
+    
+    @staticmethod
+    def _lxml_texts(el) -> Tuple[str, str]:
+        """(stripped, full) text of an element, like get_text(strip=True) / get_text()"""
+        pieces = list(el.itertext())
+        return ''.join(p.strip() for p in pieces), ''.join(pieces)
+    
+    def _read_page_soup(self, content: bytes) -> Tuple[Dict, List[Tuple[str, Dict]]]:
+        """Collect fields with BeautifulSoup lookups"""
+        soup = BeautifulSoup(content, self.backend)
+        
+        def find(scope, role):
+            tag, class_name = self.selectors[role]
+            return scope.find(tag, class_=class_name)
+        
+        def text(el, strip=False):
+            return el.get_text(strip=strip) if el is not None else None
+        
+        def table(el):
+            if el is None:
+                return None
+            rows = [
+                [(td.get_text(strip=True), td.get_text()) for td in tr.find_all('td')]
+                for tr in el.find_all('tr')
+            ]
+            links = [a['href'] for a in el.find_all('a', href=True)]
+            return {'rows': rows, 'links': links}
+        
+        breadcrumb = find(soup, 'breadcrumb')
+        crumbs = None
+        if breadcrumb is not None:
+            crumbs = []
+            for li in breadcrumb.find_all('li'):
+                link = li.find('a')
+                href = link['href'] if link is not None and 'href' in link.attrs else None
+                crumbs.append((li.get_text(), href))
+        
+        page = {
+            'book_name': text(find(soup, 'book_name')),
+            'book_number': text(find(soup, 'book_number'), strip=True),
+            'breadcrumb': crumbs,
+            'chapter_number': text(find(soup, 'chapter_number'), strip=True),
+            'chapter_name': text(find(soup, 'chapter_name')),
+            'reference': table(find(soup, 'reference')),
+            'grading': table(find(soup, 'grading')),
+        }
+        
+        block_classes = [self.selectors['chapter'][1], self.selectors['container'][1]]
+        blocks = []
+        for el in soup.find_all(class_=block_classes):
+            if self.selectors['container'][1] in el.get('class', []):
+                if self.selectors['container'][0] in (None, el.name):
+                    blocks.append(('container', {
+                        'english': text(find(el, 'english')),
+                        'arabic': text(find(el, 'arabic')),
+                        'narrator': text(find(el, 'narrator')),
+                        'reference': table(find(el, 'reference')),
+                        'grading': table(find(el, 'grading')),
+                    }))
+            elif self.selectors['chapter'][0] in (None, el.name):
+                blocks.append(('chapter', {
+                    'chapter_number': text(find(el, 'chapter_number'), strip=True),
+                    'chapter_name': text(find(el, 'chapter_name')),
+                }))
+        
+        return page, blocks
+    
+    def _container_hadith_number(self, container: Dict) -> Optional[int]:
+        """Read the hadith number from the container's reference link"""
+        if container['reference']:
+            for href in container['reference']['links']:
+                match = self._hadith_link_re.search(href)
                 if match:
-                    primary_narrator = match.group(1).strip()
-            
-            # Initialize variables
-            reference = ""
-            hadith_number_in_book = None
-            book_number = 0
-            
-            # Extract reference information from table
-            reference_table = soup.find('table', class_='hadith_reference')
-            
-            if reference_table:
-                rows = reference_table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        label = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        
-                        # Extract main reference
-                        if label == 'Reference':
-                            reference = value.replace(':', '').strip()
-                        
-                        # Extract in-book reference (Book X, Hadith Y)
-                        elif 'In-book reference' in label.lower():
-                            book_match = re.search(r'Book\s+(\d+)', value)
-                            hadith_match = re.search(r'Hadith\s+(\d+)', value)
-                            if book_match:
-                                book_number = int(book_match.group(1))
-                            if hadith_match:
-                                hadith_number_in_book = int(hadith_match.group(1))
-            
-            # Extract book name and chapter information
-            book_name = ""
-            book_topic = ""
-            chapter_name = ""
-            chapter_number = 0
-            chapter_topic = ""
+                    return int(match.group(1))
+        return None
+    
+    def _book_info(self, page: Dict, single_page: bool) -> Dict:
+        """
+        Page-level book name, topic and fallback book number.
+        The book is the last breadcrumb on a book page, and third from last
+        (before chapter and hadith) on a hadith page.
+        """
+        book_name = ""
+        book_topic = ""
+        book_number = 0
+        
+        # Method 1: Look for book_page_english_name in the page (most reliable)
+        if page['book_name'] is not None:
+            book_name = self._clean_text(page['book_name'])
+            book_topic = self._extract_topic(book_name)
             
-            # Method 1: Look for book_page_english_name in the page (most reliable)
-            book_name_div = soup.find('div', class_='book_page_english_name')
-            if book_name_div:
-                book_name = self._clean_text(book_name_div.get_text())
+            # Book number from book_page_number (used when the in-book reference lacks it)
+            if page['book_number'] is not None:
+                num_match = NUMBER_RE.search(page['book_number'])
+                if num_match:
+                    book_number = int(num_match.group(1))
+        
+        # Method 2: If not found, try breadcrumb
+        if not book_name and page['breadcrumb'] is not None:
+            crumbs = page['breadcrumb']
+            position = 3 if single_page else 1
+            if len(crumbs) >= max(position, 3):
+                book_text, book_href = crumbs[-position]
+                book_name = self._clean_text(book_text)
                 book_topic = self._extract_topic(book_name)
                 
-                # Also get book number from book_page_number if we don't have it yet
-                if book_number == 0:
-                    book_num_div = soup.find('div', class_='book_page_number')
-                    if book_num_div:
-                        num_text = book_num_div.get_text(strip=True)
-                        num_match = re.search(r'(\d+)', num_text)
-                        if num_match:
-                            book_number = int(num_match.group(1))
-            
-            # Method 2: If not found, try breadcrumb
-            if not book_name:
-                breadcrumb = soup.find('ol', class_='breadcrumb')
-                if breadcrumb:
-                    crumbs = breadcrumb.find_all('li')
-                    if len(crumbs) >= 3:
-                        book_elem = crumbs[-3]
-                        book_name = self._clean_text(book_elem.get_text())
-                        book_topic = self._extract_topic(book_name)
-                        
-                        # Extract book number from link if still not found
-                        if book_number == 0:
-                            book_link = book_elem.find('a')
-                            if book_link and 'href' in book_link.attrs:
-                                match = re.search(r'/(\d+)/?$', book_link['href'])
-                                if match:
-                                    book_number = int(match.group(1))
-            
-            # Extract chapter information
-            # Method 1: Look for chapter div (appears before hadith on page)
-            chapter_div = soup.find('div', class_='chapter')
-            if chapter_div:
-                # Extract chapter number from echapno
-                chapter_num_elem = chapter_div.find(class_='echapno')
-                if chapter_num_elem:
-                    chap_text = chapter_num_elem.get_text(strip=True)
-                    # Extract number from text like "(35)"
-                    num_match = re.search(r'\((\d+)\)', chap_text)
-                    if num_match:
-                        chapter_number = int(num_match.group(1))
-                
-                # Extract chapter name from englishchapter
-                chapter_name_div = chapter_div.find('div', class_='englishchapter')
-                if chapter_name_div:
-                    chapter_name = self._clean_text(chapter_name_div.get_text())
-                    chapter_topic = self._extract_topic(chapter_name)
+                # Extract book number from link
+                if book_href:
+                    match = BOOK_LINK_RE.search(book_href)
+                    if match:
+                        book_number = int(match.group(1))
+        
+        return {'book_name': book_name, 'book_topic': book_topic, 'book_number': book_number}
+    
+    def _build_hadith(
+        self,
+        page: Dict,
+        container: Dict,
+        chapter: Optional[Dict],
+        book_info: Dict,
+        hadith_num: int,
+        url: str,
+        single_page: bool
+    ) -> Hadith:
+        """
+        Build a Hadith from its container's fields.
+        
+        Args:
+            page: Page-level fields, used for fallbacks
+            container: Fields of the hadith's actualHadithContainer
+            chapter: Fields of the chapter header that applies to this hadith
+            book_info: Result of _book_info for the page
+            single_page: True for per-hadith pages, where page-level chapter,
+                reference and grading elements belong to this hadith
+        """
+        english_text = self._clean_text(container['english'] or "")
+        arabic_text = self._clean_text(container['arabic'] or "")
+        narrator_chain = self._clean_text(container['narrator'] or "")
+        
+        # Extract primary narrator (usually after "Narrated")
+        primary_narrator = ""
+        if narrator_chain:
+            match = NARRATED_RE.search(narrator_chain)
+            if match:
+                primary_narrator = match.group(1).strip()
+        
+        # Initialize variables
+        reference = ""
+        hadith_number_in_book = None
+        book_number = 0
+        
+        # Extract reference information from table
+        reference_table = container['reference']
+        if reference_table is None and single_page:
+            reference_table = page['reference']
+        
+        if reference_table:
+            for cells in reference_table['rows']:
+                if len(cells) >= 2:
+                    label = cells[0][0]
+                    value = cells[1][0]
+                    
+                    # Extract main reference
+                    if label == 'Reference':
+                        reference = value.replace(':', '').strip()
                     
-                    # Remove "Chapter: " prefix if present
-                    chapter_name = re.sub(r'^Chapter:\s*', '', chapter_name, flags=re.IGNORECASE)
+                    # Extract in-book reference (Book X, Hadith Y)
+                    elif 'In-book reference' in label.lower():
+                        book_match = IN_BOOK_BOOK_RE.search(value)
+                        hadith_match = IN_BOOK_HADITH_RE.search(value)
+                        if book_match:
+                            book_number = int(book_match.group(1))
+                        if hadith_match:
+                            hadith_number_in_book = int(hadith_match.group(1))
+        
+        # Book name and fallback number come from the page header
+        book_name = book_info['book_name']
+        book_topic = book_info['book_topic']
+        if book_number == 0:
+            book_number = book_info['book_number']
+        
+        # Extract chapter information
+        chapter_name = ""
+        chapter_number = 0
+        chapter_topic = ""
+        
+        # Method 1: Look for chapter div (appears before hadith on page)
+        if chapter is not None:
+            # Extract number from text like "(35)"
+            if chapter['chapter_number'] is not None:
+                num_match = CHAPTER_NUMBER_RE.search(chapter['chapter_number'])
+                if num_match:
+                    chapter_number = int(num_match.group(1))
             
-            # Method 2: If not found in chapter div, try page-level elements
-            if not chapter_name:
-                chapter_num_elem = soup.find(class_='echapno')
-                if chapter_num_elem:
-                    chap_text = chapter_num_elem.get_text(strip=True)
-                    num_match = re.search(r'\((\d+)\)', chap_text)
-                    if num_match:
-                        chapter_number = int(num_match.group(1))
+            if chapter['chapter_name'] is not None:
+                chapter_name = self._clean_text(chapter['chapter_name'])
+                chapter_topic = self._extract_topic(chapter_name)
                 
-                chapter_name_div = soup.find('div', class_='englishchapter')
-                if chapter_name_div:
-                    chapter_name = self._clean_text(chapter_name_div.get_text())
-                    chapter_topic = self._extract_topic(chapter_name)
-                    chapter_name = re.sub(r'^Chapter:\s*', '', chapter_name, flags=re.IGNORECASE)
-            
-            # Method 3: If still not found, try breadcrumb
-            if not chapter_name:
-                breadcrumb = soup.find('ol', class_='breadcrumb')
-                if breadcrumb:
-                    crumbs = breadcrumb.find_all('li')
-                    if len(crumbs) >= 4:
-                        chapter_elem = crumbs[-2]
-                        chapter_name = self._clean_text(chapter_elem.get_text())
-                        chapter_topic = self._extract_topic(chapter_name)
-            
-            # Extract authenticity grade
-            grade = self.collection_info['default_grade']
-            graded_by = ""
-            
-            grade_table = soup.find('table', class_='hadith_grading')
-            if grade_table:
-                grade_rows = grade_table.find_all('tr')
-                for row in grade_rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        scholar = self._clean_text(cells[0].get_text())
-                        grade_text = self._clean_text(cells[1].get_text())
-                        
-                        # Use first grading or prefer Albani
-                        if not grade or 'Albani' in scholar:
-                            grade = grade_text
-                            graded_by = scholar
-            
-            # Extract keywords from chapter and book names
-            keywords = self._extract_keywords(book_name, chapter_name, english_text)
-            
-            # Create hadith object
-            hadith = Hadith(
-                collection=self.collection,
-                collection_name=self.collection_info['name'],
-                hadith_number=hadith_num,
-                hadith_number_in_book=hadith_number_in_book,
-                reference=reference or f"{self.collection_info['name']} {hadith_num}",
-                english_text=english_text,
-                arabic_text=arabic_text,
-                book_number=book_number,
-                book_name=book_name,
-                chapter_number=chapter_number,
-                chapter_name=chapter_name,
-                grade=grade,
-                graded_by=graded_by,
-                narrator_chain=narrator_chain,
-                primary_narrator=primary_narrator,
-                book_topic=book_topic,
-                chapter_topic=chapter_topic,
-                keywords=keywords,
-                source_url=url,
-                scrape_date=datetime.now().isoformat()
-            )
+                # Remove "Chapter: " prefix if present
+                chapter_name = CHAPTER_PREFIX_RE.sub('', chapter_name)
+        
+        # Method 2: If not found in chapter div, try page-level elements
+        if not chapter_name and single_page:
+            if page['chapter_number'] is not None:
+                num_match = CHAPTER_NUMBER_RE.search(page['chapter_number'])
+                if num_match:
+                    chapter_number = int(num_match.group(1))
             
-            return hadith
+            if page['chapter_name'] is not None:
+                chapter_name = self._clean_text(page['chapter_name'])
+                chapter_topic = self._extract_topic(chapter_name)
+                chapter_name = CHAPTER_PREFIX_RE.sub('', chapter_name)
         
-        except Exception as e:
-            print(f"✗ Error scraping hadith {hadith_num}: {e}")
-            return None
+        # Method 3: If still not found, try breadcrumb
+        if not chapter_name and single_page and page['breadcrumb'] is not None:
+            crumbs = page['breadcrumb']
+            if len(crumbs) >= 4:
+                chapter_name = self._clean_text(crumbs[-2][0])
+                chapter_topic = self._extract_topic(chapter_name)
+        
+        # Extract authenticity grade
+        grade = self.collection_info['default_grade']
+        graded_by = ""
+        
+        grade_table = container['grading']
+        if grade_table is None and single_page:
+            grade_table = page['grading']
+        if grade_table:
+            for cells in grade_table['rows']:
+                if len(cells) >= 2:
+                    scholar = self._clean_text(cells[0][1])
+                    grade_text = self._clean_text(cells[1][1])
+                    
+                    # Use first grading or prefer Albani
+                    if not grade or 'Albani' in scholar:
+                        grade = grade_text
+                        graded_by = scholar
+        
+        # Extract keywords from chapter and book names
+        keywords = self._extract_keywords(book_name, chapter_name, english_text)
+        
+        # Create hadith object
+        return Hadith(
+            collection=self.collection,
+            collection_name=self.collection_info['name'],
+            hadith_number=hadith_num,
+            hadith_number_in_book=hadith_number_in_book,
+            reference=reference or f"{self.collection_info['name']} {hadith_num}",
+            english_text=english_text,
+            arabic_text=arabic_text,
+            book_number=book_number,
+            book_name=book_name,
+            chapter_number=chapter_number,
+            chapter_name=chapter_name,
+            grade=grade,
+            graded_by=graded_by,
+            narrator_chain=narrator_chain,
+            primary_narrator=primary_narrator,
+            book_topic=book_topic,
+            chapter_topic=chapter_topic,
+            keywords=keywords,
+            source_url=url,
+            scrape_date=datetime.now().isoformat()
+        )
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_RE.sub(' ', text)
         text = text.strip()
         text = text.replace('|', '/')
         return text
@@ -399,152 +1066,2922 @@ class HadithScraper:
     def _extract_topic(self, text: str) -> str:
         """Extract main topic from book/chapter name"""
         # Remove "Book of", "Chapter:", numbers, etc.
-        topic = re.sub(r'^(Book\s+of|Book\s+\d+:|Chapter:|\d+\s*-)\s*', '', text, flags=re.IGNORECASE)
+        topic = TOPIC_PREFIX_RE.sub('', text)
         topic = topic.split(',')[0]  # Take first part before comma
         return topic.strip()
     
     def _extract_keywords(self, book_name: str, chapter_name: str, text: str) -> List[str]:
         """Extract keywords for semantic search indexing"""
-        keywords = set()
-        
-        # Common Islamic terms to extract
-        islamic_terms = [
-            'prayer', 'salat', 'fasting', 'ramadan', 'zakah', 'charity',
-            'hajj', 'pilgrimage', 'faith', 'belief', 'prophet', 'messenger',
-            'quran', 'revelation', 'heaven', 'paradise', 'hell', 'judgment',
-            'angel', 'satan', 'worship', 'repentance', 'forgiveness',
-            'marriage', 'divorce', 'inheritance', 'jihad', 'knowledge',
-            'patience', 'gratitude', 'humility', 'sincerity', 'intention'
-        ]
-        
-        combined_text = f"{book_name} {chapter_name}".lower()
-        
-        for term in islamic_terms:
-            if term in combined_text:
-                keywords.add(term)
+        return self.keywords.extract(book_name, chapter_name, text)
+
+
+class PageCache:
+    """
+    Compressed, content-addressed store of downloaded pages.
+    
+    Page bodies are gzipped under objects/ and named by the SHA-256 of their
+    content, so identical pages are stored once. A small JSON entry per URL
+    (under urls/) points at the body and keeps the ETag and Last-Modified
+    validators for conditional requests.
+    """
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.urls_dir = self.cache_dir / 'urls'
+    
+    def _entry_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.urls_dir / key[:2] / f"{key}.json"
+    
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.html.gz"
+    
+    def _write_atomic(self, path: Path, data: bytes):
+        """Write via a temporary file so readers never see a partial file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Return the cache entry for a URL, if its body is present"""
+        entry_path = self._entry_path(url)
+        if not entry_path.exists():
+            return None
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self._object_path(entry['sha256']).exists():
+            return None
+        return entry
+    
+    def read(self, entry: Dict) -> bytes:
+        """Return the decompressed page body for a cache entry"""
+        with open(self._object_path(entry['sha256']), 'rb') as f:
+            return gzip.decompress(f.read())
+    
+    def store(self, url: str, content: bytes, headers) -> Dict:
+        """Save a page body and its validators, returning the new entry"""
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            self._write_atomic(object_path, gzip.compress(content))
         
-        return sorted(list(keywords))
+        entry = {
+            'url': url,
+            'sha256': digest,
+            'etag': headers.get('ETag', ''),
+            'last_modified': headers.get('Last-Modified', ''),
+            'fetched_at': datetime.now().isoformat()
+        }
+        self._write_atomic(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
     
-    def scrape_all(self, start_num: int = 1, end_num: Optional[int] = None):
-        """Scrape all hadiths in range"""
-        if end_num is None:
-            end_num = self.collection_info['total_hadiths']
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+
+class ProgressJournal:
+    """
+    Append-only JSONL log of scraped hadiths, one record per line.
+    
+    Checkpoints append only the new records. fsync is batched to at most every
+    `fsync_every` records or `fsync_interval` seconds. Replay keeps the last
+    record per hadith number and drops a torn final line left by a crash.
+    compact() atomically rewrites the log with exactly one line per hadith.
+    """
+    
+    def __init__(self, path: Path, fsync_every: int = 50, fsync_interval: float = 5.0):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.lines = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self._file = None
+    
+    def replay(self) -> List[Dict]:
+        """Read back the latest record for every hadith in the log"""
+        records = {}
+        for _, record in self.scan():
+            records[record['hadith_number']] = record
+        return list(records.values())
+    
+    def scan(self, start: int = 0) -> Iterable[Tuple[bytes, Dict]]:
+        """
+        Yield (raw line, record) for every line in the log from byte offset
+        `start`, superseded ones included, truncating a torn final line once
+        the scan completes. `lines` counts the lines scanned.
+        """
+        self.lines = 0
+        if not self.path.exists():
+            return
         
-        print(f"\n{'='*60}")
-        print(f"Scraping: {self.collection_info['name']}")
-        print(f"Range: {start_num} to {end_num}")
-        print(f"Delay: {self.delay}s between requests")
-        print(f"{'='*60}\n")
+        valid_size = start
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                valid_size += len(raw)
+                self.lines += 1
+                yield raw, record
         
-        scraped_numbers = {h.hadith_number for h in self.hadiths}
-        success_count = 0
-        fail_count = 0
+        if valid_size < self.path.stat().st_size:
+            print(f"⚠ Dropping torn record at the end of {self.path.name}")
+            os.truncate(self.path, valid_size)
+    
+    def append(self, records: List[Dict]):
+        """Append records, fsyncing once enough have accumulated"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
         
-        for hadith_num in range(start_num, end_num + 1):
-            if hadith_num in scraped_numbers:
-                print(f"⊙ Skipping {hadith_num} (already scraped)")
-                continue
-            
-            print(f"→ Scraping hadith {hadith_num}...", end=' ')
-            
-            hadith = self.scrape_hadith(hadith_num)
-            
-            if hadith:
-                self.hadiths.append(hadith)
-                success_count += 1
-                print(f"✓ {hadith.reference}")
-            else:
-                fail_count += 1
-                print(f"✗ Failed")
-            
-            # Save progress every 10 hadiths
-            if (success_count + fail_count) % 10 == 0:
-                self.save_progress()
-                print(f"  → Progress: {len(self.hadiths)} hadiths saved\n")
-            
-            time.sleep(self.delay)
+        self.lines += len(records)
+        self.unsynced += len(records)
+        if (self.unsynced >= self.fsync_every
+                or time.monotonic() - self.last_sync >= self.fsync_interval):
+            self.sync()
+    
+    def sync(self):
+        """Force appended records to disk"""
+        if self._file is not None and self.unsynced:
+            os.fsync(self._file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+    
+    def needs_compaction(self, live_records: int) -> bool:
+        """True once superseded lines make up most of the log"""
+        return self.lines > 1000 and self.lines > 2 * live_records
+    
+    def compact(self, records: Iterable[Dict]):
+        """Atomically replace the log with one line per record"""
+        self.close()
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        lines = 0
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                lines += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
         
-        self.save_progress()
+        # Persist the rename itself (not supported on every platform)
+        try:
+            dir_fd = os.open(self.path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
         
-        print(f"\n{'='*60}")
-        print(f"Scraping Complete!")
-        print(f"{'='*60}")
-        print(f"Total hadiths: {len(self.hadiths)}")
-        print(f"Successful: {success_count}")
-        print(f"Failed: {fail_count}")
-        print(f"{'='*60}\n")
+        self.lines = lines
     
-    def export_to_pipe_format(self, filename: Optional[str] = None):
-        """Export to pipe-delimited format for embedding"""
-        if filename is None:
-            filename = f"{self.collection}.txt"
+    def close(self):
+        """Sync and close the append handle"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+class ScrapedIndex:
+    """
+    Compact sidecar to the progress journal: one bitmap per state (done,
+    missing, failed) with a bit per hadith number, a few kilobytes even for
+    the largest collections. Resuming reads it instead of deserializing the
+    journal's records.
+    
+    The index also notes how many journal bytes and lines its done bitmap
+    covers. Records appended after that, by a run that stopped before saving
+    the index, are picked up by scanning only the journal's tail.
+    """
+    
+    DONE, MISSING, FAILED = 0, 1, 2
+    STATES = ('done', 'missing', 'failed')
+    
+    MAGIC = b'HIDX'
+    VERSION = 1
+    # magic, version, journal bytes covered, journal lines covered, bitmap sizes
+    _header = struct.Struct('<4sHQQIII')
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.bitmaps = [bytearray() for _ in self.STATES]
+        self.counts = [0 for _ in self.STATES]
+    
+    def has(self, state: int, number: int) -> bool:
+        bitmap = self.bitmaps[state]
+        return (number >> 3) < len(bitmap) and bool(bitmap[number >> 3] >> (number & 7) & 1)
+    
+    def add(self, state: int, number: int):
+        bitmap = self.bitmaps[state]
+        if (number >> 3) >= len(bitmap):
+            bitmap.extend(bytes((number >> 3) + 1 - len(bitmap)))
+        mask = 1 << (number & 7)
+        if not bitmap[number >> 3] & mask:
+            bitmap[number >> 3] |= mask
+            self.counts[state] += 1
+    
+    def count(self, state: int) -> int:
+        return self.counts[state]
+    
+    def numbers(self, state: int) -> Iterable[int]:
+        """Hadith numbers in `state`, in ascending order"""
+        for byte_index, byte in enumerate(self.bitmaps[state]):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield byte_index * 8 + bit
+    
+    def set_numbers(self, state: int, numbers: Iterable[int]):
+        """Replace the numbers in `state`"""
+        self.bitmaps[state] = bytearray()
+        self.counts[state] = 0
+        for number in numbers:
+            self.add(state, number)
+    
+    def load(self) -> Optional[Tuple[int, int]]:
+        """
+        Read the index file.
+        
+        Returns:
+            (journal bytes, journal lines) covered by the done bitmap, or None
+            if there is no readable index
+        """
+        try:
+            data = self.path.read_bytes()
+            magic, version, journal_size, journal_lines, *sizes = self._header.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != self.MAGIC or version != self.VERSION or self._header.size + sum(sizes) != len(data):
+            return None
+        
+        offset = self._header.size
+        for state, size in enumerate(sizes):
+            self.bitmaps[state] = bytearray(data[offset:offset + size])
+            self.counts[state] = int.from_bytes(self.bitmaps[state], 'little').bit_count()
+            offset += size
+        return journal_size, journal_lines
+    
+    def save(self, journal_size: int, journal_lines: int):
+        """Atomically rewrite the index file"""
+        header = self._header.pack(
+            self.MAGIC, self.VERSION, journal_size, journal_lines,
+            *(len(bitmap) for bitmap in self.bitmaps)
+        )
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            for bitmap in self.bitmaps:
+                f.write(bitmap)
+        os.replace(tmp_path, self.path)
+
+
+def format_ranges(numbers: Iterable[int], limit: int = 6) -> str:
+    """Ascending numbers as "1-500, 502, 504-510", showing at most `limit` ranges"""
+    ranges = []
+    for number in numbers:
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    shown = ', '.join(f"{first}-{last}" if last > first else str(first) for first, last in ranges[:limit])
+    if len(ranges) > limit:
+        shown += f", … ({len(ranges) - limit} more ranges)"
+    return shown
+
+
+class HadithSpool:
+    """
+    Disk-backed hadith store for --streaming.
+    
+    Records live only in the progress journal (HadithScraper.checkpoint
+    appends them) and their numbers in the scraped-id index. ordered()
+    produces export order with an external merge sort: the journal is read in
+    runs of at most `window` records, each run is sorted and spilled to a
+    temporary file, and the runs are merged. Superseded journal lines are
+    dropped, so the latest record per hadith wins as in replay().
+    """
+    
+    def __init__(self, journal: ProgressJournal, index: ScrapedIndex, window: int = 2000):
+        """
+        Args:
+            journal: Progress journal holding the records
+            index: Scraped-id index, the spool's record count
+            window: Records held in memory per sorted run
+        """
+        self.journal = journal
+        self.index = index
+        self.window = max(1, window)
+    
+    def append(self, hadith: Hadith):
+        """Nothing to hold: the record is in the journal and the index"""
+    
+    def __len__(self) -> int:
+        return self.index.count(ScrapedIndex.DONE)
+    
+    def __iter__(self):
+        return self.ordered()
+    
+    def _spill(self, run: List[Tuple], directory: str) -> str:
+        run.sort()
+        fd, path = tempfile.mkstemp(dir=directory, suffix='.run')
+        with os.fdopen(fd, 'wb') as f:
+            for book, number, seq, raw in run:
+                # Journal lines are compact JSON, so they hold no literal tabs
+                f.write(b'%d\t%d\t%d\t%s' % (book, number, seq, raw))
+        return path
+    
+    @staticmethod
+    def _read_run(path: str):
+        with open(path, 'rb') as f:
+            for line in f:
+                book, number, seq, raw = line.split(b'\t', 3)
+                yield int(book), int(number), int(seq), raw
+    
+    def ordered(self):
+        """Iterate the latest record per hadith in (book, hadith) order"""
+        with tempfile.TemporaryDirectory(prefix='.sort-', dir=self.journal.path.parent) as directory:
+            latest = {}
+            runs = []
+            run = []
+            for seq, (raw, record) in enumerate(self.journal.scan()):
+                number = record['hadith_number']
+                latest[number] = seq
+                run.append((record['book_number'], number, seq, raw))
+                if len(run) >= self.window:
+                    runs.append(self._spill(run, directory))
+                    run = []
+            run.sort()
+            
+            streams = [self._read_run(path) for path in runs]
+            for _, number, seq, raw in heapq.merge(*streams, iter(run)):
+                if latest[number] == seq:
+                    yield Hadith(**json.loads(raw))
+
+
+class FailureLedger:
+    """
+    Hadith numbers that did not produce a record, and why.
+    
+    Permanent misses (404/410, or a page without a hadith container) are
+    skipped by later runs. Transient failures (timeouts, connection errors,
+    429/5xx once retries run out, pages the parser failed on) are requested
+    again, or on their own with retry_failed. The ledger can also hold the
+    collection's real hadith numbers, read from its index and book pages, so
+    that numbers missing from a sparse numbering are never requested. Saved
+    as JSON, rewritten atomically every `save_every` changes and at the end
+    of a run.
+    """
+    
+    NO_CONTAINER = 'no hadith container'
+    
+    def __init__(self, path: Path, save_every: int = 50):
+        self.path = Path(path)
+        self.save_every = save_every
+        self.missing: Dict[int, str] = {}
+        self.failed: Dict[int, Dict] = {}
+        self.index: Optional[Dict] = None
+        self._changes = 0
+        self.load()
+    
+    def load(self):
+        """Read the ledger back, if one was saved"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not load failure ledger: {e}")
+            return
+        self.missing = {int(n): reason for n, reason in data.get('missing', {}).items()}
+        self.failed = {int(n): entry for n, entry in data.get('failed', {}).items()}
+        if data.get('index'):
+            self.index = dict(data['index'], hadiths=set(data['index']['hadiths']))
+    
+    def save(self):
+        """Atomically rewrite the ledger file"""
+        index = None
+        if self.index:
+            index = dict(self.index, hadiths=sorted(self.index['hadiths']))
+        data = {
+            'missing': {str(n): reason for n, reason in sorted(self.missing.items())},
+            'failed': {str(n): entry for n, entry in sorted(self.failed.items())},
+            'index': index,
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._changes = 0
+    
+    def record_success(self, hadith_num: int):
+        """Forget earlier failures of a hadith that has now been scraped"""
+        if self.failed.pop(hadith_num, None) or self.missing.pop(hadith_num, None):
+            self._changed()
+    
+    def record_failure(self, hadith_num: int, reason: str, permanent: bool):
+        """Record a hadith page that produced no record"""
+        if permanent:
+            self.failed.pop(hadith_num, None)
+            self.missing[hadith_num] = reason
+        else:
+            entry = self.failed.setdefault(hadith_num, {'attempts': 0})
+            entry['reason'] = reason
+            entry['attempts'] += 1
+            entry['last_attempt'] = datetime.now().isoformat()
+        self._changed()
+    
+    def seed(self, hadiths: Iterable[int], books: List):
+        """Replace the known hadith numbers with those read from the site's index"""
+        self.index = {
+            'seeded_at': datetime.now().isoformat(),
+            'books': [str(book) for book in books],
+            'hadiths': set(hadiths),
+        }
+        self.save()
+    
+    def merge(self, other: 'FailureLedger', scraped: Iterable[int]):
+        """Take over another ledger's entries (a worker shard's), except for scraped hadiths"""
+        scraped = set(scraped)
+        for hadith_num, reason in other.missing.items():
+            if hadith_num not in scraped:
+                self.failed.pop(hadith_num, None)
+                self.missing[hadith_num] = reason
+        for hadith_num, entry in other.failed.items():
+            if hadith_num not in scraped and hadith_num not in self.missing:
+                self.failed[hadith_num] = entry
+        for hadith_num in scraped:
+            self.failed.pop(hadith_num, None)
+            self.missing.pop(hadith_num, None)
+    
+    def last_hadith(self) -> int:
+        """Highest hadith number in the index (0 without one)"""
+        return max(self.index['hadiths'], default=0) if self.index else 0
+    
+    def skip_reason(self, hadith_num: int) -> Optional[str]:
+        """Why a hadith number should not be requested, or None"""
+        if hadith_num in self.missing:
+            return f"not found: {self.missing[hadith_num]}"
+        if self.index and hadith_num not in self.index['hadiths']:
+            return "not in the collection index"
+        return None
+    
+    def _changed(self):
+        self._changes += 1
+        if self._changes >= self.save_every:
+            self.save()
+
+
+class WorkQueue:
+    """
+    Lease-based queue of hadith or book ranges in a SQLite file, shared by
+    worker processes on one machine or on several machines with a shared
+    filesystem.
+    
+    A worker leases the next pending range for `lease_ttl` seconds and keeps
+    the lease alive while it works (see hold). Ranges whose lease ran out,
+    because their worker crashed or lost the filesystem, are leased again by
+    the next worker that asks. Every change runs in its own IMMEDIATE
+    transaction, so two workers never lease the same live range.
+    """
+    
+    def __init__(self, path: Path, lease_ttl: float = 120.0):
+        """
+        Args:
+            path: SQLite file, created on first use
+            lease_ttl: Seconds a lease stays valid without being renewed
+        """
+        self.path = Path(path)
+        self.lease_ttl = lease_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        try:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS queue (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS ranges (
+                    id INTEGER PRIMARY KEY,
+                    first INTEGER NOT NULL,
+                    last INTEGER NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    expires_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    done_at TEXT
+                );
+            """)
+        finally:
+            db.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Rollback journal rather than WAL: WAL needs shared memory, which
+        # network filesystems do not provide
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        db.execute('PRAGMA busy_timeout = 60000')
+        return db
+    
+    def _transaction(self, work: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run `work` in an IMMEDIATE transaction (one writer at a time)"""
+        db = self._connect()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                result = work(db)
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+            return result
+        finally:
+            db.close()
+    
+    def init(self, settings: Dict, ranges: List[Tuple[int, int]]) -> bool:
+        """
+        Fill an empty queue with `ranges`, remembering `settings` (collection,
+        kind, bounds). Returns False if the queue already existed.
+        
+        Raises:
+            ValueError: The queue was created with different settings
+        """
+        def work(db):
+            stored = dict(db.execute('SELECT key, value FROM queue'))
+            if stored:
+                existing = {key: json.loads(value) for key, value in stored.items()}
+                if existing != settings:
+                    raise ValueError(f"{self.path} was created for {existing}, not {settings}")
+                return False
+            db.executemany('INSERT INTO queue VALUES (?, ?)',
+                           [(key, json.dumps(value)) for key, value in settings.items()])
+            db.executemany('INSERT INTO ranges (first, last) VALUES (?, ?)', ranges)
+            return True
+        return self._transaction(work)
+    
+    def lease(self, worker: str) -> Optional[Tuple[int, int, int]]:
+        """Lease the next pending or expired range; returns (id, first, last) or None"""
+        def work(db):
+            now = time.time()
+            row = db.execute(
+                "SELECT id, first, last FROM ranges "
+                "WHERE state = 'pending' OR (state = 'leased' AND expires_at < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row:
+                db.execute(
+                    "UPDATE ranges SET state = 'leased', worker = ?, expires_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (worker, now + self.lease_ttl, row[0])
+                )
+            return row
+        return self._transaction(work)
+    
+    def renew(self, range_id: int, worker: str) -> bool:
+        """Extend a lease; False if it expired and another worker took the range"""
+        def work(db):
+            return db.execute(
+                "UPDATE ranges SET expires_at = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (time.time() + self.lease_ttl, range_id, worker)
+            ).rowcount == 1
+        return self._transaction(work)
+    
+    def complete(self, range_id: int, worker: str):
+        """Mark a range done (even if its lease expired: the work was still saved)"""
+        self._transaction(lambda db: db.execute(
+            "UPDATE ranges SET state = 'done', worker = ?, expires_at = NULL, done_at = ? WHERE id = ?",
+            (worker, datetime.now().isoformat(), range_id)
+        ))
+    
+    def hold(self, range_id: int, worker: str) -> 'LeaseKeeper':
+        """Context manager that renews a lease in the background until exit"""
+        return LeaseKeeper(self, range_id, worker)
+    
+    def status(self) -> Dict[str, int]:
+        """Number of ranges per state, with expired leases counted as 'expired'"""
+        db = self._connect()
+        try:
+            rows = db.execute(
+                "SELECT CASE WHEN state = 'leased' AND expires_at < ? THEN 'expired' ELSE state END, "
+                "COUNT(*) FROM ranges GROUP BY 1",
+                (time.time(),)
+            ).fetchall()
+        finally:
+            db.close()
+        return {state: count for state, count in rows}
+
+
+class LeaseKeeper:
+    """Renews a WorkQueue lease every third of its lifetime from a background thread"""
+    
+    def __init__(self, queue: WorkQueue, range_id: int, worker: str):
+        self.queue = queue
+        self.range_id = range_id
+        self.worker = worker
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._renew, daemon=True)
+    
+    def _renew(self):
+        while not self._stop.wait(self.queue.lease_ttl / 3):
+            try:
+                if not self.queue.renew(self.range_id, self.worker):
+                    self.lost = True
+                    return
+            except sqlite3.Error as e:
+                print(f"⚠ Could not renew lease on range {self.range_id}: {e}")
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class TokenBucket:
+    """Global requests-per-second limit shared by all concurrent fetch workers"""
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        """
+        Args:
+            rate: Tokens (requests) added per second
+            burst: Maximum number of tokens that can accumulate while idle
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Responses worth retrying: rate limiting and temporary server trouble
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Statuses meaning the page does not exist; the failure ledger never asks again
+PERMANENT_STATUSES = frozenset({404, 410})
+TRANSIENT_ERRORS = (
+    requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError
+)
+
+# Upper bounds for a single backoff sleep and for honouring Retry-After
+MAX_BACKOFF = 30.0
+MAX_RETRY_AFTER = 300.0
+
+# Latency must rise this many seconds above the best seen to count as congestion
+LATENCY_SLACK = 0.05
+
+
+def classify_failure(error: Exception) -> Tuple[str, bool]:
+    """(reason, permanent) for a page that could not be fetched"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return str(response.status_code), response.status_code in PERMANENT_STATUSES
+    return type(error).__name__, False
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveLimit:
+    """
+    Additive-increase/multiplicative-decrease limit on requests in flight.
+    
+    Starts at `minimum` and grows by one request per response while all goes
+    well (slow start, doubling every round trip), then by one request per
+    round trip. A 429/5xx response, a connection error or latency rising
+    well above the best seen cuts the limit by `decrease` and ends slow
+    start; responses to requests sent before a cut do not cut again.
+    Retry-After pauses all new requests. Updated from the fetch threads.
+    """
+    
+    def __init__(self, maximum: int, minimum: int = 1, decrease: float = 0.5, latency_factor: float = 2.0):
+        """
+        Args:
+            maximum: Upper bound (--concurrency)
+            minimum: Lower bound and starting point
+            decrease: Factor applied to the limit on congestion
+            latency_factor: Smoothed latency above this multiple of the best
+                smoothed latency counts as congestion
+        """
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.value = float(minimum)
+        self.slow_start = True
+        self.smoothed_latency: Optional[float] = None
+        self.best_latency: Optional[float] = None
+        self.resume_at = 0.0
+        self.cuts = 0
+        self._cooldown = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def current(self) -> int:
+        """Requests currently allowed in flight"""
+        return max(self.minimum, min(self.maximum, int(self.value)))
+    
+    def on_success(self, latency: float) -> bool:
+        """Record a healthy response; returns True if rising latency cut the limit"""
+        with self._lock:
+            self._cooldown -= 1
+            if self.smoothed_latency is None:
+                self.smoothed_latency = latency
+            else:
+                self.smoothed_latency += 0.1 * (latency - self.smoothed_latency)
+            if self.best_latency is None or self.smoothed_latency < self.best_latency:
+                self.best_latency = self.smoothed_latency
+            
+            if (self.smoothed_latency > self.latency_factor * self.best_latency
+                    and self.smoothed_latency - self.best_latency > LATENCY_SLACK):
+                return self._cut()
+            
+            self.value = min(self.maximum, self.value + (1 if self.slow_start else 1 / self.value))
+            return False
+    
+    def on_congestion(self, retry_after: Optional[float] = None) -> bool:
+        """Record a throttled or failed request; returns True if the limit was cut"""
+        with self._lock:
+            self._cooldown -= 1
+            if retry_after:
+                self.resume_at = max(self.resume_at, time.monotonic() + min(retry_after, MAX_RETRY_AFTER))
+            return self._cut()
+    
+    def _cut(self) -> bool:
+        self.slow_start = False
+        if self._cooldown > 0 or self.value <= self.minimum:
+            return False
+        # Requests already in flight answer before the cut takes effect
+        self._cooldown = self.current
+        self.value = max(float(self.minimum), self.value * self.decrease)
+        self.cuts += 1
+        return True
+
+
+class RequestBudget:
+    """
+    In-flight and requests-per-second limits shared by every pipeline using it.
+    Waiters are served first come, first served, so pipelines for different
+    collections take turns instead of one collection starving the others.
+    With `adaptive`, the in-flight limit follows an AdaptiveLimit.
+    """
+    
+    def __init__(self, concurrency: int, rate: Optional[float], adaptive: bool = False):
+        """
+        Args:
+            concurrency: Maximum requests in flight across all pipelines
+            rate: Global requests per second (None means unlimited)
+            adaptive: Adjust the in-flight limit between 1 and `concurrency`
+                from server feedback (AIMD)
+        """
+        self.concurrency = concurrency
+        self.rate = rate
+        self.bucket = TokenBucket(rate) if rate else None
+        self.limit = AdaptiveLimit(concurrency) if adaptive else None
+        self.in_flight = 0
+        self.waiters: deque = deque()
+        self.requests = 0
+    
+    def allowed(self) -> int:
+        """Requests allowed in flight right now"""
+        return self.limit.current if self.limit else self.concurrency
+    
+    async def acquire(self):
+        """Wait for a free slot and a rate token"""
+        if self.waiters or self.in_flight >= self.allowed():
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release()
+                else:
+                    self.waiters.remove(waiter)
+                raise
+        else:
+            self.in_flight += 1
+        
+        if self.limit:
+            pause = self.limit.resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+        if self.bucket:
+            await self.bucket.acquire()
+        self.requests += 1
+    
+    def release(self):
+        self.in_flight -= 1
+        # Hand free slots to waiters in arrival order; the limit may have grown
+        while self.waiters and self.in_flight < self.allowed():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+# Histogram bucket bounds in seconds, from sub-millisecond parsing to slow requests
+METRIC_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# Timed phases, in pipeline order
+METRIC_PHASES = {
+    'rate_wait': 'Waiting for a request slot, rate token or the sequential delay',
+    'backoff': 'Sleeping before a retry (jittered backoff or Retry-After)',
+    'connect': 'Opening a connection (TCP and TLS)',
+    'ttfb': 'Sending a request until its response headers arrive (includes connect)',
+    'download': 'Reading a response body',
+    'parse': 'Reading a page into field values',
+    'extract': 'Building one hadith record (cleanup, grading, keywords)',
+    'checkpoint': 'Writing the progress journal',
+    'export': 'Writing the export files',
+}
+
+
+class PerformanceTimer:
+    """
+    Times one operation, like PerformanceTimer in lib/monitoring/performance.ts:
+    
+        timer = PerformanceTimer('parse', metrics)
+        # ... do work ...
+        timer.log()
+    
+    log() records the duration in the metrics histogram of the operation
+    instead of printing it. Also works as a context manager.
+    """
+    
+    __slots__ = ('operation', 'metrics', 'start_time')
+    
+    def __init__(self, operation: str, metrics: Optional['ScrapeMetrics'] = None):
+        self.operation = operation
+        self.metrics = metrics
+        self.start_time = time.perf_counter()
+    
+    def log(self) -> int:
+        """Record the duration; returns it in milliseconds"""
+        seconds = time.perf_counter() - self.start_time
+        if self.metrics is not None:
+            self.metrics.observe(self.operation, seconds)
+        return round(seconds * 1000)
+    
+    def get_duration(self) -> int:
+        """Duration in milliseconds, without recording it"""
+        return round((time.perf_counter() - self.start_time) * 1000)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.log()
+
+
+class ScrapeMetrics:
+    """
+    Phase timings and counters of a scrape run.
+    
+    Every phase has a histogram with the cumulative METRIC_BUCKETS, a sum and
+    a count, as in Prometheus. Counters are keyed by name and labels (HTTP
+    responses by status, pages by kind and result, ...). Updates are thread
+    safe; parser worker processes fill their own instance, which is merged
+    back (see parse_in_worker).
+    """
+    
+    def __init__(self):
+        # phase -> [per-bucket counts (last one is +Inf), sum of seconds]
+        self.histograms: Dict[str, List] = {}
+        # (name, ((label, value), ...)) -> value
+        self.counters: Dict[Tuple, float] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def observe(self, phase: str, seconds: float):
+        """Add one duration to a phase histogram"""
+        index = bisect_left(METRIC_BUCKETS, seconds)
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = [[0] * (len(METRIC_BUCKETS) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+    
+    def count(self, name: str, amount: float = 1, **labels):
+        """Increase a counter"""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def timer(self, phase: str) -> PerformanceTimer:
+        """Timer recording into this instance"""
+        return PerformanceTimer(phase, self)
+    
+    def snapshot(self) -> Dict:
+        """Plain-data copy, to send back from a worker process"""
+        with self._lock:
+            return {
+                'histograms': {phase: [list(counts), total] for phase, (counts, total) in self.histograms.items()},
+                'counters': list(self.counters.items()),
+            }
+    
+    def merge(self, snapshot: Dict):
+        """Add a snapshot taken elsewhere"""
+        with self._lock:
+            for phase, (counts, total) in snapshot['histograms'].items():
+                histogram = self.histograms.get(phase)
+                if histogram is None:
+                    histogram = self.histograms[phase] = [[0] * (len(METRIC_BUCKETS) + 1), 0.0]
+                histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+                histogram[1] += total
+            for key, value in snapshot['counters']:
+                self.counters[key] = self.counters.get(key, 0) + value
+    
+    def quantile(self, phase: str, q: float) -> Optional[float]:
+        """
+        Estimated q-quantile of a phase in seconds, interpolated within its
+        bucket like Prometheus' histogram_quantile
+        """
+        counts, _ = self.histograms.get(phase, ([], 0.0))
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(METRIC_BUCKETS):
+                    return METRIC_BUCKETS[-1]
+                lower = METRIC_BUCKETS[index - 1] if index else 0.0
+                upper = METRIC_BUCKETS[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return METRIC_BUCKETS[-1]
+    
+    def phases(self) -> List[str]:
+        """Recorded phases, known ones in pipeline order"""
+        known = [phase for phase in METRIC_PHASES if phase in self.histograms]
+        return known + sorted(phase for phase in self.histograms if phase not in METRIC_PHASES)
+    
+    def to_dict(self) -> Dict:
+        """JSON form: per-phase summaries and buckets, and all counters"""
+        phases = {}
+        for phase in self.phases():
+            counts, total = self.histograms[phase]
+            count = sum(counts)
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip(METRIC_BUCKETS + ('+Inf',), counts):
+                cumulative += bucket_count
+                buckets[str(bound)] = cumulative
+            phases[phase] = {
+                'description': METRIC_PHASES.get(phase, ''),
+                'count': count,
+                'sum_seconds': round(total, 6),
+                'mean_ms': round(total / count * 1000, 3),
+                'p50_ms': round(self.quantile(phase, 0.5) * 1000, 3),
+                'p99_ms': round(self.quantile(phase, 0.99) * 1000, 3),
+                'buckets': buckets,
+            }
+        return {
+            'started_at': datetime.fromtimestamp(self.started).isoformat(),
+            'duration_seconds': round(time.time() - self.started, 3),
+            'phases': phases,
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ],
+        }
+    
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP hadith_scraper_phase_seconds Time spent in each scrape phase',
+            '# TYPE hadith_scraper_phase_seconds histogram',
+        ]
+        for phase in self.phases():
+            counts, total = self.histograms[phase]
+            cumulative = 0
+            for bound, bucket_count in zip(METRIC_BUCKETS + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'hadith_scraper_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+            lines.append(f'hadith_scraper_phase_seconds_sum{{phase="{phase}"}} {total:.6f}')
+            lines.append(f'hadith_scraper_phase_seconds_count{{phase="{phase}"}} {cumulative}')
+        
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f'# TYPE hadith_scraper_{name}_total counter')
+            for (counter, labels), value in sorted(self.counters.items()):
+                if counter != name:
+                    continue
+                label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+                lines.append(f'hadith_scraper_{name}_total{{{label_text}}} {value:.15g}'
+                             if label_text else f'hadith_scraper_{name}_total {value:.15g}')
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path: Path, format: str = 'json'):
+        """Write the metrics as JSON or in the Prometheus text format"""
+        text = self.to_prometheus() if format == 'prometheus' else json.dumps(self.to_dict(), indent=2) + '\n'
+        path.write_text(text, encoding='utf-8')
+        print(f"✓ Metrics written to {path}")
+    
+    def print_summary(self):
+        """Print each phase's share of the measured time, and the counters"""
+        if not self.histograms:
+            print("No phases timed")
+            return
+        
+        total = sum(histogram[1] for histogram in self.histograms.values())
+        print(f"\n{'='*60}")
+        print("Phase Timings")
+        print(f"{'='*60}")
+        print(f"{'Phase':<11} {'Count':>7} {'Total s':>9} {'p50 ms':>9} {'p99 ms':>9} {'Share':>6}")
+        for phase in self.phases():
+            counts, seconds = self.histograms[phase]
+            share = seconds / total if total else 0
+            print(f"{phase:<11} {sum(counts):>7} {seconds:>9.2f} "
+                  f"{self.quantile(phase, 0.5) * 1000:>9.2f} "
+                  f"{self.quantile(phase, 0.99) * 1000:>9.2f} {share:>6.0%}")
+        for (name, labels), value in sorted(self.counters.items()):
+            label_text = ', '.join(f"{key}={value}" for key, value in labels)
+            print(f"  {name}{f' ({label_text})' if label_text else ''}: {value:,.15g}")
+        print(f"{'='*60}\n")
+
+
+def parse_in_worker(parse: Callable, *args) -> Tuple[Any, Dict]:
+    """
+    Run a HadithParser method in a parser worker process, timing it into a
+    fresh ScrapeMetrics. Returns (result, metrics snapshot) for the main
+    process to merge.
+    """
+    metrics = ScrapeMetrics()
+    parse.__self__.metrics = metrics
+    try:
+        return parse(*args), metrics.snapshot()
+    finally:
+        parse.__self__.metrics = None
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long connecting took"""
+    
+    def __init__(self, metrics: ScrapeMetrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        metrics = self.metrics
+        
+        def timed(connection_cls):
+            class TimedConnection(connection_cls):
+                def connect(self):
+                    with PerformanceTimer('connect', metrics):
+                        super().connect()
+            return TimedConnection
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': timed(pool_cls.ConnectionCls)})
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+# Fields stored in the HadithText table by scripts/ingest-hadith.ts
+INGESTED_FIELDS = (
+    'collection', 'collection_name', 'hadith_number', 'reference', 'english_text',
+    'arabic_text', 'book_number', 'book_name', 'chapter_number', 'chapter_name',
+    'grade', 'narrator_chain', 'source_url'
+)
+
+
+# Record whose search forms were derived last, and the forms. HadithExporter
+# hands each record to every sink in turn, so the sinks share one derivation.
+_last_search_forms: Tuple[Optional[Hadith], Dict] = (None, {})
+
+
+def search_forms(hadith: Hadith) -> Dict:
+    """
+    Search forms of a record's texts and their word counts (see
+    english_search_text and arabic_search_text), for the exports that carry
+    them. Derived from the texts on export rather than stored on every record.
+    """
+    global _last_search_forms
+    last, forms = _last_search_forms
+    if last is hadith:
+        return forms
+    english_normalized, english_tokens = english_search_text(hadith.english_text)
+    arabic_normalized, arabic_tokens = arabic_search_text(hadith.arabic_text)
+    forms = {
+        'english_normalized': english_normalized,
+        'arabic_normalized': arabic_normalized,
+        'english_tokens': english_tokens,
+        'arabic_tokens': arabic_tokens
+    }
+    _last_search_forms = (hadith, forms)
+    return forms
+
+
+def content_hashes(hadith: Hadith) -> Tuple[str, str]:
+    """
+    SHA-256 of the fields ingestion stores (content_hash) and of the text it
+    embeds (text_hash); unchanged hashes mean no database or embedding work.
+    The stored search forms are included, so a change to how they are derived
+    reaches the database through --delta too.
+    """
+    content = json.dumps(
+        [getattr(hadith, name) for name in INGESTED_FIELDS] + list(search_forms(hadith).values()),
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+    return (
+        hashlib.sha256(content.encode('utf-8')).hexdigest(),
+        english_text_hash(hadith)
+    )
+
+
+class PipeSink(ExportSink):
+    """Pipe-delimited format for embedding: book|hadith|text"""
+    
+    label = 'pipe format'
+    suffix = '.txt'
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        out.write(f"{hadith.book_number:03d}|{hadith.hadith_number:04d}|{hadith.english_text}\n")
+
+
+class JsonSink(ExportSink):
+    """
+    Full metadata as one JSON document, written incrementally.
+    Produces the same bytes as json.dump(..., indent=2) of the whole document.
+    """
+    
+    label = 'JSON'
+    suffix = '-full.json'
+    
+    def begin(self, out: ExportOutput, meta: Dict):
+        out.write('{\n')
+        for key in ('collection', 'collection_name', 'total_hadiths'):
+            out.write(f'  {json.dumps(key)}: {json.dumps(meta[key], ensure_ascii=False)},\n')
+        out.write(f'  "export_date": {json.dumps(datetime.now().isoformat())},\n', volatile=True)
+        out.write('  "hadiths": [')
+        self._first = True
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        # Flat fields are encoded one by one with the C encoder; the indented
+        # encoder json.dump would use is pure Python and several times slower
+        parts = []
+        for name in HADITH_FIELDS:
+            value = getattr(hadith, name)
+            if isinstance(value, list):
+                if value:
+                    items = ',\n        '.join(json.dumps(item, ensure_ascii=False) for item in value)
+                    encoded = f'[\n        {items}\n      ]'
+                else:
+                    encoded = '[]'
+            else:
+                encoded = json.dumps(value, ensure_ascii=False)
+            parts.append(f'      "{name}": {encoded}')
+        out.write(('\n' if self._first else ',\n') + '    {\n' + ',\n'.join(parts) + '\n    }')
+        self._first = False
+    
+    def end(self, out: ExportOutput, meta: Dict):
+        out.write(']\n}' if self._first else '\n  ]\n}')
+
+
+class EmbeddingSink(ExportSink):
+    """
+    Export optimized format for embedding generation
+    Each hadith with metadata that will be stored alongside embedding
+    """
+    
+    label = 'for embedding'
+    suffix = '-for-embedding.jsonl'
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        content_hash, text_hash = content_hashes(hadith)
+        
+        # Create embedding-optimized record
+        record = {
+            'id': hadith_id(hadith),
+            'row_id': str(hadith_uuid(hadith)),
+            'collection': hadith.collection,
+            'collection_name': hadith.collection_name,
+            'reference': hadith.reference,
+            'text': hadith.english_text,  # Main text for embedding
+            'arabic': hadith.arabic_text,
+            **search_forms(hadith),
+            'metadata': {
+                'book_number': hadith.book_number,
+                'book_name': hadith.book_name,
+                'book_topic': hadith.book_topic,
+                'chapter_name': hadith.chapter_name,
+                'chapter_topic': hadith.chapter_topic,
+                'grade': hadith.grade,
+                'graded_by': hadith.graded_by,
+                'narrator': hadith.primary_narrator,
+                'keywords': hadith.keywords,
+                'url': hadith.source_url
+            },
+            'content_hash': content_hash,
+            'text_hash': text_hash,
+            'canonical_id': canonical_id(hadith)
+        }
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class PgCopySink(ExportSink):
+    """
+    HadithText rows in PostgreSQL binary COPY format, loaded with
+    COPY "HadithText" (PG_COPY_COLUMNS) FROM STDIN (FORMAT binary).
+    
+    Rows carry their hadith_uuid ids; createdAt is left to its default and the
+    generated searchVector column is computed by the server. Optional text
+    columns are NULL when empty, as in ingest-hadith.ts.
+    """
+    
+    label = 'PostgreSQL COPY'
+    suffix = '-hadith-text.pgcopy'
+    binary = True
+    
+    SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+    
+    # (HadithText column, Hadith or search_forms field, kind);
+    # kinds: uuid, int, text, nullable text
+    COLUMNS = (
+        ('id', None, 'uuid'),
+        ('collection', 'collection', 'text'),
+        ('collectionName', 'collection_name', 'text'),
+        ('hadithNumber', 'hadith_number', 'int'),
+        ('reference', 'reference', 'text'),
+        ('englishText', 'english_text', 'text'),
+        ('arabicText', 'arabic_text', 'text'),
+        ('bookNumber', 'book_number', 'int'),
+        ('bookName', 'book_name', 'nullable text'),
+        ('chapterNumber', 'chapter_number', 'int'),
+        ('chapterName', 'chapter_name', 'nullable text'),
+        ('grade', 'grade', 'nullable text'),
+        ('narratorChain', 'narrator_chain', 'nullable text'),
+        ('sourceUrl', 'source_url', 'nullable text'),
+        ('englishNormalized', 'english_normalized', 'nullable text'),
+        ('arabicNormalized', 'arabic_normalized', 'nullable text'),
+        ('englishTokenCount', 'english_tokens', 'int'),
+        ('arabicTokenCount', 'arabic_tokens', 'int'),
+    )
+    
+    _int16 = struct.Struct('>h')
+    _int32 = struct.Struct('>i')
+    _null = _int32.pack(-1)
+    
+    def begin(self, out: ExportOutput, meta: Dict):
+        # Signature, flags (no OIDs) and header extension length
+        out.write(self.SIGNATURE + self._int32.pack(0) + self._int32.pack(0))
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        int32 = self._int32.pack
+        forms = search_forms(hadith)
+        parts = [self._int16.pack(len(self.COLUMNS))]
+        for _, name, kind in self.COLUMNS:
+            if kind == 'uuid':
+                parts.append(int32(16))
+                parts.append(hadith_uuid(hadith).bytes)
+                continue
+            value = forms[name] if name in forms else getattr(hadith, name)
+            if value is None or (kind == 'nullable text' and not value):
+                parts.append(self._null)
+            elif kind == 'int':
+                parts.append(int32(4))
+                parts.append(int32(value))
+            else:
+                data = value.encode('utf-8')
+                parts.append(int32(len(data)))
+                parts.append(data)
+        out.write(b''.join(parts))
+    
+    def end(self, out: ExportOutput, meta: Dict):
+        out.write(self._int16.pack(-1))
+
+
+# Column list for COPY ... FROM STDIN, in file order
+PG_COPY_COLUMNS = ', '.join(f'"{column}"' for column, _, _ in PgCopySink.COLUMNS)
+
+
+class DeltaManifestSink(ExportSink):
+    """
+    Ids added, changed and removed since the previous embedding export, so
+    ingestion can upsert and re-embed only what changed.
+    
+    The previous export is read before it is replaced. While a manifest has
+    not been marked applied (ingestion sets "applied_at"), later exports are
+    folded into it, so no change is lost between two ingestions.
+    """
+    
+    label = 'delta manifest'
+    suffix = '-delta.json'
+    
+    def __init__(self, filename: Optional[str] = None, previous_file: Optional[str] = None):
+        """
+        Args:
+            filename: Manifest file name (default: <collection>-delta.json)
+            previous_file: Embedding export to compare against
+                (default: <collection>-for-embedding.jsonl)
+        """
+        super().__init__(filename)
+        self.previous_file = previous_file
+    
+    def begin(self, out: ExportOutput, meta: Dict):
+        previous_path = meta['output_dir'] / (
+            self.previous_file or EmbeddingSink().filename_for(meta['collection'])
+        )
+        
+        # Ids are tracked by hadith number and hashes as raw digests, so a
+        # large collection costs about 100 bytes per record here.
+        # number -> content digest + text digest; None for exports written
+        # before hashes existed
+        self.previous: Dict[int, Optional[bytes]] = {}
+        if previous_path.exists():
+            with open(previous_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    hashes = None
+                    if 'content_hash' in record:
+                        hashes = bytes.fromhex(record['content_hash'] + (record.get('text_hash') or ''))
+                    self.previous[self._number(record['id'])] = hashes
+        
+        self.pending = {}
+        if out.path.exists():
+            try:
+                with open(out.path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if not manifest.get('applied_at'):
+                    self.pending = manifest
+            except (OSError, ValueError):
+                pass
+        
+        self.seen = set()
+        self.added = []
+        self.changed = []
+        self.text_changed = set()
+    
+    @staticmethod
+    def _number(record_id: str) -> int:
+        return int(record_id.rsplit(':', 1)[1])
+    
+    def write(self, out: ExportOutput, hadith: Hadith):
+        number = hadith.hadith_number
+        self.seen.add(number)
+        content_hash, text_hash = content_hashes(hadith)
+        
+        if number not in self.previous:
+            self.added.append(number)
+            return
+        previous = self.previous[number]
+        if previous is None or previous[:32].hex() != content_hash:
+            self.changed.append(number)
+            if previous is None or previous[32:].hex() != text_hash:
+                self.text_changed.add(number)
+    
+    def end(self, out: ExportOutput, meta: Dict):
+        added_now = set(self.added)
+        changed_now = set(self.changed)
+        removed_now = {number for number in self.previous if number not in self.seen}
+        
+        # Fold in a manifest that ingestion has not applied yet
+        pending_added, pending_changed, pending_text, pending_removed = (
+            {self._number(record_id) for record_id in self.pending.get(key, ())}
+            for key in ('added', 'changed', 'text_changed', 'removed')
+        )
+        
+        readded = added_now & pending_removed
+        added = (added_now - pending_removed) | (pending_added - removed_now)
+        removed = (removed_now - pending_added) | (pending_removed - added_now)
+        changed = ((changed_now | pending_changed) - pending_added - removed_now) | readded
+        text_changed = ((self.text_changed | pending_text) & changed) | readded
+        
+        def ordered(numbers):
+            return [f"{meta['collection']}:{number}" for number in sorted(numbers)]
+        
+        out.write('{\n')
+        out.write(f'  "collection": {json.dumps(meta["collection"])},\n')
+        out.write(f'  "generated_at": {json.dumps(datetime.now().isoformat())},\n', volatile=True)
+        if self.pending:
+            out.write(f'  "since": {json.dumps(self.pending.get("since") or self.pending.get("generated_at"))},\n',
+                      volatile=True)
+        else:
+            out.write(f'  "since": {json.dumps(datetime.now().isoformat())},\n', volatile=True)
+        out.write(f'  "total": {meta["total_hadiths"]},\n')
+        for key, ids in (('added', added), ('changed', changed),
+                         ('text_changed', text_changed), ('removed', removed)):
+            out.write(f'  {json.dumps(key)}: {json.dumps(ordered(ids))},\n')
+        out.write(f'  "unchanged": {meta["total_hadiths"] - len(added) - len(changed)}\n}}\n')
+        
+        print(f"✓ Delta: {len(added)} added, {len(changed)} changed "
+              f"({len(text_changed)} to re-embed), {len(removed)} removed")
+
+
+def default_sinks(pg_copy: bool = False, search_index: bool = False) -> List[ExportSink]:
+    """
+    The standard export formats
+    
+    Args:
+        pg_copy: Also write the PostgreSQL binary COPY file
+        search_index: Also update the local search index
+    """
+    sinks = [PipeSink(), JsonSink(), EmbeddingSink(), DeltaManifestSink()]
+    if pg_copy:
+        sinks.append(PgCopySink())
+    if search_index:
+        # Last, so its transaction commits only after the other sinks finished
+        sinks.append(SearchIndexSink())
+    return sinks
+
+
+class HadithExporter:
+    """
+    Writes a collection to every registered sink in a single pass.
+    
+    Records are sorted once and streamed to all sinks, so no sink builds the
+    full export in memory. Output files whose stable content did not change
+    are left untouched; their digests are kept in .export-state.json.
+    """
+    
+    STATE_FILE = '.export-state.json'
+    
+    def __init__(
+        self,
+        output_dir: Path,
+        collection: str,
+        collection_name: str,
+        sinks: Optional[List[ExportSink]] = None
+    ):
+        """
+        Args:
+            output_dir: Directory to write the exports to
+            collection: Collection key, used for default file names
+            collection_name: Display name stored in the JSON export
+            sinks: Output formats (default: pipe, full JSON, embedding JSONL
+                and the delta manifest)
+        """
+        self.output_dir = Path(output_dir)
+        self.collection = collection
+        self.collection_name = collection_name
+        self.sinks = sinks if sinks is not None else default_sinks()
+        self.state_file = self.output_dir / self.STATE_FILE
+    
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_state(self, state: Dict):
+        tmp_path = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+    
+    def export(
+        self,
+        hadiths: Iterable[Hadith],
+        presorted: bool = False,
+        total: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """
+        Export hadiths to every sink.
+        
+        Args:
+            hadiths: Records to export
+            presorted: True if hadiths already come in (book, hadith) order
+            total: Number of records; with presorted, lets an iterator be
+                streamed without being collected first
+        
+        Returns:
+            Output file name -> True if the file was rewritten
+        """
+        if not presorted:
+            hadiths = sorted(hadiths, key=lambda h: (h.book_number, h.hadith_number))
+        if total is None:
+            hadiths = hadiths if isinstance(hadiths, list) else list(hadiths)
+            total = len(hadiths)
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        outputs = [
+            ExportOutput(self.output_dir / sink.filename_for(self.collection), binary=sink.binary)
+            for sink in self.sinks
+        ]
+        meta = {
+            'collection': self.collection,
+            'collection_name': self.collection_name,
+            'total_hadiths': total,
+            'output_dir': self.output_dir
+        }
+        
+        try:
+            pairs = list(zip(self.sinks, outputs))
+            for sink, out in pairs:
+                sink.begin(out, meta)
+            for hadith in hadiths:
+                for sink, out in pairs:
+                    sink.write(out, hadith)
+            for sink, out in pairs:
+                sink.end(out, meta)
+            digests = [out.close() for out in outputs]
+        except BaseException:
+            for out in outputs:
+                out.close()
+                out.tmp_path.unlink(missing_ok=True)
+            raise
+        
+        state = self._load_state()
+        written = {}
+        for sink, out, digest in zip(self.sinks, outputs, digests):
+            name = out.path.name
+            previous = state.get(name)
+            unchanged = False
+            if previous and previous['sha256'] == digest and out.path.exists():
+                stat = out.path.stat()
+                unchanged = (stat.st_size, stat.st_mtime_ns) == (previous['size'], previous['mtime_ns'])
+            
+            if unchanged:
+                out.tmp_path.unlink()
+                print(f"⊙ Unchanged {sink.label}: {out.path}")
+            else:
+                os.replace(out.tmp_path, out.path)
+                stat = out.path.stat()
+                state[name] = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                print(f"✓ Exported {sink.label}: {out.path}")
+            written[name] = not unchanged
+        
+        self._save_state(state)
+        return written
+
+
+class HadithScraper:
+    """Universal scraper for hadith collections from sunnah.com"""
+    
+    BASE_URL = "https://sunnah.com"
+    
+    def __init__(
+        self, 
+        collection: str,
+        delay: float = 0.25,
+        output_dir: str = "./data",
+        concurrency: int = 1,
+        rate: Optional[float] = None,
+        base_url: Optional[str] = None,
+        parser: str = 'compiled',
+        parse_workers: int = 0,
+        queue_size: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        compact_memory: bool = False,
+        streaming: bool = False,
+        sort_window: int = 2000,
+        session: Optional[requests.Session] = None,
+        keywords_file: Optional[str] = None,
+        metrics: Optional[ScrapeMetrics] = None,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        adaptive: bool = True
+    ):
+        """
+        Initialize scraper
+        
+        Args:
+            collection: Collection key (e.g., 'bukhari', 'muslim')
+            delay: Delay between requests in seconds (sequential mode)
+            output_dir: Directory to save output files
+            concurrency: Maximum number of requests in flight
+            rate: Global limit in requests per second for concurrent mode
+                (defaults to 1/delay)
+            base_url: Site root to scrape instead of sunnah.com (e.g. a local
+                stand-in server)
+            parser: Parser backend ('compiled', 'html.parser' or 'lxml')
+            parse_workers: Parser worker processes (0 parses on the fetch threads)
+            queue_size: Raw pages allowed to wait for parsing
+                (defaults to twice the parser or fetch parallelism)
+            cache_dir: Directory for the raw page cache (None disables it)
+            compact_memory: Keep hadiths in a columnar HadithTable instead of
+                a list of objects
+            streaming: Keep hadiths only in the progress journal (HadithSpool)
+                and export them with an external merge sort
+            sort_window: Records held in memory per sorted run with streaming
+            session: HTTP session to share with other scrapers (default: a
+                new pooled session)
+            keywords_file: Keyword vocabulary (default: scripts/hadith-keywords.json)
+            metrics: Phase timings and counters, shareable with other scrapers
+                (default: a new ScrapeMetrics)
+            timeout: Seconds to wait for a connection or for response data
+            retries: Retries for timeouts, connection errors and 429/5xx responses
+            backoff: Base of the jittered exponential backoff between retries, in seconds
+            adaptive: In concurrent mode, adjust the requests in flight (up to
+                `concurrency`) from server feedback instead of keeping it fixed
+        """
+        if collection not in HADITH_COLLECTIONS:
+            raise ValueError(
+                f"Unknown collection: {collection}. "
+                f"Available: {', '.join(HADITH_COLLECTIONS.keys())}"
+            )
+        
+        self.collection = collection
+        self.collection_info = HADITH_COLLECTIONS[collection]
+        self.delay = delay
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.parse_workers = max(0, parse_workers)
+        self.queue_size = queue_size or 2 * max(self.parse_workers, self.concurrency)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.adaptive = adaptive
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
+        keywords = KeywordEngine.from_file(Path(keywords_file)) if keywords_file else None
+        self.metrics = metrics or ScrapeMetrics()
+        self.parser = HadithParser(collection, parser, self.BASE_URL, keywords)
+        self.parser.metrics = self.metrics
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.cache = PageCache(Path(cache_dir)) if cache_dir else None
+        self.compact_memory = compact_memory
+        
+        self.session = session or self.create_session(self.concurrency, self.metrics)
+        
+        # Shared by MultiCollectionScraper; pipelines create their own otherwise
+        self.budget: Optional[RequestBudget] = None
+        self.fetch_pool: Optional[ThreadPoolExecutor] = None
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        self.log_prefix = ''
+        
+        self.progress_file = self.output_dir / f"{collection}_progress.jsonl"
+        self.journal = ProgressJournal(self.progress_file)
+        self.scraped = ScrapedIndex(self.output_dir / f"{collection}_scraped.idx")
+        # Records are read from the journal on first access (see hadiths)
+        self._hadiths = HadithSpool(self.journal, self.scraped, sort_window) if streaming else None
+        self.ledger = FailureLedger(self.output_dir / f"{collection}_ledger.json")
+        # Record id -> near-duplicates in any collection, set by dedup_collections
+        self.related: Optional[Dict[str, List[str]]] = None
+        self.load_progress()
+        # Why the last fetch or parse of a URL failed, for the ledger (see classify_failure)
+        self.fetch_errors: Dict[str, Tuple[str, bool]] = {}
+    
+    @staticmethod
+    def create_session(concurrency: int, metrics: Optional[ScrapeMetrics] = None) -> requests.Session:
+        """
+        HTTP session with a connection pool sized for `concurrency` requests.
+        With `metrics`, the time spent connecting is recorded.
+        """
+        session = requests.Session()
+        pool_options = dict(pool_connections=1, pool_maxsize=max(10, concurrency))
+        adapter = TimedHTTPAdapter(metrics, **pool_options) if metrics else HTTPAdapter(**pool_options)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9',
+            'Accept-Language': 'en-GB,en-US;q=0.9,en;q=0.8',
+        })
+        return session
+    
+    def load_progress(self):
+        """
+        Find the hadiths already scraped from the scraped-id index, without
+        loading their records; a missing or stale index is rebuilt from the
+        journal
+        """
+        legacy_file = self.output_dir / f"{self.collection}_progress.json"
+        started = time.perf_counter()
+        try:
+            if not self.progress_file.exists():
+                if not legacy_file.exists():
+                    return
+                # Migrate a progress file written before the journal existed
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    self.journal.compact(json.load(f).get('hadiths', []))
+            
+            journal_size = self.progress_file.stat().st_size
+            covered = self.scraped.load()
+            if not (covered and covered[0] <= journal_size and self._ends_line(covered[0])):
+                covered = None
+                self.scraped.set_numbers(ScrapedIndex.DONE, ())
+            # With an index, only records appended after it was saved are read
+            start, lines = covered or (0, 0)
+            for _, record in self.journal.scan(start):
+                self.scraped.add(ScrapedIndex.DONE, record['hadith_number'])
+            scanned = self.journal.lines
+            self.journal.lines += lines
+            
+            self.scraped.set_numbers(ScrapedIndex.MISSING, sorted(self.ledger.missing))
+            self.scraped.set_numbers(ScrapedIndex.FAILED, sorted(self.ledger.failed))
+            if scanned or not covered:
+                self.save_index()
+            
+            elapsed = (time.perf_counter() - started) * 1000
+            if not covered:
+                source = 'index rebuilt from the journal'
+            elif scanned:
+                source = f'index + {scanned} journal lines written since'
+            else:
+                source = 'index'
+            print(f"✓ Found {self.scraped_count()} previously scraped hadiths "
+                  f"({source}, {elapsed:.1f} ms)")
+        except Exception as e:
+            print(f"⚠ Could not load progress: {e}")
+    
+    def _ends_line(self, offset: int) -> bool:
+        """True if the journal has a line break just before `offset`"""
+        if offset == 0:
+            return True
+        with open(self.progress_file, 'rb') as f:
+            f.seek(offset - 1)
+            return f.read(1) == b'\n'
+    
+    def save_index(self):
+        """Write the scraped-id index, covering the journal as it is now"""
+        try:
+            self.journal.sync()
+            size = self.progress_file.stat().st_size if self.progress_file.exists() else 0
+            self.scraped.save(size, self.journal.lines)
+        except Exception as e:
+            print(f"⚠ Could not save the scraped-id index: {e}")
+    
+    def scraped_count(self) -> int:
+        """Number of hadiths scraped, without loading their records"""
+        return self.scraped.count(ScrapedIndex.DONE)
+    
+    @property
+    def hadiths(self):
+        """The scraped records, read from the journal on first access"""
+        if self._hadiths is None:
+            self._hadiths = self._store(Hadith(**h) for h in self.journal.replay())
+        return self._hadiths
+    
+    @hadiths.setter
+    def hadiths(self, hadiths):
+        self._hadiths = hadiths
+    
+    def _store(self, hadiths: Iterable[Hadith]):
+        """Hold hadiths in a list, or a HadithTable with compact_memory"""
+        return HadithTable(hadiths) if self.compact_memory else list(hadiths)
+    
+    def save_progress(self):
+        """Save current progress as a compacted journal"""
+        try:
+            with self.metrics.timer('checkpoint'):
+                if self._hadiths is None:
+                    records = self.journal.replay()
+                else:
+                    records = (asdict(h) for h in self._hadiths)
+                numbers = []
+                
+                def tracked(records):
+                    for record in records:
+                        numbers.append(record['hadith_number'])
+                        yield record
+                
+                self.journal.compact(tracked(records))
+                self.scraped.set_numbers(ScrapedIndex.DONE, sorted(numbers))
+            self.save_index()
+        except Exception as e:
+            print(f"⚠ Could not save progress: {e}")
+    
+    def keep(self, hadith: Hadith):
+        """Store a newly scraped hadith and append it to the progress journal"""
+        if self._hadiths is not None:
+            self._hadiths.append(hadith)
+        self.scraped.add(ScrapedIndex.DONE, hadith.hadith_number)
+        self.checkpoint(hadith)
+    
+    def checkpoint(self, hadith: Hadith):
+        """Append a newly scraped hadith to the progress journal"""
+        try:
+            with self.metrics.timer('checkpoint'):
+                self.journal.append([asdict(hadith)])
+            if self.journal.needs_compaction(self.scraped_count()):
+                self.save_progress()
+        except Exception as e:
+            print(f"⚠ Could not save progress: {e}")
+    
+    def hadith_url(self, hadith_num: int) -> str:
+        """URL of a single hadith page"""
+        return f"{self.BASE_URL}/{self.collection}:{hadith_num}"
+    
+    def fetch_page(self, url: str, limit: Optional[AdaptiveLimit] = None) -> bytes:
+        """
+        Download a page and return the raw response body.
+        With a cache, revalidates the stored copy using a conditional request.
+        
+        Timeouts, connection errors and 429/5xx responses are retried up to
+        `retries` times with jittered exponential backoff, waiting at least
+        as long as a Retry-After header asks. Each outcome is reported to
+        `limit` (adaptive concurrency) when given.
+        """
+        entry = self.cache.lookup(url) if self.cache else None
+        headers = self.cache.conditional_headers(entry) if self.cache else {}
+        
+        attempt = 0
+        while True:
+            retry_after = None
+            timer = self.metrics.timer('ttfb')
+            try:
+                response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+                latency = timer.log() / 1000
+                with self.metrics.timer('download'):
+                    content = response.content
+            except TRANSIENT_ERRORS as e:
+                failure = e
+                reason = type(e).__name__
+                self.metrics.count('http_errors', error=reason)
+            except requests.RequestException as e:
+                self.metrics.count('http_errors', error=type(e).__name__)
+                raise
+            else:
+                self.metrics.count('http_responses', status=response.status_code)
+                self.metrics.count('bytes_downloaded', len(content))
+                if response.status_code not in RETRY_STATUSES:
+                    if limit and limit.on_success(latency):
+                        self.metrics.count('concurrency_cuts', reason='latency')
+                    break
+                reason = str(response.status_code)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                failure = requests.HTTPError(
+                    f"{response.status_code} {response.reason} for url: {url}", response=response
+                )
+            
+            if limit and limit.on_congestion(retry_after):
+                self.metrics.count('concurrency_cuts', reason=reason)
+            if attempt >= self.retries:
+                raise failure
+            self.metrics.count('retries', reason=reason)
+            with self.metrics.timer('backoff'):
+                time.sleep(self._retry_delay(attempt, retry_after))
+            attempt += 1
+        
+        if response.status_code == 304 and entry:
+            return self.cache.read(entry)
+        response.raise_for_status()
+        
+        if self.cache:
+            self.cache.store(url, content, response.headers)
+        return content
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, but no shorter than Retry-After"""
+        delay = random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, MAX_RETRY_AFTER))
+        return delay
+    
+    def collection_url(self) -> str:
+        """URL of the collection index page listing its books"""
+        return f"{self.BASE_URL}/{self.collection}"
+    
+    def book_url(self, book) -> str:
+        """URL of a book page listing all of its hadiths"""
+        return f"{self.BASE_URL}/{self.collection}/{book}"
+    
+    def book_ids(self) -> List:
+        """Book page ids: unnumbered books first, then 1..books"""
+        return (
+            list(self.collection_info.get('extra_books', []))
+            + list(range(1, self.collection_info['books'] + 1))
+        )
+    
+    def scrape_hadith(self, hadith_num: int) -> Optional[Hadith]:
+        """Scrape a single hadith with comprehensive metadata"""
+        url = self.hadith_url(hadith_num)
+        
+        try:
+            content = self.fetch_page(url)
+        except Exception as e:
+            self.fetch_errors[url] = classify_failure(e)
+            if not self.fetch_errors[url][1]:
+                print(f"✗ Error scraping hadith {hadith_num}: {e}")
+            return None
+        
+        try:
+            return self.parser.parse(content, hadith_num, url)
+        except ParseError as e:
+            self.fetch_errors[url] = (str(e), False)
+            return None
+    
+    def concurrent(self) -> bool:
+        """True when scraping runs through the concurrent pipeline"""
+        return self.concurrency > 1 or self.rate is not None or self.parse_workers > 0
+    
+    def scrape_all(
+        self,
+        start_num: int = 1,
+        end_num: Optional[int] = None,
+        retry_failed: bool = False
+    ) -> Dict[str, int]:
+        """
+        Scrape all hadiths in range, skipping those already scraped and the
+        permanent misses in the failure ledger
+        
+        Args:
+            start_num: First hadith number
+            end_num: Last hadith number (default: the collection's total, or
+                the last number in a seeded index if higher)
+            retry_failed: Request only the ledger's transient failures
+        """
+        if self.concurrent():
+            return asyncio.run(self.scrape_all_async(start_num, end_num, retry_failed))
+        
+        pending = self._start_scrape(start_num, end_num, retry_failed)
+        return self._finish_scrape(self._scrape_sequential(pending))
+    
+    async def scrape_all_async(
+        self,
+        start_num: int = 1,
+        end_num: Optional[int] = None,
+        retry_failed: bool = False
+    ) -> Dict[str, int]:
+        """Scrape all hadiths in range through the concurrent pipeline"""
+        pending = self._start_scrape(start_num, end_num, retry_failed)
+        counts = {'success': 0, 'fail': 0, 'missing': 0}
+        await self._run_pipeline(
+            pending,
+            'hadith',
+            self.hadith_url,
+            self.parser.parse,
+            lambda hadith_num, hadith: self._record_result(hadith_num, hadith, counts)
+        )
+        return self._finish_scrape(counts)
+    
+    def _start_scrape(self, start_num: int, end_num: Optional[int], retry_failed: bool = False) -> List[int]:
+        """Print the run header and return the hadith numbers still to scrape"""
+        if end_num is None:
+            end_num = max(self.collection_info['total_hadiths'], self.ledger.last_hadith())
+        
+        print(f"\n{'='*60}")
+        print(f"Scraping: {self.collection_info['name']}")
+        print(f"Range: {start_num} to {end_num}")
+        if self.ledger.index:
+            print(f"Index: {len(self.ledger.index['hadiths'])} hadiths "
+                  f"(seeded {self.ledger.index['seeded_at'][:10]})")
+        if retry_failed:
+            print(f"Retrying transient failures only")
+        if self.concurrent():
+            rate = self.budget.rate if self.budget else self._effective_rate()
+            print(f"Concurrency: {'up to ' if self.adaptive else ''}{self.concurrency} in flight"
+                  f"{' (adaptive)' if self.adaptive else ''}, "
+                  f"{f'{rate:g} req/s' if rate else 'no rate limit'}"
+                  f"{' (shared)' if self.budget else ''}")
+            print(f"Parsing: {self.parser.backend}, "
+                  f"{self.parse_workers or 'no'} worker processes")
+        else:
+            print(f"Delay: {self.delay}s between requests")
+        print(f"{'='*60}\n")
+        
+        pending = []
+        skipped: Dict[str, List[int]] = {}
+        
+        if retry_failed:
+            numbers = sorted(n for n in self.ledger.failed if start_num <= n <= end_num)
+        else:
+            numbers = range(start_num, end_num + 1)
+        for hadith_num in numbers:
+            if self.scraped.has(ScrapedIndex.DONE, hadith_num):
+                skipped.setdefault('already scraped', []).append(hadith_num)
+                continue
+            skip_reason = self.ledger.skip_reason(hadith_num)
+            if skip_reason:
+                skipped.setdefault(skip_reason, []).append(hadith_num)
+                continue
+            pending.append(hadith_num)
+        
+        for reason, skipped_numbers in skipped.items():
+            print(f"⊙ {self.log_prefix}Skipping {len(skipped_numbers)} ({reason}): "
+                  f"{format_ranges(skipped_numbers)}")
+        if skipped:
+            print()
+        
+        return pending
+    
+    def _finish_scrape(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """Save the failure ledger and the scraped-id index, and print the run summary"""
+        try:
+            self.ledger.save()
+        except Exception as e:
+            print(f"⚠ Could not save failure ledger: {e}")
+        self.scraped.set_numbers(ScrapedIndex.MISSING, sorted(self.ledger.missing))
+        self.scraped.set_numbers(ScrapedIndex.FAILED, sorted(self.ledger.failed))
+        self.save_index()
+        
+        print(f"\n{'='*60}")
+        if self.log_prefix:
+            print(f"Scraping Complete! ({self.collection_info['name']})")
+        else:
+            print(f"Scraping Complete!")
+        print(f"{'='*60}")
+        print(f"Total hadiths: {self.scraped_count()}")
+        if 'pages' in counts:
+            print(f"Book pages fetched: {counts['pages']} of {counts['books']}")
+            print(f"New hadiths: {counts['success']}")
+            print(f"Failed books: {counts['fail']}")
+        else:
+            print(f"Successful: {counts['success']}")
+            print(f"Not found: {counts['missing']} (skipped on later runs)")
+            print(f"Failed: {counts['fail']} (retry with --retry-failed)")
+        print(f"{'='*60}\n")
+        return counts
+    
+    def scrape_books(
+        self,
+        start_num: int = 1,
+        end_num: Optional[int] = None,
+        books: Optional[List] = None
+    ) -> Dict[str, int]:
+        """
+        Scrape whole book pages, extracting every hadith listed on each page.
+        Needs one request per book instead of one per hadith. Hadiths outside
+        start_num..end_num or already scraped are skipped.
+        
+        Args:
+            start_num: First hadith number to keep
+            end_num: Last hadith number to keep
+            books: Book ids to fetch (default: all, see book_ids)
+        """
+        if self.concurrent():
+            return asyncio.run(self.scrape_books_async(start_num, end_num, books))
+        
+        books, record_book, counts = self._start_books(start_num, end_num, books)
+        for book in books:
+            url = self.book_url(book)
+            content = self._fetch_or_none(url, f"book {book}")
+            record_book(book, self.parser.parse_book(content, book, url) if content else None)
+            with self.metrics.timer('rate_wait'):
+                time.sleep(self.delay)
+        return self._finish_scrape(counts)
+    
+    async def scrape_books_async(
+        self,
+        start_num: int = 1,
+        end_num: Optional[int] = None,
+        books: Optional[List] = None
+    ) -> Dict[str, int]:
+        """Scrape whole book pages through the concurrent pipeline"""
+        books, record_book, counts = self._start_books(start_num, end_num, books)
+        await self._run_pipeline(
+            books, 'book', self.book_url, self.parser.parse_book, record_book
+        )
+        return self._finish_scrape(counts)
+    
+    def _start_books(
+        self,
+        start_num: int,
+        end_num: Optional[int],
+        books: Optional[List] = None
+    ) -> Tuple[List, Callable, Dict[str, int]]:
+        """Print the bulk run header; returns the books, a result callback and its counters"""
+        if end_num is None:
+            end_num = self.collection_info['total_hadiths']
         
-        output_file = self.output_dir / filename
-        sorted_hadiths = sorted(self.hadiths, key=lambda h: (h.book_number, h.hadith_number))
+        books = self.book_ids() if books is None else books
+        
+        print(f"\n{'='*60}")
+        print(f"Scraping book pages: {self.collection_info['name']}")
+        print(f"Books: {len(books)}, hadith range: {start_num} to {end_num}")
+        print(f"{'='*60}\n")
+        
+        counts = {'success': 0, 'fail': 0, 'pages': 0, 'books': len(books)}
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for hadith in sorted_hadiths:
-                line = f"{hadith.book_number:03d}|{hadith.hadith_number:04d}|{hadith.english_text}\n"
-                f.write(line)
+        def record_book(book, hadiths: Optional[List[Hadith]]):
+            self.fetch_errors.pop(self.book_url(book), None)
+            self.metrics.count('pages', collection=self.collection, kind='book',
+                               result='failed' if hadiths is None else 'ok')
+            if hadiths is None:
+                counts['fail'] += 1
+                print(f"✗ {self.log_prefix}Book {book}: Failed")
+                return
+            
+            counts['pages'] += 1
+            added = 0
+            for hadith in hadiths:
+                if not start_num <= hadith.hadith_number <= end_num:
+                    continue
+                if self.scraped.has(ScrapedIndex.DONE, hadith.hadith_number):
+                    continue
+                self.keep(hadith)
+                added += 1
+            counts['success'] += added
+            print(f"✓ {self.log_prefix}Book {book}: {len(hadiths)} hadiths ({added} new)")
         
-        print(f"✓ Exported pipe format: {output_file}")
+        return books, record_book, counts
     
-    def export_to_json(self, filename: Optional[str] = None):
-        """Export full metadata to JSON"""
-        if filename is None:
-            filename = f"{self.collection}-full.json"
+    def seed_index(self) -> bool:
+        """
+        Read the collection's real hadith numbers from its index page and
+        every book page it links to, and keep them in the failure ledger so
+        that numbers the site does not have are never requested. Book pages
+        land in the page cache like any other page.
         
-        output_file = self.output_dir / filename
-        sorted_hadiths = sorted(self.hadiths, key=lambda h: (h.book_number, h.hadith_number))
+        Returns:
+            False, keeping any earlier index, if a page could not be read
+        """
+        if self.concurrent():
+            return asyncio.run(self.seed_index_async())
+        
+        url = self.collection_url()
+        content = self._fetch_or_none(url, 'collection index')
+        books = self._start_seed(self.parser.parse_index(content, None, url) if content else None)
+        found = {}
+        for book in books:
+            url = self.book_url(book)
+            content = self._fetch_or_none(url, f"book {book}")
+            found[book] = self.parser.parse_book_numbers(content, book, url) if content else None
+            with self.metrics.timer('rate_wait'):
+                time.sleep(self.delay)
+        return self._finish_seed(found)
+    
+    async def seed_index_async(self) -> bool:
+        """Seed the index through the concurrent pipeline"""
+        index = {}
+        await self._run_pipeline(
+            ['index'], 'index', lambda _: self.collection_url(), self.parser.parse_index, index.__setitem__
+        )
+        books = self._start_seed(index.get('index'))
+        found = {}
+        await self._run_pipeline(
+            books, 'book', self.book_url, self.parser.parse_book_numbers, found.__setitem__
+        )
+        return self._finish_seed(found)
+    
+    def _start_seed(self, listed: Optional[List]) -> List:
+        """Books to read for the index: those linked from the index page, else the configured ones"""
+        if not listed:
+            print(f"⚠ {self.log_prefix}No books found on the collection index page, "
+                  f"using the configured book list")
+            listed = self.book_ids()
+        print(f"→ {self.log_prefix}Seeding index from {len(listed)} book pages")
+        return listed
+    
+    def _finish_seed(self, found: Dict[Any, Optional[List[int]]]) -> bool:
+        """Store the hadith numbers found on every book page, unless a page failed"""
+        self.fetch_errors.clear()
+        for book, numbers in found.items():
+            self.metrics.count('pages', collection=self.collection, kind='index',
+                               result='failed' if numbers is None else 'ok')
+        unread = [str(book) for book, numbers in found.items() if numbers is None]
+        if unread:
+            print(f"⚠ {self.log_prefix}Index not updated: {len(unread)} book pages "
+                  f"could not be read ({', '.join(unread)})")
+            return False
+        
+        hadiths = {n for numbers in found.values() for n in numbers}
+        self.ledger.seed(hadiths, list(found))
+        print(f"✓ {self.log_prefix}Index: {len(hadiths)} hadiths in {len(found)} books, "
+              f"numbered up to {self.ledger.last_hadith()}")
+        return True
+    
+    def work_from_queue(
+        self,
+        queue: WorkQueue,
+        worker: str,
+        start_num: int = 1,
+        end_num: Optional[int] = None,
+        bulk: bool = False,
+        range_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Scrape as one of several workers sharing a WorkQueue.
+        
+        The first worker fills the queue with ranges of `range_size` hadith
+        numbers (50 by default), or of books with bulk (1 by default). Each
+        leased range is scraped like a normal run into this scraper's
+        output_dir, the worker's shard. merge_shards() combines the shards
+        afterwards. The request budget and fetch pool are kept across ranges,
+        so adaptive concurrency does not start over for every range; all
+        ranges run in one event loop, which the budget's locks are bound to.
+        
+        Returns:
+            Totals over the ranges this worker completed
+        """
+        kind = 'book' if bulk else 'hadith'
+        if end_num is None:
+            end_num = max(self.collection_info['total_hadiths'], self.ledger.last_hadith())
+        size = range_size or (1 if bulk else 50)
+        last = len(self.book_ids()) - 1 if bulk else end_num
+        first = 0 if bulk else start_num
+        ranges = [(n, min(n + size - 1, last)) for n in range(first, last + 1, size)]
+        settings = {
+            'collection': self.collection,
+            'kind': kind,
+            'start': start_num,
+            'end': end_num,
+            'range_size': size,
+        }
+        if queue.init(settings, ranges):
+            print(f"✓ Created work queue {queue.path}: {len(ranges)} {kind} ranges")
+        
+        totals = asyncio.run(self._work_ranges(queue, worker, start_num, end_num, bulk))
+        
+        status = queue.status()
+        print(f"✓ {worker}: {totals['ranges']} ranges, {totals['success']} new hadiths, "
+              f"{totals['fail']} failed; queue: "
+              + ', '.join(f"{count} {state}" for state, count in sorted(status.items())))
+        return totals
+    
+    async def _work_ranges(
+        self,
+        queue: WorkQueue,
+        worker: str,
+        start_num: int,
+        end_num: int,
+        bulk: bool
+    ) -> Dict[str, int]:
+        """Lease and scrape ranges until the queue has none left"""
+        if self.concurrent():
+            self.budget = RequestBudget(self.concurrency, self._effective_rate(), self.adaptive)
+            self.fetch_pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        totals = {'ranges': 0, 'success': 0, 'fail': 0, 'missing': 0}
+        try:
+            while True:
+                leased = queue.lease(worker)
+                if leased is None:
+                    break
+                range_id, first, last = leased
+                label = f"books {first + 1}-{last + 1}" if bulk else f"hadiths {first}-{last}"
+                print(f"→ {worker}: leased range {range_id} ({label})")
+                
+                with queue.hold(range_id, worker) as lease:
+                    if bulk and self.concurrent():
+                        counts = await self.scrape_books_async(
+                            start_num, end_num, self.book_ids()[first:last + 1]
+                        )
+                    elif bulk:
+                        counts = self.scrape_books(start_num, end_num, self.book_ids()[first:last + 1])
+                    elif self.concurrent():
+                        counts = await self.scrape_all_async(first, last)
+                    else:
+                        counts = self.scrape_all(first, last)
+                if lease.lost:
+                    print(f"⚠ {worker}: lease on range {range_id} expired while it was "
+                          f"being scraped; another worker may have scraped it too")
+                queue.complete(range_id, worker)
+                
+                totals['ranges'] += 1
+                for key in ('success', 'fail', 'missing'):
+                    totals[key] += counts.get(key, 0)
+        finally:
+            if self.fetch_pool:
+                self.fetch_pool.shutdown()
+            self.budget = self.fetch_pool = None
+        return totals
+    
+    def merge_shards(self, shards_dir: Path) -> Dict[str, int]:
+        """
+        Merge the worker shards under `shards_dir` (see work_from_queue) into
+        this scraper's progress journal and failure ledger.
+        
+        A hadith found in several shards (a range leased again after its
+        lease expired) keeps the record with the latest scrape_date; ties
+        go to the shard whose directory sorts first. The result therefore
+        does not depend on the order in which workers finished.
+        """
+        shard_files = sorted(Path(shards_dir).glob(f"*/{self.collection}_progress.jsonl"))
+        merged = {h.hadith_number: h for h in self.hadiths}
+        records = 0
+        for path in shard_files:
+            for record in ProgressJournal(path).replay():
+                records += 1
+                current = merged.get(record['hadith_number'])
+                if current is None or record['scrape_date'] > current.scrape_date:
+                    merged[record['hadith_number']] = Hadith(**record)
+        
+        for path in shard_files:
+            ledger_file = path.with_name(f"{self.collection}_ledger.json")
+            if ledger_file.exists():
+                self.ledger.merge(FailureLedger(ledger_file), merged)
+        
+        self.hadiths = self._store(merged.values())
+        self.save_progress()
+        self.ledger.save()
+        
+        print(f"✓ Merged {records} records from {len(shard_files)} shards: "
+              f"{len(self.hadiths)} hadiths, {len(self.ledger.missing)} missing, "
+              f"{len(self.ledger.failed)} failed")
+        return {'shards': len(shard_files), 'records': records, 'hadiths': len(self.hadiths)}
+    
+    def _scrape_sequential(self, numbers: List[int]) -> Dict[str, int]:
+        """Scrape hadiths one at a time with a fixed delay between requests"""
+        counts = {'success': 0, 'fail': 0, 'missing': 0}
+        
+        for hadith_num in numbers:
+            print(f"→ Scraping hadith {hadith_num}...", end=' ')
+            
+            hadith = self.scrape_hadith(hadith_num)
+            result = self._record_outcome(hadith_num, hadith)
+            
+            if hadith:
+                self.keep(hadith)
+                counts['success'] += 1
+                print(f"✓ {hadith.reference}")
+            elif result == 'missing':
+                counts['missing'] += 1
+                print(f"⊙ Not found ({self.ledger.missing[hadith_num]})")
+            else:
+                counts['fail'] += 1
+                print(f"✗ Failed")
+            
+            if sum(counts.values()) % 10 == 0:
+                print(f"  → Progress: {self.scraped_count()} hadiths saved\n")
+            
+            with self.metrics.timer('rate_wait'):
+                time.sleep(self.delay)
+        
+        return counts
+    
+    def _effective_rate(self) -> Optional[float]:
+        """Requests per second for concurrent mode (None means unlimited)"""
+        if self.rate is not None:
+            return self.rate if self.rate > 0 else None
+        return 1.0 / self.delay if self.delay > 0 else None
+    
+    async def _run_pipeline(
+        self,
+        items: List,
+        kind: str,
+        url_for: Callable[[Any], str],
+        parse: Callable[[bytes, Any, str], Any],
+        on_result: Callable[[Any, Any], None]
+    ):
+        """
+        Fetch and parse pages (hadiths or books) through a pipeline.
+        
+        Up to `concurrency` fetches run at once under a global token bucket
+        instead of a fixed sleep. Raw pages pass through a bounded queue to the
+        parse stage (a process pool when parse_workers > 0, so `parse` must be
+        picklable) and results reach `on_result` in the original item order.
+        A window of `queue_size` pages caps the work in progress, so fetchers
+        stall instead of piling up pages in memory when parsing falls behind.
+        """
+        loop = asyncio.get_running_loop()
+        budget = self.budget or RequestBudget(self.concurrency, self._effective_rate(), self.adaptive)
+        remaining = iter(enumerate(items))
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        window = asyncio.Semaphore(self.queue_size + self.concurrency)
+        parsed: Dict[int, Tuple[Any, Optional[asyncio.Future]]] = {}
+        ready = asyncio.Event()
+        
+        async def fetcher():
+            while True:
+                await window.acquire()
+                item = next(remaining, None)
+                if item is None:
+                    window.release()
+                    return
+                seq, key = item
+                timer = self.metrics.timer('rate_wait')
+                await budget.acquire()
+                timer.log()
+                try:
+                    url = url_for(key)
+                    content = await loop.run_in_executor(
+                        fetch_pool, self._fetch_or_none, url, f"{kind} {key}", budget.limit
+                    )
+                finally:
+                    budget.release()
+                await pages.put((seq, key, url, content))
+        
+        async def dispatcher():
+            for _ in range(len(items)):
+                seq, key, url, content = await pages.get()
+                future = None
+                if content is not None:
+                    if in_workers:
+                        future = loop.run_in_executor(parse_pool, parse_in_worker, parse, content, key, url)
+                    else:
+                        future = loop.run_in_executor(parse_pool, parse, content, key, url)
+                parsed[seq] = (key, url, future)
+                ready.set()
+        
+        async def collector():
+            for seq in range(len(items)):
+                while seq not in parsed:
+                    ready.clear()
+                    await ready.wait()
+                key, url, future = parsed.pop(seq)
+                try:
+                    result = await future if future else None
+                except ParseError as e:
+                    # Recorded as a transient failure, see _record_outcome
+                    self.fetch_errors[url] = (str(e), False)
+                    future = result = None
+                if future and in_workers:
+                    result, worker_metrics = result
+                    self.metrics.merge(worker_metrics)
+                window.release()
+                on_result(key, result)
+        
+        fetch_pool = self.fetch_pool or ThreadPoolExecutor(max_workers=self.concurrency)
+        parse_pool = self.parse_pool or (
+            ProcessPoolExecutor(max_workers=self.parse_workers)
+            if self.parse_workers > 0 else fetch_pool
+        )
+        in_workers = parse_pool is not fetch_pool
+        try:
+            fetchers = [fetcher() for _ in range(min(self.concurrency, len(items)))]
+            await asyncio.gather(*fetchers, dispatcher(), collector())
+            if budget.limit and budget is not self.budget:
+                print(f"  → Adaptive concurrency: {budget.limit.current} in flight at the end, "
+                      f"cut {budget.limit.cuts} times")
+        finally:
+            # Pools handed in by MultiCollectionScraper stay open for the other collections
+            if fetch_pool is not self.fetch_pool:
+                fetch_pool.shutdown()
+            if parse_pool is not fetch_pool and parse_pool is not self.parse_pool:
+                parse_pool.shutdown()
+    
+    def _fetch_or_none(self, url: str, label: str, limit: Optional[AdaptiveLimit] = None) -> Optional[bytes]:
+        """Fetch a page for the pipeline, reporting failures instead of raising"""
+        try:
+            return self.fetch_page(url, limit)
+        except Exception as e:
+            self.fetch_errors[url] = classify_failure(e)
+            if not self.fetch_errors[url][1]:
+                print(f"✗ Error scraping {label}: {e}")
+            return None
+    
+    def _record_outcome(self, hadith_num: int, hadith: Optional[Hadith]) -> str:
+        """
+        Update the failure ledger and page counters with a hadith page's
+        outcome: 'ok', 'missing' (permanent) or 'failed' (transient). Fetch
+        and parse errors are in fetch_errors; only a page that parsed cleanly
+        without a hadith container is a permanent miss.
+        """
+        error = self.fetch_errors.pop(self.hadith_url(hadith_num), None)
+        if hadith:
+            self.ledger.record_success(hadith_num)
+            result = 'ok'
+        elif error:
+            self.ledger.record_failure(hadith_num, *error)
+            result = 'missing' if error[1] else 'failed'
+        else:
+            # Fetched, but the page holds no hadith
+            self.ledger.record_failure(hadith_num, FailureLedger.NO_CONTAINER, True)
+            result = 'missing'
+        self.metrics.count('pages', collection=self.collection, kind='hadith', result=result)
+        return result
+    
+    def _record_result(self, hadith_num: int, hadith: Optional[Hadith], counts: Dict[str, int]):
+        """Store and checkpoint a pipeline result"""
+        result = self._record_outcome(hadith_num, hadith)
+        if hadith:
+            self.keep(hadith)
+            counts['success'] += 1
+            print(f"✓ {self.log_prefix}{hadith_num}: {hadith.reference}")
+        elif result == 'missing':
+            counts['missing'] += 1
+            print(f"⊙ {self.log_prefix}{hadith_num}: Not found ({self.ledger.missing[hadith_num]})")
+        else:
+            counts['fail'] += 1
+            print(f"✗ {self.log_prefix}{hadith_num}: Failed")
+        
+        if sum(counts.values()) % 10 == 0:
+            print(f"  → {self.log_prefix}Progress: {self.scraped_count()} hadiths saved")
+    
+    def reparse_from_cache(self, start_num: int = 1, end_num: Optional[int] = None):
+        """
+        Rebuild hadiths from cached pages without any network access.
+        Records whose page is not cached are kept as they are.
+        """
+        if not self.cache:
+            raise ValueError("Reparsing requires a page cache (cache_dir)")
+        if end_num is None:
+            end_num = self.collection_info['total_hadiths']
+        
+        print(f"\n{'='*60}")
+        print(f"Reparsing from cache: {self.collection_info['name']}")
+        print(f"Range: {start_num} to {end_num}")
+        print(f"Cache: {self.cache.cache_dir}")
+        print(f"{'='*60}\n")
+        
+        hadith_jobs = []
+        for hadith_num in range(start_num, end_num + 1):
+            url = self.hadith_url(hadith_num)
+            entry = self.cache.lookup(url)
+            if entry:
+                hadith_jobs.append((hadith_num, url, entry))
+        
+        book_jobs = []
+        for book in self.book_ids():
+            url = self.book_url(book)
+            entry = self.cache.lookup(url)
+            if entry:
+                book_jobs.append((book, url, entry))
+        
+        rebuilt = {}
+        
+        # Book pages first, so that per-hadith pages take precedence
+        book_results = self._parse_cached_jobs(self.parser.parse_book_cached, book_jobs)
+        for (_, _, entry), hadiths in zip(book_jobs, book_results):
+            for hadith in hadiths or []:
+                if start_num <= hadith.hadith_number <= end_num:
+                    hadith.scrape_date = entry['fetched_at']
+                    rebuilt[hadith.hadith_number] = hadith
+        
+        hadith_results = self._parse_cached_jobs(self.parser.parse_cached, hadith_jobs)
+        for (hadith_num, _, entry), hadith in zip(hadith_jobs, hadith_results):
+            if hadith:
+                hadith.scrape_date = entry['fetched_at']
+                rebuilt[hadith_num] = hadith
+        
+        if isinstance(self.hadiths, HadithSpool):
+            # Later journal lines supersede earlier ones
+            kept = set(self.scraped.numbers(ScrapedIndex.DONE)) - rebuilt.keys()
+            self.journal.append([asdict(h) for h in rebuilt.values()])
+        else:
+            kept = [h for h in self.hadiths if h.hadith_number not in rebuilt]
+            self.hadiths = self._store(kept + list(rebuilt.values()))
+        self.save_progress()
+        
+        print(f"✓ Reparsed {len(rebuilt)} hadiths from {len(hadith_jobs)} hadith pages "
+              f"and {len(book_jobs)} book pages "
+              f"({len(kept)} hadiths kept without a cached page)\n")
+    
+    def _parse_cached_jobs(self, parse_cached: Callable, jobs: List[Tuple]) -> List:
+        """Parse (key, url, cache entry) jobs, in parser processes if configured"""
+        keys = [key for key, _, _ in jobs]
+        urls = [url for _, url, _ in jobs]
+        entries = [entry for _, _, entry in jobs]
+        
+        if self.parse_workers > 0:
+            with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+                results = []
+                for result, worker_metrics in pool.map(
+                    parse_in_worker, repeat(parse_cached), repeat(self.cache), keys, urls, entries,
+                    chunksize=16
+                ):
+                    self.metrics.merge(worker_metrics)
+                    results.append(result)
+                return results
+        return list(map(parse_cached, repeat(self.cache), keys, urls, entries))
+    
+    def add_tfidf_keywords(self, top_n: int):
+        """
+        Add each hadith's most distinctive words within the collection (by
+        TF-IDF over english_text) to its keywords
+        """
+        hadiths = list(self.hadiths)
+        top_terms = self.parser.keywords.tfidf_terms([h.english_text for h in hadiths], top_n)
+        for hadith, terms in zip(hadiths, top_terms):
+            hadith.keywords = sorted(set(hadith.keywords) | set(terms))
+        self.hadiths = self._store(hadiths)
+        print(f"✓ Added up to {top_n} TF-IDF keywords to {len(hadiths)} hadiths")
+    
+    def export(self, sinks: Optional[List[ExportSink]] = None) -> Dict[str, bool]:
+        """
+        Write all export formats in one pass over the sorted hadiths.
+        Files whose content did not change are left untouched.
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'collection': self.collection,
-                'collection_name': self.collection_info['name'],
-                'total_hadiths': len(sorted_hadiths),
-                'export_date': datetime.now().isoformat(),
-                'hadiths': [asdict(h) for h in sorted_hadiths]
-            }, f, ensure_ascii=False, indent=2)
+        Args:
+            sinks: Output formats (default: pipe, full JSON, embedding JSONL
+                and the delta manifest)
+        """
+        exporter = HadithExporter(
+            self.output_dir, self.collection, self.collection_info['name'], sinks
+        )
+        with self.metrics.timer('export'):
+            if isinstance(self.hadiths, (HadithTable, HadithSpool)):
+                return exporter.export(
+                    self._with_related(self.hadiths.ordered()), presorted=True, total=len(self.hadiths)
+                )
+            return exporter.export(self._with_related(self.hadiths))
+    
+    def _with_related(self, hadiths: Iterable[Hadith]) -> Iterable[Hadith]:
+        """Fill related_hadiths from the near-duplicate clusters, once dedup_collections ran"""
+        if self.related is None:
+            return hadiths
         
-        print(f"✓ Exported JSON: {output_file}")
+        def annotated():
+            for hadith in hadiths:
+                hadith.related_hadiths = self.related.get(hadith_id(hadith), [])
+                yield hadith
+        return annotated()
+    
+    def export_to_pipe_format(self, filename: Optional[str] = None):
+        """Export to pipe-delimited format for embedding"""
+        self.export([PipeSink(filename)])
+    
+    def export_to_json(self, filename: Optional[str] = None):
+        """Export full metadata to JSON"""
+        self.export([JsonSink(filename)])
     
     def export_for_embedding(self, filename: Optional[str] = None):
         """
         Export optimized format for embedding generation
         Each hadith with metadata that will be stored alongside embedding
         """
+        self.export([EmbeddingSink(filename)])
+    
+    def export_to_parquet(self, filename: Optional[str] = None):
+        """Export full metadata as a dictionary-encoded Parquet file (requires pyarrow)"""
         if filename is None:
-            filename = f"{self.collection}-for-embedding.jsonl"
+            filename = f"{self.collection}.parquet"
         
         output_file = self.output_dir / filename
-        sorted_hadiths = sorted(self.hadiths, key=lambda h: (h.book_number, h.hadith_number))
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for hadith in sorted_hadiths:
-                # Create embedding-optimized record
-                record = {
-                    'id': f"{self.collection}:{hadith.hadith_number}",
-                    'collection': self.collection,
-                    'collection_name': hadith.collection_name,
-                    'reference': hadith.reference,
-                    'text': hadith.english_text,  # Main text for embedding
-                    'arabic': hadith.arabic_text,
-                    'metadata': {
-                        'book_number': hadith.book_number,
-                        'book_name': hadith.book_name,
-                        'book_topic': hadith.book_topic,
-                        'chapter_name': hadith.chapter_name,
-                        'chapter_topic': hadith.chapter_topic,
-                        'grade': hadith.grade,
-                        'graded_by': hadith.graded_by,
-                        'narrator': hadith.primary_narrator,
-                        'keywords': hadith.keywords,
-                        'url': hadith.source_url
-                    }
-                }
-                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        with self.metrics.timer('export'):
+            table = self.hadiths if isinstance(self.hadiths, HadithTable) else HadithTable(self.hadiths)
+            table.write_parquet(output_file)
+        
+        print(f"✓ Exported Parquet: {output_file}")
+
+
+class MultiCollectionScraper:
+    """
+    Scrapes several collections in one process.
+    
+    All collections share one pooled HTTP session, one request budget (requests
+    in flight and the global rate) and the fetch/parse worker pools. Their
+    pipelines run side by side on one event loop and take turns for request
+    slots, so a slow collection does not hold up the others. Each collection
+    keeps its own progress journal and exports, identical to a single run.
+    """
+    
+    def __init__(
+        self,
+        collections: List[str],
+        delay: float = 0.25,
+        concurrency: int = 1,
+        rate: Optional[float] = None,
+        parse_workers: int = 0,
+        metrics: Optional[ScrapeMetrics] = None,
+        **scraper_options
+    ):
+        """
+        Args:
+            collections: Collection keys to scrape
+            delay: Delay between requests; sets the global rate when rate is None
+            concurrency: Maximum requests in flight across all collections
+            rate: Global limit in requests per second across all collections
+            parse_workers: Parser worker processes shared by all collections
+            metrics: Phase timings and counters for all collections
+                (default: a new ScrapeMetrics)
+            scraper_options: Further HadithScraper arguments (output_dir,
+                parser, cache_dir, ...)
+        """
+        self.concurrency = max(1, concurrency)
+        self.parse_workers = max(0, parse_workers)
+        self.metrics = metrics or ScrapeMetrics()
+        self.session = HadithScraper.create_session(self.concurrency, self.metrics)
+        self.scrapers = [
+            HadithScraper(
+                collection,
+                delay=delay,
+                concurrency=self.concurrency,
+                rate=rate,
+                parse_workers=self.parse_workers,
+                session=self.session,
+                metrics=self.metrics,
+                **scraper_options
+            )
+            for collection in collections
+        ]
+        for scraper in self.scrapers:
+            scraper.log_prefix = f"[{scraper.collection}] "
+    
+    def run(
+        self,
+        start_num: int = 1,
+        end_num: Optional[int] = None,
+        bulk: bool = False,
+        retry_failed: bool = False,
+        seed_index: bool = False
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Scrape every collection, interleaved, and print a combined summary.
+        
+        Args:
+            start_num: First hadith number, in every collection
+            end_num: Last hadith number (default: each collection's total)
+            bulk: Scrape book pages instead of single hadith pages
+            retry_failed: Request only each collection's transient failures
+            seed_index: Read each collection's hadith numbers from its index
+                and book pages first
+        
+        Returns:
+            Collection key -> counts of its run
+        """
+        return asyncio.run(self._run(start_num, end_num, bulk, retry_failed, seed_index))
+    
+    async def _run(
+        self,
+        start_num: int,
+        end_num: Optional[int],
+        bulk: bool,
+        retry_failed: bool,
+        seed_index: bool
+    ) -> Dict[str, Dict[str, int]]:
+        budget = RequestBudget(
+            self.concurrency, self.scrapers[0]._effective_rate(), self.scrapers[0].adaptive
+        )
+        fetch_pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers) if self.parse_workers > 0 else None
+        for scraper in self.scrapers:
+            scraper.budget = budget
+            scraper.fetch_pool = fetch_pool
+            scraper.parse_pool = parse_pool
         
-        print(f"✓ Exported for embedding: {output_file}")
+        async def run_collection(scraper: HadithScraper) -> Dict[str, int]:
+            if seed_index:
+                await scraper.seed_index_async()
+            if bulk:
+                return await scraper.scrape_books_async(start_num, end_num)
+            return await scraper.scrape_all_async(start_num, end_num, retry_failed)
+        
+        started = time.monotonic()
+        try:
+            runs = [run_collection(scraper) for scraper in self.scrapers]
+            results = dict(zip(
+                (scraper.collection for scraper in self.scrapers),
+                await asyncio.gather(*runs)
+            ))
+        finally:
+            for scraper in self.scrapers:
+                scraper.budget = scraper.fetch_pool = scraper.parse_pool = None
+            fetch_pool.shutdown()
+            if parse_pool:
+                parse_pool.shutdown()
+        
+        self.print_summary(results, budget.requests, time.monotonic() - started, budget.limit)
+        return results
+    
+    def print_summary(
+        self,
+        results: Dict[str, Dict[str, int]],
+        requests_made: int,
+        elapsed: float,
+        limit: Optional[AdaptiveLimit] = None
+    ):
+        """Print one line per collection plus totals"""
+        print(f"\n{'='*60}")
+        print(f"All Collections Complete!")
+        print(f"{'='*60}")
+        print(f"{'Collection':<20} {'Total':>8} {'New':>8} {'Missing':>8} {'Failed':>8}")
+        
+        totals = {'hadiths': 0, 'success': 0, 'missing': 0, 'fail': 0}
+        for scraper in self.scrapers:
+            counts = results[scraper.collection]
+            print(f"{scraper.collection:<20} {scraper.scraped_count():>8} "
+                  f"{counts['success']:>8} {counts.get('missing', 0):>8} {counts['fail']:>8}")
+            totals['hadiths'] += scraper.scraped_count()
+            totals['success'] += counts['success']
+            totals['missing'] += counts.get('missing', 0)
+            totals['fail'] += counts['fail']
+        
+        print(f"{'-'*60}")
+        print(f"{'All':<20} {totals['hadiths']:>8} {totals['success']:>8} "
+              f"{totals['missing']:>8} {totals['fail']:>8}")
+        rate = requests_made / elapsed if elapsed > 0 else 0
+        print(f"Requests: {requests_made} in {elapsed:.1f}s ({rate:.1f} req/s)")
+        if limit:
+            print(f"Adaptive concurrency: {limit.current} in flight at the end, cut {limit.cuts} times")
+        print(f"{'='*60}\n")
+    
+    def reparse_from_cache(self, start_num: int = 1, end_num: Optional[int] = None):
+        """Rebuild every collection from the page cache, offline"""
+        for scraper in self.scrapers:
+            scraper.reparse_from_cache(start_num=start_num, end_num=end_num)
+    
+    def export(
+        self,
+        parquet: bool = False,
+        tfidf_keywords: int = 0,
+        pg_copy: bool = False,
+        vectors: Optional[str] = None,
+        search_index: bool = False,
+        dedup: Optional[float] = None,
+        canonical_only: bool = False
+    ):
+        """
+        Write each collection's exports
+        
+        Args:
+            dedup: Find near-duplicates across collections at this similarity
+                first (see dedup_collections)
+            canonical_only: Embed only the canonical copy of each cluster
+                with vectors
+        """
+        embedder = EMBEDDERS[vectors]() if vectors else None
+        if tfidf_keywords:
+            for scraper in self.scrapers:
+                scraper.add_tfidf_keywords(tfidf_keywords)
+        if dedup:
+            dedup_collections(self.scrapers, dedup)
+        for scraper in self.scrapers:
+            scraper.export(default_sinks(pg_copy, search_index))
+            if embedder:
+                scraper.export([VectorSink(embedder, canonical_only=canonical_only)])
+            if parquet:
+                scraper.export_to_parquet()
+
+
+def dedup_collections(scrapers: List['HadithScraper'], threshold: float = 0.7) -> List[List[str]]:
+    """
+    Find near-duplicate hadiths across the scrapers' collections and the
+    embedding exports of any other collection in their output directory.
+    Each scraper's next export fills related_hadiths from the clusters, and
+    the clusters are written to hadith-duplicates.json.
+    
+    Args:
+        scrapers: Scrapers whose records are exported next
+        threshold: Similarity at which two texts count as near-duplicates
+    
+    Returns:
+        Clusters, each with its canonical record id first
+    """
+    started = time.perf_counter()
+    output_dir = scrapers[0].output_dir
+    duplicates = NearDuplicates(threshold)
+    counts = {}
+    for scraper in scrapers:
+        for hadith in scraper.hadiths:
+            duplicates.add(hadith_id(hadith), hadith.english_text)
+        counts[scraper.collection] = scraper.scraped_count()
+    
+    # Collections exported by earlier runs take part through their exports
+    suffix = EmbeddingSink.suffix
+    for path in sorted(output_dir.glob(f"*{suffix}")):
+        collection = path.name[:-len(suffix)]
+        if collection in counts:
+            continue
+        counts[collection] = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                duplicates.add(record['id'], record['text'])
+                counts[collection] += 1
+    
+    clusters = duplicates.clusters()
+    related = {}
+    for members in clusters:
+        for record_id in members:
+            related[record_id] = [other for other in members if other != record_id]
+    for scraper in scrapers:
+        scraper.related = related
+    
+    report_file = output_dir / 'hadith-duplicates.json'
+    tmp_path = report_file.with_name(f"{report_file.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'threshold': threshold,
+            'generated_at': datetime.now().isoformat(),
+            'collections': counts,
+            'clusters': clusters
+        }, f, indent=2)
+    os.replace(tmp_path, report_file)
+    
+    covered = sum(len(members) for members in clusters)
+    print(f"✓ Near-duplicates: {len(clusters)} clusters covering {covered} of "
+          f"{len(duplicates)} records in {len(counts)} collections "
+          f"({time.perf_counter() - started:.1f}s) → {report_file}")
+    return clusters
 
 
 def main():
@@ -556,9 +3993,15 @@ def main():
     )
     parser.add_argument(
         'collection',
+        nargs='?',
         choices=list(HADITH_COLLECTIONS.keys()),
         help='Hadith collection to scrape'
     )
+    parser.add_argument(
+        '--collections',
+        help="Comma-separated collections to scrape together in one process, "
+             "or 'all' for every collection"
+    )
     parser.add_argument(
         '--start',
         type=int,
@@ -581,25 +4024,379 @@ def main():
         default='./data',
         help='Output directory (default: ./data)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Maximum requests in flight (default: 1, sequential)'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        help='Global request rate limit in requests/second for concurrent '
+             'mode (default: 1/delay, 0 disables the limit)'
+    )
+    parser.add_argument(
+        '--fixed-concurrency',
+        action='store_true',
+        help='Keep --concurrency requests in flight instead of adapting it '
+             'to server feedback (AIMD)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30.0,
+        help='Seconds to wait for a connection or response data (default: 30)'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Retries for timeouts, connection errors and 429/5xx (default: 3)'
+    )
+    parser.add_argument(
+        '--backoff',
+        type=float,
+        default=0.5,
+        help='Base delay in seconds of the jittered exponential backoff (default: 0.5)'
+    )
+    parser.add_argument(
+        '--seed-index',
+        action='store_true',
+        help="Read the collection's hadith numbers from its index and book "
+             "pages first, so numbers the site does not have are never requested"
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Request only the transient failures recorded in the failure ledger'
+    )
+    parser.add_argument(
+        '--queue',
+        help='Work as one of several workers on this SQLite work queue (created '
+             'on first use), writing to <output-dir>/shards/<worker-id>'
+    )
+    parser.add_argument(
+        '--worker-id',
+        help='Name of this worker and its shard (default: <hostname>-<pid>)'
+    )
+    parser.add_argument(
+        '--range-size',
+        type=int,
+        help='Hadiths per queue range, or books with --bulk (default: 50, or 1 with --bulk)'
+    )
+    parser.add_argument(
+        '--lease-ttl',
+        type=float,
+        default=120.0,
+        help='Seconds before the range of a silent worker is handed to another (default: 120)'
+    )
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help='Merge the worker shards under <output-dir>/shards and export'
+    )
+    parser.add_argument(
+        '--bulk',
+        action='store_true',
+        help='Scrape whole book pages (many hadiths per request) instead of '
+             'one page per hadith'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=HadithParser.BACKENDS,
+        default='compiled',
+        help='Parser backend: single-pass lxml extraction or BeautifulSoup '
+             'with the given tree builder (default: compiled)'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=0,
+        help='Parse pages in this many worker processes, pipelined with '
+             'fetching (default: 0, parse on the fetch threads)'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        help='Fetched pages allowed to wait for a parser (default: 2x workers)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Raw page cache directory (default: <output-dir>/.html-cache)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the raw page cache'
+    )
+    parser.add_argument(
+        '--reparse-only',
+        action='store_true',
+        help='Rebuild hadiths and exports from the page cache without network access'
+    )
+    parser.add_argument(
+        '--compact-memory',
+        action='store_true',
+        help='Keep scraped hadiths in a dictionary-encoded columnar store'
+    )
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Keep scraped hadiths on disk only and sort the exports with an '
+             'external merge sort, so memory does not grow with the collection'
+    )
+    parser.add_argument(
+        '--sort-window',
+        type=int,
+        default=2000,
+        metavar='N',
+        help='Records held in memory per sorted run with --streaming (default: 2000)'
+    )
+    parser.add_argument(
+        '--parquet',
+        action='store_true',
+        help='Also export <collection>.parquet (requires pyarrow)'
+    )
+    parser.add_argument(
+        '--pg-copy',
+        action='store_true',
+        help='Also export <collection>-hadith-text.pgcopy, HadithText rows in '
+             'PostgreSQL binary COPY format'
+    )
+    parser.add_argument(
+        '--vectors',
+        choices=list(EMBEDDERS),
+        help='Also keep <collection>-vectors.npy, a cache of embeddings for the '
+             'English texts: gemini (text-embedding-004, needs '
+             'GOOGLE_GENERATIVE_AI_API_KEY) or stand-in (deterministic, offline)'
+    )
+    parser.add_argument(
+        '--search-index',
+        action='store_true',
+        help='Also update hadith-search.sqlite, a local full-text (BM25) and '
+             'fuzzy search index shared by all collections (query it with '
+             'scripts/search-hadith.py)'
+    )
+    parser.add_argument(
+        '--dedup',
+        type=float,
+        nargs='?',
+        const=0.7,
+        metavar='SIMILARITY',
+        help='Find near-duplicate texts across all collections in the output '
+             'directory (MinHash/LSH) and fill related_hadiths; SIMILARITY is '
+             'the estimated Jaccard similarity of word 3-grams (default: 0.7)'
+    )
+    parser.add_argument(
+        '--canonical-only',
+        action='store_true',
+        help='With --dedup and --vectors, embed only the canonical copy of '
+             'each near-duplicate cluster'
+    )
+    parser.add_argument(
+        '--keywords-file',
+        help='Keyword vocabulary JSON (default: scripts/hadith-keywords.json)'
+    )
+    parser.add_argument(
+        '--tfidf-keywords',
+        type=int,
+        default=0,
+        metavar='N',
+        help="Also add each hadith's N most distinctive words in its collection "
+             "to its keywords (default: 0)"
+    )
+    parser.add_argument(
+        '--base-url',
+        help='Site root to scrape instead of https://sunnah.com '
+             '(e.g. a local stand-in server)'
+    )
+    parser.add_argument(
+        '--metrics',
+        help='Write phase timings and counters to this file'
+    )
+    parser.add_argument(
+        '--metrics-format',
+        choices=['json', 'prometheus'],
+        help='Metrics file format (default: prometheus for *.prom, else json)'
+    )
+    parser.add_argument(
+        '--profile',
+        help='Run under cProfile and write the stats to this file'
+    )
     
     args = parser.parse_args()
     
+    if bool(args.collection) == bool(args.collections):
+        parser.error('give either a collection or --collections')
+    collections = None
+    if args.collections:
+        collections = (
+            list(HADITH_COLLECTIONS.keys()) if args.collections == 'all'
+            else [name.strip() for name in args.collections.split(',') if name.strip()]
+        )
+        unknown = [name for name in collections if name not in HADITH_COLLECTIONS]
+        if unknown:
+            parser.error(f"unknown collections: {', '.join(unknown)} "
+                         f"(available: {', '.join(HADITH_COLLECTIONS.keys())})")
+    if args.no_cache and args.reparse_only:
+        parser.error('--reparse-only needs the page cache')
+    if args.retry_failed and (args.bulk or args.reparse_only):
+        parser.error('--retry-failed works on single hadith pages only')
+    if args.seed_index and args.reparse_only:
+        parser.error('--seed-index needs network access, unlike --reparse-only')
+    if (args.queue or args.merge) and collections:
+        parser.error('--queue and --merge work on a single collection')
+    if args.queue and (args.reparse_only or args.retry_failed or args.seed_index):
+        parser.error('--queue cannot be combined with --reparse-only, --retry-failed or --seed-index')
+    if args.parquet:
+        try:
+            import pyarrow
+        except ImportError:
+            parser.error('--parquet needs pyarrow: pip install pyarrow')
+    if args.streaming and (args.compact_memory or args.merge or args.tfidf_keywords):
+        parser.error('--streaming cannot be combined with --compact-memory, --merge or --tfidf-keywords')
+    if args.dedup is not None and not 0 < args.dedup <= 1:
+        parser.error('--dedup similarity must be between 0 and 1')
+    if args.canonical_only and not (args.dedup and args.vectors):
+        parser.error('--canonical-only needs --dedup and --vectors')
+    if args.vectors == 'gemini' and not os.environ.get('GOOGLE_GENERATIVE_AI_API_KEY'):
+        parser.error('--vectors gemini needs GOOGLE_GENERATIVE_AI_API_KEY')
+    cache_dir = None if args.no_cache else (
+        args.cache_dir or str(Path(args.output_dir) / '.html-cache')
+    )
+    
+    metrics = ScrapeMetrics()
+    options = dict(
+        delay=args.delay,
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        base_url=args.base_url,
+        parser=args.parser,
+        parse_workers=args.parse_workers,
+        queue_size=args.queue_size,
+        cache_dir=cache_dir,
+        compact_memory=args.compact_memory,
+        streaming=args.streaming,
+        sort_window=args.sort_window,
+        keywords_file=args.keywords_file,
+        metrics=metrics,
+        timeout=args.timeout,
+        retries=args.retries,
+        backoff=args.backoff,
+        adaptive=not args.fixed_concurrency
+    )
+    
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args, collections, options)
+    finally:
+        if profiler:
+            import pstats
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"✓ Profile written to {args.profile} (top functions by cumulative time):")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    
+    metrics.print_summary()
+    if args.metrics:
+        metrics_format = args.metrics_format or (
+            'prometheus' if args.metrics.endswith('.prom') else 'json'
+        )
+        metrics.write(Path(args.metrics), metrics_format)
+
+
+def run(args, collections: Optional[List[str]], options: Dict):
+    """Scrape (or reparse) and export, for one collection or several"""
+    if collections:
+        print("\n" + "="*60)
+        print(f"Hadith Scraper - {len(collections)} collections: {', '.join(collections)}")
+        print("="*60)
+        
+        scraper = MultiCollectionScraper(collections, **options)
+        if args.reparse_only:
+            scraper.reparse_from_cache(start_num=args.start, end_num=args.end)
+        else:
+            scraper.run(
+                start_num=args.start,
+                end_num=args.end,
+                bulk=args.bulk,
+                retry_failed=args.retry_failed,
+                seed_index=args.seed_index
+            )
+        
+        scraper.export(
+            parquet=args.parquet,
+            tfidf_keywords=args.tfidf_keywords,
+            pg_copy=args.pg_copy,
+            vectors=args.vectors,
+            search_index=args.search_index,
+            dedup=args.dedup,
+            canonical_only=args.canonical_only
+        )
+        print("\n✅ All exports completed!\n")
+        return
+    
     print("\n" + "="*60)
     print(f"Hadith Scraper - {HADITH_COLLECTIONS[args.collection]['name']}")
     print("="*60)
     
-    scraper = HadithScraper(
-        collection=args.collection,
-        delay=args.delay,
-        output_dir=args.output_dir
-    )
+    if args.queue and not args.merge:
+        # Workers only fill their shard; --merge writes the exports
+        worker = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        shard_dir = Path(args.output_dir) / 'shards' / worker
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        scraper = HadithScraper(collection=args.collection, **dict(options, output_dir=str(shard_dir)))
+        try:
+            scraper.work_from_queue(
+                WorkQueue(Path(args.queue), args.lease_ttl),
+                worker,
+                start_num=args.start,
+                end_num=args.end,
+                bulk=args.bulk,
+                range_size=args.range_size
+            )
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        return
+    
+    scraper = HadithScraper(collection=args.collection, **options)
     
-    scraper.scrape_all(start_num=args.start, end_num=args.end)
+    if args.merge:
+        scraper.merge_shards(Path(args.output_dir) / 'shards')
+        if args.queue:
+            status = WorkQueue(Path(args.queue), args.lease_ttl).status()
+            unfinished = sum(count for state, count in status.items() if state != 'done')
+            if unfinished:
+                print(f"⚠ {unfinished} queue ranges are not done yet; "
+                      f"merge again once the workers have finished")
+    elif args.reparse_only:
+        scraper.reparse_from_cache(start_num=args.start, end_num=args.end)
+    else:
+        if args.seed_index:
+            scraper.seed_index()
+        if args.bulk:
+            scraper.scrape_books(start_num=args.start, end_num=args.end)
+        else:
+            scraper.scrape_all(start_num=args.start, end_num=args.end, retry_failed=args.retry_failed)
     
     # Export in all formats
-    scraper.export_to_pipe_format()
-    scraper.export_to_json()
-    scraper.export_for_embedding()
+    if args.tfidf_keywords:
+        scraper.add_tfidf_keywords(args.tfidf_keywords)
+    if args.dedup:
+        dedup_collections([scraper], args.dedup)
+    scraper.export(default_sinks(args.pg_copy, args.search_index))
+    if args.vectors:
+        # A separate pass, so an embedding API failure leaves the exports above intact
+        scraper.export([VectorSink(EMBEDDERS[args.vectors](), canonical_only=args.canonical_only)])
+    if args.parquet:
+        scraper.export_to_parquet()
     
     print("\n✅ All exports completed!\n")
 
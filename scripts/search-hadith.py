@@ -0,0 +1,142 @@
+"""
+Query the local hadith search index built with --search-index.
+Ranks hadiths with BM25 over the English text, chapter names and keywords;
+misspelt query words and narrator names are matched by trigram similarity.
+
+Usage:
+    python scripts/search-hadith.py "patience in hardship"
+    python scripts/search-hadith.py "intentions" --collection bukhari --narrator "umar"
+    python scripts/search-hadith.py --similar "abu hurayra" --kind narrator
+    python scripts/search-hadith.py "charity" --bench 1000
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from hadith_search import HadithSearchIndex
+
+
+def bench(run, repeat: int) -> str:
+    """Latency percentiles of `repeat` calls to run()"""
+    run()  # warm the page cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return f"{repeat} runs: p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Search the local hadith index (hadith-search.sqlite)'
+    )
+    parser.add_argument(
+        'query',
+        nargs='?',
+        help='Words to search for'
+    )
+    parser.add_argument(
+        '--index',
+        default='./data/hadith-search.sqlite',
+        help='Search index file (default: ./data/hadith-search.sqlite)'
+    )
+    parser.add_argument(
+        '--collection',
+        help='Only search this collection (e.g. bukhari)'
+    )
+    parser.add_argument(
+        '--narrator',
+        help='Only hadiths from the narrator closest to this name'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=10,
+        help='Maximum results (default: 10)'
+    )
+    parser.add_argument(
+        '--exact',
+        action='store_true',
+        help='Do not expand unknown words with similar terms'
+    )
+    parser.add_argument(
+        '--similar',
+        metavar='TEXT',
+        help='List the vocabulary terms closest to TEXT instead of searching'
+    )
+    parser.add_argument(
+        '--kind',
+        choices=['word', 'narrator'],
+        default='word',
+        help='Vocabulary for --similar (default: word)'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print results as JSON'
+    )
+    parser.add_argument(
+        '--bench',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Also run the lookup N times and report its latency'
+    )
+
+    args = parser.parse_args()
+
+    if not args.query and not args.similar:
+        parser.error('give a query or --similar')
+
+    try:
+        index = HadithSearchIndex(Path(args.index), readonly=True)
+    except FileNotFoundError as e:
+        print(f"✗ {e} (export with --search-index first)")
+        sys.exit(1)
+
+    if args.similar:
+        def run():
+            return index.similar_terms(args.similar, kind=args.kind, limit=args.limit)
+    else:
+        def run():
+            return index.search(
+                args.query,
+                limit=args.limit,
+                collection=args.collection,
+                narrator=args.narrator,
+                fuzzy=not args.exact
+            )
+
+    results = run()
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    elif args.similar:
+        for term, similarity, hits in results:
+            print(f"{similarity:>6.3f}  {term} ({hits} hadiths)")
+    else:
+        if not args.exact:
+            print(f"→ Query: {index.match_query(args.query)}\n")
+        for result in results:
+            print(f"{result['score']:>7.2f}  {result['id']}  {result['reference']}")
+            if result['narrator']:
+                print(f"         Narrator: {result['narrator']}")
+            print(f"         {result['snippet']}\n")
+    if not results:
+        print("⊙ No matches")
+
+    if args.bench:
+        print(f"\n⏱ {bench(run, args.bench)}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
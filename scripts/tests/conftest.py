@@ -0,0 +1,59 @@
+"""
+Shared fixtures for the hadith script tests
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+# The importable modules beside the scripts (hadith_records, hadith_search, ...)
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_script(name: str, filename: str):
+    """Import one of the hyphen-named scripts in scripts/"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def scraper():
+    return load_script('scrape_hadith_universal', 'scrape-hadith-universal.py')
+
+
+@pytest.fixture
+def run_sink():
+    """
+    Export hadiths through one sink as HadithExporter does, into output_dir;
+    with commit=False the output is discarded as if the export failed after
+    the sink finished
+    """
+    from hadith_records import ExportOutput
+
+    def run(sink, output_dir: Path, collection: str, hadiths, commit: bool = True) -> Path:
+        out = ExportOutput(output_dir / sink.filename_for(collection), binary=sink.binary)
+        meta = {'output_dir': output_dir, 'collection': collection}
+        sink.begin(out, meta)
+        for hadith in hadiths:
+            sink.write(out, hadith)
+        sink.end(out, meta)
+        out.close()
+        if commit:
+            out.tmp_path.replace(out.path)
+        else:
+            out.tmp_path.unlink()
+        return out.path
+
+    return run
@@ -0,0 +1,66 @@
+"""
+Near-duplicate detection (hadith_dedup): MinHash clusters and the canonical
+copy of each
+"""
+
+import random
+
+from hadith_dedup import NearDuplicates, canonical_id, canonical_rank
+from hadith_records import Hadith
+
+WORDS = (
+    'prophet said whoever believes in allah and the last day should speak good '
+    'or keep silent and honour his neighbour and his guest with kindness'
+).split()
+
+
+def texts(count, seed=1):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(40)) for _ in range(count)]
+
+
+def edited(text, words=1):
+    tokens = text.split()
+    for i in range(words):
+        tokens[i * 7] = 'verily'
+    return ' '.join(tokens)
+
+
+def test_copies_cluster_with_canonical_first():
+    duplicates = NearDuplicates()
+    originals = texts(20)
+    for number, text in enumerate(originals, 1):
+        duplicates.add(f'riyadussalihin:{number}', edited(text))
+        duplicates.add(f'bukhari:{number}', text)
+    duplicates.add('muslim:7', edited(originals[6], 2))
+    duplicates.add('muslim:8', '')
+
+    assert len(duplicates) == 41
+    clusters = {members[0]: members for members in duplicates.clusters()}
+    assert len(clusters) == 20
+    assert clusters['bukhari:7'] == ['bukhari:7', 'muslim:7', 'riyadussalihin:7']
+    assert clusters['bukhari:1'] == ['bukhari:1', 'riyadussalihin:1']
+
+
+def test_distinct_texts_do_not_cluster():
+    duplicates = NearDuplicates()
+    for number, text in enumerate(texts(50, seed=2), 1):
+        duplicates.add(f'bukhari:{number}', text)
+    assert duplicates.clusters() == []
+
+
+def test_signature_is_stable():
+    duplicates = NearDuplicates()
+    text = texts(1)[0]
+    assert duplicates.signature(text) == NearDuplicates().signature(text)
+    assert len(duplicates.signature('two words')) == NearDuplicates.BINS
+    assert duplicates.signature('...') is None
+
+
+def test_canonical_order():
+    ids = ['riyadussalihin:3', 'zzz:1', 'muslim:10', 'bukhari:2', 'muslim:9']
+    assert sorted(ids, key=canonical_rank) == ['bukhari:2', 'muslim:9', 'muslim:10', 'riyadussalihin:3', 'zzz:1']
+    hadith = Hadith(collection='riyadussalihin', collection_name='Riyad as-Salihin', hadith_number=3)
+    assert canonical_id(hadith) == 'riyadussalihin:3'
+    hadith.related_hadiths = ['muslim:10', 'bukhari:2']
+    assert canonical_id(hadith) == 'bukhari:2'
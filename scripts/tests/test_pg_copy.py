@@ -0,0 +1,90 @@
+"""
+Round trip of the --pg-copy export through COPY FROM STDIN
+
+Needs a database with the migrations applied in PG_URL (as for
+bench-hadith-copy.ts) and psycopg; skipped without either. The rows go into a
+temporary HadithText that shadows the real table, so nothing is changed.
+"""
+
+import os
+
+import pytest
+
+psycopg = pytest.importorskip('psycopg')
+
+PG_URL = os.environ.get('PG_URL')
+
+pytestmark = pytest.mark.skipif(not PG_URL, reason='PG_URL is not set')
+
+
+def make_hadiths(scraper):
+    return [
+        scraper.Hadith(
+            collection='bukhari', collection_name='Sahih al-Bukhari', hadith_number=1,
+            reference='Sahih al-Bukhari 1', english_text='Actions are judged by intentions.',
+            arabic_text='إِنَّمَا الأَعْمَالُ بِالنِّيَّاتِ', book_number=1, book_name='Revelation',
+            chapter_number=1, chapter_name='How the Divine Revelation started', grade='Sahih',
+            narrator_chain='Narrated \'Umar bin Al-Khattab', source_url='https://sunnah.com/bukhari:1',
+        ),
+        # Escape-worthy characters in text columns, empty optional columns
+        scraper.Hadith(
+            collection='bukhari', collection_name='Sahih al-Bukhari', hadith_number=2,
+            reference='Sahih al-Bukhari 2', english_text='Tab\there,\nnewline and back\\slash',
+            arabic_text='', book_number=0,
+        ),
+    ]
+
+
+def test_pg_copy_round_trip(scraper, tmp_path):
+    hadiths = make_hadiths(scraper)
+    sink = scraper.PgCopySink()
+    out = scraper.ExportOutput(tmp_path / sink.filename_for('bukhari'), binary=True)
+    sink.begin(out, {})
+    for hadith in hadiths:
+        sink.write(out, hadith)
+    sink.end(out, {})
+    out.close()
+
+    columns = [column for column, _, _ in scraper.PgCopySink.COLUMNS]
+    with psycopg.connect(PG_URL, autocommit=True) as conn:
+        conn.execute('CREATE TEMP TABLE "HadithText" (LIKE public."HadithText" INCLUDING ALL)')
+        try:
+            with conn.cursor().copy(
+                f'COPY "HadithText" ({scraper.PG_COPY_COLUMNS}) FROM STDIN (FORMAT binary)'
+            ) as copy:
+                copy.write(out.tmp_path.read_bytes())
+            rows = conn.execute(
+                f'SELECT {scraper.PG_COPY_COLUMNS}, "searchVector" IS NOT NULL '
+                'FROM "HadithText" ORDER BY "hadithNumber"'
+            ).fetchall()
+        finally:
+            conn.execute('DROP TABLE IF EXISTS pg_temp."HadithText"')
+
+    assert len(rows) == len(hadiths)
+    for hadith, row in zip(hadiths, rows):
+        *values, has_search_vector = row
+        got = dict(zip(columns, values))
+        english_normalized, english_tokens = scraper.english_search_text(hadith.english_text)
+        arabic_normalized, arabic_tokens = scraper.arabic_search_text(hadith.arabic_text)
+        assert got == {
+            'id': scraper.hadith_uuid(hadith),
+            'collection': hadith.collection,
+            'collectionName': hadith.collection_name,
+            'hadithNumber': hadith.hadith_number,
+            'reference': hadith.reference,
+            'englishText': hadith.english_text,
+            'arabicText': hadith.arabic_text,
+            'bookNumber': hadith.book_number,
+            'bookName': hadith.book_name or None,
+            'chapterNumber': hadith.chapter_number,
+            'chapterName': hadith.chapter_name or None,
+            'grade': hadith.grade or None,
+            'narratorChain': hadith.narrator_chain or None,
+            'sourceUrl': hadith.source_url or None,
+            'englishNormalized': english_normalized or None,
+            'arabicNormalized': arabic_normalized or None,
+            'englishTokenCount': english_tokens,
+            'arabicTokenCount': arabic_tokens,
+        }
+        # The server computes the generated column from the copied text
+        assert has_search_vector
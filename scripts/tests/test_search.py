@@ -0,0 +1,97 @@
+"""
+Local search index (hadith_search): SearchIndexSink updates, BM25 and fuzzy
+lookups, narrator filters
+"""
+
+import json
+import uuid
+
+import pytest
+
+from hadith_records import HADITH_UUID_NAMESPACE, Hadith
+from hadith_search import HadithSearchIndex, SearchIndexSink, narrator_name
+
+TEXTS = {
+    1: ("Narrated 'Umar bin Al-Khattab:", 'Actions are judged by intentions, and every person will get what he intended.'),
+    2: ('Narrated Abu Huraira:', 'Patience is at the first stroke of a calamity.'),
+    3: ('Narrated Abu Huraira:', 'Charity does not decrease wealth, and the patient are rewarded.'),
+    4: ('Narrated Aisha:', 'The most beloved deed to Allah is the most regular, even if it is little.'),
+}
+
+
+def make_hadiths(texts=TEXTS, collection='bukhari'):
+    return [
+        Hadith(
+            collection=collection, collection_name='Sahih al-Bukhari', hadith_number=number,
+            reference=f'{collection} {number}', english_text=text, narrator_chain=narrator,
+            book_number=1, chapter_name='Faith', keywords=['faith'],
+        )
+        for number, (narrator, text) in texts.items()
+    ]
+
+
+@pytest.fixture
+def index_dir(tmp_path, run_sink):
+    run_sink(SearchIndexSink(), tmp_path, 'bukhari', make_hadiths())
+    return tmp_path
+
+
+def open_index(directory):
+    return HadithSearchIndex(directory / HadithSearchIndex.FILENAME, readonly=True)
+
+
+def test_narrator_name():
+    hadith = make_hadiths()[0]
+    assert narrator_name(hadith) == "'Umar bin Al-Khattab"
+    hadith.primary_narrator = 'Abu Hurairah (May Allah be pleased with him) reported'
+    assert narrator_name(hadith) == 'Abu Hurairah'
+
+
+def test_search_ranks_matches(index_dir):
+    index = open_index(index_dir)
+    try:
+        results = index.search('patience calamity')
+        assert [r['hadith_number'] for r in results][:1] == [2]
+        assert results[0]['id'] == 'bukhari:2'
+        assert results[0]['row_id'] == str(uuid.uuid5(HADITH_UUID_NAMESPACE, 'bukhari:2'))
+        assert '[' in results[0]['snippet']
+        assert index.search('zakat', fuzzy=False) == []
+    finally:
+        index.close()
+
+
+def test_fuzzy_and_narrator(index_dir):
+    index = open_index(index_dir)
+    try:
+        # Misspelt words are expanded with close vocabulary terms
+        assert 1 in [r['hadith_number'] for r in index.search('intentoins')]
+        assert index.similar_terms('abu hurayra', kind='narrator')[0][0] == 'abu huraira'
+        numbers = {r['hadith_number'] for r in index.search('patience patient', narrator='abu hurayra')}
+        assert numbers == {2, 3}
+        assert index.search('patience', collection='muslim') == []
+    finally:
+        index.close()
+
+
+def test_reexport_updates_changed_and_removed(index_dir, run_sink):
+    texts = dict(TEXTS)
+    texts[4] = ('Narrated Aisha:', 'Fasting is a shield.')
+    del texts[3]
+    summary = run_sink(SearchIndexSink(), index_dir, 'bukhari', make_hadiths(texts))
+    run_sink(SearchIndexSink(), index_dir, 'muslim', make_hadiths({1: TEXTS[1]}, 'muslim'))
+
+    index = open_index(index_dir)
+    try:
+        assert index.stats() == {'bukhari': 3, 'muslim': 1}
+        assert [r['hadith_number'] for r in index.search('shield')] == [4]
+        assert index.search('beloved deed') == []
+        assert index.search('charity wealth') == []
+        assert {r['collection'] for r in index.search('intentions')} == {'bukhari', 'muslim'}
+    finally:
+        index.close()
+    assert json.loads(summary.read_text())['records'] == 3
+
+
+def test_readonly_needs_an_index(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        HadithSearchIndex(tmp_path / HadithSearchIndex.FILENAME, readonly=True)
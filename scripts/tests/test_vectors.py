@@ -0,0 +1,131 @@
+"""
+Embedding vector cache (hadith_vectors): the .npy matrix, the stand-in
+embedder, and VectorSink reuse, compaction and failed exports
+"""
+
+import json
+
+import pytest
+
+from hadith_records import Hadith
+from hadith_vectors import HashEmbedder, VectorMatrix, VectorSink
+
+DIMS = 16
+
+
+def make_hadiths(tag, count=20):
+    return [
+        Hadith(collection='c', collection_name='C', hadith_number=number,
+               english_text=f'{tag} text number {number}')
+        for number in range(1, count + 1)
+    ]
+
+
+class CountingEmbedder(HashEmbedder):
+    def __init__(self):
+        super().__init__(DIMS)
+        self.embedded = 0
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return super().embed(texts)
+
+
+def check_rows(directory, tag):
+    """Every record's row holds its own text's vector"""
+    index = json.loads((directory / 'c-vectors.json').read_text())
+    matrix = VectorMatrix(directory / index['matrix'], DIMS)
+    try:
+        for hadith in make_hadiths(tag):
+            expected = HashEmbedder(DIMS).embed([hadith.english_text])[0]
+            assert list(matrix.row(index['ids'][f'c:{hadith.hadith_number}'])) == list(expected)
+        # Rows past the index's are left by a failed export and overwritten later
+        assert matrix.rows >= index['rows'] == len(index['text_hashes'])
+    finally:
+        matrix.close()
+    return index
+
+
+def test_matrix_round_trip(tmp_path):
+    path = tmp_path / 'm.npy'
+    matrix = VectorMatrix(path, 3)
+    assert matrix.append([[1, 2, 3], [4, 5, 6]]) == 0
+    assert matrix.append([[7, 8, 9]]) == 2
+    with pytest.raises(ValueError):
+        matrix.append([[1, 2]])
+    matrix.close()
+
+    matrix = VectorMatrix(path, 3)
+    assert matrix.rows == 3
+    assert list(matrix.row(2)) == [7, 8, 9]
+    with pytest.raises(IndexError):
+        matrix.row(3)
+    copy = matrix.copy_rows([2, 0], tmp_path / 'copy.npy')
+    assert [list(copy.row(i)) for i in range(2)] == [[7, 8, 9], [1, 2, 3]]
+    assert matrix.rows == 3
+    copy.close()
+    matrix.close()
+
+    with pytest.raises(ValueError):
+        VectorMatrix(path, 4)
+
+    numpy = pytest.importorskip('numpy')
+    assert numpy.load(path).tolist() == [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+
+def test_hash_embedder():
+    embedder = HashEmbedder(DIMS)
+    a, b, c = embedder.embed(['patience in hardship', 'patience in hardship', 'charity and wealth'])
+    assert list(a) == list(b)
+    assert abs(sum(v * v for v in a) - 1) < 1e-5
+    assert list(a) != list(c)
+
+
+def test_unchanged_texts_are_not_embedded_again(tmp_path, run_sink):
+    embedder = CountingEmbedder()
+    run_sink(VectorSink(embedder, batch_size=7), tmp_path, 'c', make_hadiths('a'))
+    assert embedder.embedded == 20
+    check_rows(tmp_path, 'a')
+
+    hadiths = make_hadiths('a')
+    hadiths[0].english_text = 'b text number 1'
+    run_sink(VectorSink(embedder, batch_size=7), tmp_path, 'c', hadiths)
+    assert embedder.embedded == 21
+    index = json.loads((tmp_path / 'c-vectors.json').read_text())
+    assert index['rows'] == 21 and index['generation'] == 0
+
+
+def test_compaction_survives_a_failed_export(tmp_path, run_sink):
+    embedder = HashEmbedder(DIMS)
+    run_sink(VectorSink(embedder), tmp_path, 'c', make_hadiths('a'))
+    run_sink(VectorSink(embedder), tmp_path, 'c', make_hadiths('b'))
+    assert check_rows(tmp_path, 'b')['matrix'] == 'c-vectors.npy'
+
+    # The third export compacts into a new matrix, then fails before its
+    # index replaces the old one: the old index and matrix still agree
+    run_sink(VectorSink(embedder), tmp_path, 'c', make_hadiths('c'), commit=False)
+    assert (tmp_path / 'c-vectors.1.npy').exists()
+    assert check_rows(tmp_path, 'b')['matrix'] == 'c-vectors.npy'
+
+    run_sink(VectorSink(embedder), tmp_path, 'c', make_hadiths('c'))
+    index = check_rows(tmp_path, 'c')
+    assert (index['matrix'], index['generation'], index['rows']) == ('c-vectors.1.npy', 1, 20)
+    # The replaced matrix goes on the next export
+    assert sorted(p.name for p in tmp_path.glob('*.npy')) == ['c-vectors.1.npy', 'c-vectors.npy']
+    run_sink(VectorSink(embedder), tmp_path, 'c', make_hadiths('c'))
+    assert sorted(p.name for p in tmp_path.glob('*.npy')) == ['c-vectors.1.npy']
+
+
+def test_other_embedder_rebuilds(tmp_path, run_sink):
+    run_sink(VectorSink(HashEmbedder(DIMS)), tmp_path, 'c', make_hadiths('a'))
+    run_sink(VectorSink(HashEmbedder(DIMS * 2)), tmp_path, 'c', make_hadiths('a'))
+    index = json.loads((tmp_path / 'c-vectors.json').read_text())
+    assert (index['dims'], index['rows'], index['matrix']) == (DIMS * 2, 20, 'c-vectors.npy')
+
+
+def test_canonical_only(tmp_path, run_sink):
+    hadiths = make_hadiths('a', 3)
+    hadiths[1].related_hadiths = ['bukhari:5']
+    run_sink(VectorSink(HashEmbedder(DIMS), canonical_only=True), tmp_path, 'c', hadiths)
+    index = json.loads((tmp_path / 'c-vectors.json').read_text())
+    assert sorted(index['ids']) == ['c:1', 'c:3']